@@ -39,7 +39,7 @@ from yaml.representer import SafeRepresenter
 
 
 START_BLOCK = """
-#!jinja | metalk8s_kubernetes
+#!jinja | metalk8s_kubernetes{renderer_options}
 
 {{%- from "metalk8s/repo/macro.sls" import build_image_name with context %}}
 {csc_defaults}
@@ -268,6 +268,12 @@ def main():
         "--drop-prometheus-rules",
         help="YAML formatted file to drop some pre-defined Prometheus rules",
     )
+    parser.add_argument(
+        "--bulk",
+        action="store_true",
+        help="Apply all the objects from a single state, concurrently "
+        "(see the `bulk` option of the `metalk8s_kubernetes` renderer)",
+    )
     parser.add_argument(
         "--remove-manifest",
         action="append",
@@ -332,7 +338,9 @@ def main():
 
     sys.stdout.write(
         START_BLOCK.format(
-            csc_defaults="\n".join(import_csc_yaml), configlines="\n".join(config)
+            renderer_options=" bulk=True" if args.bulk else "",
+            csc_defaults="\n".join(import_csc_yaml),
+            configlines="\n".join(config),
         ).lstrip()
     )
     sys.stdout.write("\n")
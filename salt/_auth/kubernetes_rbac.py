@@ -1,5 +1,13 @@
+import base64
+import collections
+import copy
 from functools import wraps
+import hashlib
+import json
 import logging
+import os
+import threading
+import time
 
 from salt.exceptions import CommandExecutionError
 
@@ -31,6 +39,101 @@ def __virtual__():
 
 AUTH_HANDLERS = {}
 
+# Results of authentication and groups requests are cached for (at most)
+# this many seconds, see `^cache_ttl` and `^cache_size` options
+DEFAULT_CACHE_TTL = 60
+DEFAULT_CACHE_SIZE = 256
+
+
+class _TTLCache(object):
+    """Bounded cache of values expiring after some time.
+
+    Least recently used values are dropped once `max_size` is reached.
+    Keys must never contain a token as is, see `_cache_key`.
+    """
+
+    MISSING = object()
+
+    def __init__(self, name):
+        self._name = name
+        self._values = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key):
+        with self._lock:
+            value, expires_at = self._values.get(key, (self.MISSING, None))
+            if value is not self.MISSING and expires_at <= time.time():
+                del self._values[key]
+                value = self.MISSING
+
+            if value is self.MISSING:
+                self._misses += 1
+            else:
+                self._values.move_to_end(key)
+                self._hits += 1
+
+            log.debug(
+                "%s cache %s (hits: %d, misses: %d)",
+                self._name,
+                "miss" if value is self.MISSING else "hit",
+                self._hits,
+                self._misses,
+            )
+            return value
+
+    def set(self, key, value, ttl, max_size):
+        if ttl <= 0:
+            return
+
+        with self._lock:
+            self._values[key] = (value, time.time() + ttl)
+            self._values.move_to_end(key)
+            while len(self._values) > max_size:
+                self._values.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+            self._hits = 0
+            self._misses = 0
+
+    def info(self):
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "size": len(self._values),
+            }
+
+
+AUTH_CACHE = _TTLCache("Authentication")
+GROUPS_CACHE = _TTLCache("Groups")
+
+
+def _cache_key(username, token):
+    return username, hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def _token_ttl(token, max_ttl):
+    """Compute how long results for a token can be cached.
+
+    Tokens may be JWTs (e.g. for ServiceAccounts), in which case results
+    must not be cached after the token expiry (`exp` claim).
+    """
+    try:
+        payload = token.split(".")[1]
+        claims = json.loads(
+            base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4))
+        )
+        expiry = float(claims["exp"])
+    except (IndexError, KeyError, TypeError, ValueError):
+        # Not a JWT, or no expiry
+        return max_ttl
+
+    return min(max_ttl, expiry - time.time())
+
 
 def _log_exceptions(f):
     def wrapped(*args, **kwargs):
@@ -76,8 +179,7 @@ def _patch_kubeconfig(kubeconfig, username, token):
     kubeconfig.key_file = None
 
 
-def _review_access(kubeconfig, resource, verb):
-    client = kubernetes.client.ApiClient(configuration=kubeconfig)
+def _review_access(client, resource, verb):
     authz_api = kubernetes.client.AuthorizationV1Api(api_client=client)
 
     # NOTE: any authenticated user can use this API.
@@ -97,9 +199,8 @@ def _review_access(kubeconfig, resource, verb):
     )
 
 
-def _review_token(kubeconfig, username, token):
+def _review_token(client, username, token):
     """Check the provided bearer token using the TokenReview API."""
-    client = kubernetes.client.ApiClient(configuration=kubeconfig)
     authn_api = kubernetes.client.AuthenticationV1Api(api_client=client)
 
     token_review = authn_api.create_token_review(
@@ -131,63 +232,125 @@ def _review_token(kubeconfig, username, token):
         return False
 
 
-def _check_node_admin(kubeconfig):
-    return _review_access(kubeconfig, "nodes", "*").status.allowed
+def _check_node_admin(client):
+    return _review_access(client, "nodes", "*").status.allowed
 
 
 AVAILABLES_GROUPS = {"node-admins": _check_node_admin}
 
 
-def _get_groups(kubeconfig, username, token):
-    _patch_kubeconfig(kubeconfig, username, token)
-
+def _get_groups(client):
     groups = set()
 
     for group, func in AVAILABLES_GROUPS.items():
-        if func(kubeconfig):
+        if func(client):
             groups.add(group)
 
     return list(groups)
 
 
-@_log_exceptions
-def _load_kubeconfig(opts):
+class _Clients(object):
+    """Kubernetes API clients built from the eauth kubeconfig.
+
+    Those are reused across requests, so that connections to the API server
+    are kept alive. Requests on behalf of a user (authenticated using their
+    token) use a new `ApiClient`, sharing the same connection pool.
+    """
+
+    def __init__(self, kubeconfig):
+        self.kubeconfig = kubeconfig
+        self.client = kubernetes.client.ApiClient(configuration=kubeconfig)
+
+        self._user_kubeconfig = copy.copy(kubeconfig)
+        _patch_kubeconfig(self._user_kubeconfig, None, None)
+        self._user_rest_client = kubernetes.client.ApiClient(
+            configuration=self._user_kubeconfig
+        ).rest_client
+
+    def for_user(self, username, token):
+        kubeconfig = copy.copy(self._user_kubeconfig)
+        _patch_kubeconfig(kubeconfig, username, token)
+        client = kubernetes.client.ApiClient(configuration=kubeconfig)
+        client.rest_client = self._user_rest_client
+        return client
+
+
+_CLIENTS = {}
+_CLIENTS_LOCK = threading.Lock()
+
+
+def _load_config(opts):
     config = {
         "kubeconfig": None,
         "context": None,
+        "cache_ttl": DEFAULT_CACHE_TTL,
+        "cache_size": DEFAULT_CACHE_SIZE,
     }
 
     for opt in opts["external_auth"][__virtualname__]:
         if opt.startswith("^"):
             config[opt[1:]] = opts["external_auth"][__virtualname__][opt]
 
+    config["cache_ttl"] = float(config["cache_ttl"])
+    config["cache_size"] = int(config["cache_size"])
+
+    return config
+
+
+@_log_exceptions
+def _load_clients(config):
     if config["kubeconfig"] is None:
         log.error("Missing configuration: kubeconfig")
         return None
 
-    kubeconfig = kubernetes.client.Configuration()
-    kubernetes.config.load_kube_config(
-        config_file=config["kubeconfig"],
-        context=config["context"],
-        client_configuration=kubeconfig,
-        persist_config=False,
+    # Only parse the kubeconfig again if it changed
+    key = (
+        config["kubeconfig"],
+        os.stat(config["kubeconfig"]).st_mtime_ns,
+        config["context"],
     )
+    with _CLIENTS_LOCK:
+        clients = _CLIENTS.get(key)
+        if clients is None:
+            kubeconfig = kubernetes.client.Configuration()
+            kubernetes.config.load_kube_config(
+                config_file=config["kubeconfig"],
+                context=config["context"],
+                client_configuration=kubeconfig,
+                persist_config=False,
+            )
+            _CLIENTS.clear()
+            clients = _CLIENTS[key] = _Clients(kubeconfig)
 
-    return kubeconfig
+    return clients
 
 
 @_check_auth_args
 def auth(username, token=None, **_kwargs):
     log.info('Authentication request for "%s"', username)
 
-    kubeconfig = _load_kubeconfig(__opts__)
-    if kubeconfig is None:
+    config = _load_config(__opts__)
+    cache_key = _cache_key(username, token)
+    result = AUTH_CACHE.get(cache_key)
+    if result is not AUTH_CACHE.MISSING:
+        log.info('Authentication request for "%s" succeeded (cached)', username)
+        return result
+
+    clients = _load_clients(config)
+    if clients is None:
         log.info("Failed to load Kubernetes API client configuration")
         return False
 
-    result = _review_token(kubeconfig, username, token)
+    result = _review_token(clients.client, username, token)
     if result:
         log.info('Authentication request for "%s" succeeded', username)
+        # Only cache successful authentications, failures may be transient
+        AUTH_CACHE.set(
+            cache_key,
+            result,
+            _token_ttl(token, config["cache_ttl"]),
+            config["cache_size"],
+        )
     else:
         log.warning('Authentication request for "%s" failed', username)
 
@@ -200,11 +363,24 @@ def groups(
 ):  # pylint: disable=unused-argument
     log.info('Groups request for "%s"', username)
 
-    kubeconfig = _load_kubeconfig(__opts__)
-    if kubeconfig is None:
+    config = _load_config(__opts__)
+    cache_key = _cache_key(username, token)
+    result = GROUPS_CACHE.get(cache_key)
+    if result is not GROUPS_CACHE.MISSING:
+        log.debug('Groups for "%s" (cached): %s', username, ", ".join(result))
+        return list(result)
+
+    clients = _load_clients(config)
+    if clients is None:
         log.info("Failed to load Kubernetes API client configuration")
         return []
 
-    result = _get_groups(kubeconfig, username, token)
+    result = _get_groups(clients.for_user(username, token))
     log.debug('Groups for "%s": %s', username, ", ".join(result))
+    GROUPS_CACHE.set(
+        cache_key,
+        list(result),
+        _token_ttl(token, config["cache_ttl"]),
+        config["cache_size"],
+    )
     return result
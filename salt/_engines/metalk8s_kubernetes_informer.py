@@ -0,0 +1,352 @@
+"""Engine keeping a local cache of some Kubernetes objects up-to-date.
+
+Pillar compilation and roster targeting used to LIST Nodes, Volumes and
+StorageClasses from the API server for every minion. Instead, this engine
+runs on the Salt master and, for each of these resources, performs a single
+LIST followed by a WATCH from the returned `resourceVersion` (re-listing if
+the watch expires with a "410 Gone"), maintaining in-memory indexes of the
+objects.
+
+The objects and indexes are published in the Salt master cache (bank
+`metalk8s/informer`), where they can be read by any master process through
+the `metalk8s_kubernetes.get_informer_store` utils function.
+
+Configuration example (in the Salt master configuration):
+
+.. code-block:: yaml
+
+    engines:
+      - metalk8s_kubernetes_informer:
+          kubeconfig: /etc/salt/master-kubeconfig.conf
+          watch_timeout: 60
+"""
+
+import datetime
+from functools import partial
+import json
+import logging
+import threading
+import time
+
+import salt.cache
+
+try:
+    import kubernetes.client
+    from kubernetes.client.rest import ApiException
+    from kubernetes.watch.watch import iter_resp_lines
+    from urllib3.exceptions import HTTPError
+
+    HAS_LIBS = True
+except ImportError:
+    HAS_LIBS = False
+
+
+log = logging.getLogger(__name__)
+
+__virtualname__ = "metalk8s_kubernetes_informer"
+
+INFORMER_BANK = "metalk8s/informer"
+ROLE_LABEL_PREFIX = "node-role.kubernetes.io/"
+
+
+def __virtual__():
+    if not HAS_LIBS:
+        return False, "Missing dependencies: kubernetes"
+
+    return __virtualname__
+
+
+def _serializable(value):
+    """Convert datetimes to ISO strings, so objects can be stored as is."""
+    if isinstance(value, dict):
+        return {key: _serializable(val) for key, val in value.items()}
+    if isinstance(value, list):
+        return [_serializable(val) for val in value]
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    return value
+
+
+class _Response(object):
+    """Minimal response object, as expected by `ApiClient.deserialize`."""
+
+    def __init__(self, line):
+        self.data = line
+
+
+def _project_node(node):
+    # Only keep what pillar and roster need, Node objects are rather large
+    return {
+        "metadata": {
+            "name": node["metadata"]["name"],
+            "labels": node["metadata"]["labels"] or {},
+            "annotations": node["metadata"]["annotations"] or {},
+        }
+    }
+
+
+def _index_node_roles(node):
+    return [
+        label[len(ROLE_LABEL_PREFIX) :]
+        for label in node["metadata"]["labels"]
+        if label.startswith(ROLE_LABEL_PREFIX) and label[len(ROLE_LABEL_PREFIX) :]
+    ]
+
+
+def _index_volume_node(volume):
+    return [volume["spec"].get("nodeName")]
+
+
+RESOURCES = {
+    "nodes": {
+        "manifest": {"kind": "Node", "apiVersion": "v1"},
+        "project": _project_node,
+        "indexes": {"role": _index_node_roles},
+    },
+    "storageclasses": {
+        "manifest": {"kind": "StorageClass", "apiVersion": "storage.k8s.io/v1"},
+    },
+    "volumes": {
+        "manifest": {
+            "kind": "Volume",
+            "apiVersion": "storage.metalk8s.scality.com/v1alpha1",
+        },
+        "indexes": {"node_name": _index_volume_node},
+    },
+}
+
+
+class Informer(object):
+    """Keep the objects of a single resource up-to-date using LIST+WATCH."""
+
+    def __init__(
+        self,
+        name,
+        manifest,
+        kubeconfig=None,
+        context=None,
+        project=None,
+        indexes=None,
+        watch_timeout=60,
+        publish_interval=1,
+    ):
+        self.name = name
+        self._manifest = manifest
+        self._kubeconfig = kubeconfig
+        self._context = context
+        self._project = project
+        self._index_funcs = indexes or {}
+        self._watch_timeout = watch_timeout
+        self._publish_interval = publish_interval
+
+        self._items = {}
+        self._resource_version = None
+        self._dirty = False
+        self._last_publish = 0
+        # Publishing may also happen from the flush timer thread
+        self._lock = threading.RLock()
+        self._flush_timer = None
+        self._cache = salt.cache.Cache(__opts__)
+        self._api_client = kubernetes.client.ApiClient()
+
+    def _list_func(self):
+        """Return the API method listing this resource, and its model.
+
+        The model is None for custom objects, for which the API returns plain
+        dicts.
+        """
+        kind_info = __utils__["metalk8s_kubernetes.get_kind_info"](self._manifest)
+        client = kind_info.client
+        client.configure(config_file=self._kubeconfig, context=self._context)
+
+        if hasattr(client, "plural"):
+            return (
+                partial(
+                    client.api.list_cluster_custom_object,
+                    client.group,
+                    client.version,
+                    client.plural,
+                ),
+                None,
+            )
+
+        return getattr(client.api, "list_{}".format(client.name)), kind_info.model
+
+    def _to_dict(self, obj):
+        obj = _serializable(obj)
+        if self._project is not None:
+            obj = self._project(obj)
+        return obj
+
+    def relist(self):
+        list_func, model = self._list_func()
+        result = list_func()
+
+        if model is None:
+            items = result["items"]
+            resource_version = result["metadata"]["resourceVersion"]
+        else:
+            items = [item.to_dict() for item in result.items]
+            resource_version = result.metadata.resource_version
+
+        objects = {}
+        for item in items:
+            obj = self._to_dict(item)
+            objects[obj["metadata"]["name"]] = obj
+
+        log.debug(
+            "Listed %d %s (resourceVersion: %s)",
+            len(objects),
+            self.name,
+            resource_version,
+        )
+        with self._lock:
+            self._resource_version = resource_version
+            self._items = objects
+            self._dirty = True
+            self.publish(force=True)
+
+    def watch(self):
+        """Watch for changes until the watch times out.
+
+        Raises: ApiException with status 410 when the `resourceVersion` is
+                too old, in which case the caller should re-list.
+        """
+        list_func, model = self._list_func()
+        response = list_func(
+            watch=True,
+            resource_version=self._resource_version,
+            timeout_seconds=self._watch_timeout,
+            _preload_content=False,
+        )
+
+        try:
+            for line in iter_resp_lines(response):
+                event = json.loads(line)
+                raw_obj = event["object"]
+
+                if event["type"] == "ERROR":
+                    raise ApiException(
+                        status=raw_obj.get("code"),
+                        reason="{}: {}".format(
+                            raw_obj.get("reason"), raw_obj.get("message")
+                        ),
+                    )
+
+                resource_version = raw_obj["metadata"]["resourceVersion"]
+
+                if model is None:
+                    obj = raw_obj
+                else:
+                    # Deserialize into the model, so we store the same
+                    # representation as `metalk8s_kubernetes.list_objects`
+                    obj = self._api_client.deserialize(
+                        _Response(line=json.dumps(raw_obj)), model.__name__
+                    ).to_dict()
+
+                obj = self._to_dict(obj)
+                name = obj["metadata"]["name"]
+                with self._lock:
+                    self._resource_version = resource_version
+                    if event["type"] == "DELETED":
+                        self._items.pop(name, None)
+                    else:
+                        self._items[name] = obj
+                    self._dirty = True
+                    self.publish()
+        finally:
+            response.close()
+            response.release_conn()
+
+        # Also acts as an heartbeat, so readers know the data is not stale
+        self.publish(force=True)
+
+    def indexes(self):
+        result = {}
+        for index_name, index_func in self._index_funcs.items():
+            index = result.setdefault(index_name, {})
+            for name, obj in self._items.items():
+                for value in index_func(obj):
+                    index.setdefault(value, []).append(name)
+        return result
+
+    def publish(self, force=False):
+        with self._lock:
+            now = time.time()
+            if not force:
+                if not self._dirty:
+                    return
+                delay = self._last_publish + self._publish_interval - now
+                if delay > 0:
+                    # Publish these changes once the interval has elapsed,
+                    # even if the watch stream stays idle until then
+                    if self._flush_timer is None:
+                        self._flush_timer = threading.Timer(delay, self._flush)
+                        self._flush_timer.daemon = True
+                        self._flush_timer.start()
+                    return
+
+            self._cache.store(
+                INFORMER_BANK,
+                self.name,
+                {
+                    "timestamp": now,
+                    "resource_version": self._resource_version,
+                    "items": self._items,
+                    "indexes": self.indexes(),
+                },
+            )
+            self._dirty = False
+            self._last_publish = now
+
+    def _flush(self):
+        with self._lock:
+            self._flush_timer = None
+            self.publish()
+
+    def run(self):
+        backoff = 1
+        while True:
+            try:
+                self.relist()
+                while True:
+                    self.watch()
+                    backoff = 1
+            except ApiException as exc:
+                if exc.status == 410:
+                    log.debug("Watch on %s expired, re-listing", self.name)
+                    continue
+                log.warning("Failed to watch %s: %s", self.name, exc)
+            except (HTTPError, ValueError) as exc:
+                log.warning("Failed to watch %s: %s", self.name, exc)
+            except Exception:  # pylint: disable=broad-except
+                log.exception("Unexpected error while watching %s", self.name)
+
+            time.sleep(backoff)
+            backoff = min(backoff * 2, 60)
+
+
+def start(kubeconfig=None, context=None, watch_timeout=60, publish_interval=1):
+    if kubeconfig is None:
+        kubeconfig = __opts__.get("kubernetes.kubeconfig")
+    if context is None:
+        context = __opts__.get("kubernetes.context")
+
+    threads = []
+    for name, options in RESOURCES.items():
+        informer = Informer(
+            name,
+            kubeconfig=kubeconfig,
+            context=context,
+            watch_timeout=watch_timeout,
+            publish_interval=publish_interval,
+            **options
+        )
+        thread = threading.Thread(
+            target=informer.run, name="informer-{}".format(name), daemon=True
+        )
+        thread.start()
+        threads.append(thread)
+
+    for thread in threads:
+        thread.join()
@@ -2,6 +2,7 @@
 """
 Module for handling MetalK8s specific calls.
 """
+import copy
 import functools
 import itertools
 import logging
@@ -193,29 +194,22 @@ def archive_info_from_tree(path):
 def archive_info_from_iso(path):
     """Extract archive information from an iso
 
+    The `PRODUCT.TXT` file is read directly from the ISO, and cached until the
+    ISO gets modified (see `metalk8s_iso.read_file` utility).
+
     Arguments:
         path (str): path to an iso
     """
     log.debug("Reading archive version from %r", path)
 
-    cmd = " ".join(
-        [
-            "isoinfo",
-            "-x",
-            r"/PRODUCT.TXT\;1",
-            "-i",
-            '"{}"'.format(path),
-        ]
-    )
-    result = __salt__["cmd.run_all"](cmd=cmd)
-    log.debug("Result: %r", result)
-
-    if result["retcode"] != 0:
+    try:
+        product_txt = __utils__["metalk8s_iso.read_file"](path, "PRODUCT.TXT")
+    except (OSError, ValueError) as exc:
         raise CommandExecutionError(
-            "Failed to run isoinfo: {}".format(result.get("stderr", result["stdout"]))
-        )
+            "Failed to read ISO {}: {}".format(path, exc)
+        ) from exc
 
-    return _get_archive_info(result["stdout"])
+    return _get_archive_info(product_txt or "")
 
 
 def get_archives(archives=None):
@@ -324,44 +318,71 @@ def format_slots(data):
 
     "__slots__:salt:module.function(arg1, arg2, kwarg1=abc, kwargs2=cde)
 
+    Only the dicts and lists containing slots (directly or not) are copied,
+    so `data` is returned as is if it does not contain any slot, and the
+    result may share some of its content with `data`.
+    Slots results are cached for the duration of the run (in `__context__`).
+
     Arguments:
         data: Data structure to format
     """
-    slots_callers = {"salt": __salt__}
-
     if isinstance(data, list):
-        return [format_slots(elt) for elt in data]
+        result = None
+        for index, value in enumerate(data):
+            new_value = format_slots(value)
+            if new_value is not value:
+                if result is None:
+                    result = list(data)
+                result[index] = new_value
+        return data if result is None else result
 
     if isinstance(data, dict):
-        return {key: format_slots(value) for key, value in data.items()}
+        result = None
+        for key, value in data.items():
+            new_value = format_slots(value)
+            if new_value is not value:
+                if result is None:
+                    result = dict(data)
+                result[key] = new_value
+        return data if result is None else result
 
     if isinstance(data, six.string_types) and data.startswith("__slot__:"):
-        fmt = data.split(":", 2)
-        if len(fmt) != 3:
-            log.warning(
-                "Malformed slot %s: expecting "
-                "'__slot__:<caller>:<module>.<function>(...)'",
-                data,
-            )
-            return data
-        if fmt[1] not in slots_callers:
-            log.warning(
-                "Malformed slot '%s': invalid caller, must use one of '%s'",
-                data,
-                "', '".join(slots_callers.keys()),
-            )
-            return data
+        return copy.deepcopy(_compute_slot(data))
 
-        fun, args, kwargs = salt.utils.args.parse_function(fmt[2])
+    return data
 
-        try:
-            return slots_callers[fmt[1]][fun](*args, **kwargs)
-        except Exception as exc:
-            raise CommandExecutionError(
-                "Unable to compute slot '{}'".format(data)
-            ) from exc
 
-    return data
+def _compute_slot(data):
+    slots_callers = {"salt": __salt__}
+
+    fmt = data.split(":", 2)
+    if len(fmt) != 3:
+        log.warning(
+            "Malformed slot %s: expecting "
+            "'__slot__:<caller>:<module>.<function>(...)'",
+            data,
+        )
+        return data
+    if fmt[1] not in slots_callers:
+        log.warning(
+            "Malformed slot '%s': invalid caller, must use one of '%s'",
+            data,
+            "', '".join(slots_callers.keys()),
+        )
+        return data
+
+    cache = __context__.setdefault("metalk8s.format_slots", {})
+    if data in cache:
+        return cache[data]
+
+    fun, args, kwargs = salt.utils.args.parse_function(fmt[2])
+
+    try:
+        result = cache[data] = slots_callers[fmt[1]][fun](*args, **kwargs)
+    except Exception as exc:
+        raise CommandExecutionError("Unable to compute slot '{}'".format(data)) from exc
+
+    return result
 
 
 def cmp_sorted(*args, **kwargs):
@@ -597,6 +618,8 @@ def get_from_map(value, saltenv=None):
 
     Also add logic to retrieve the saltenv using version in the pillar.
 
+    Rendered values are cached for the duration of the run (in `__context__`).
+
     Arguments:
 
         value (str): Name of the value to retrieve
@@ -636,15 +659,21 @@ def get_from_map(value, saltenv=None):
             path=path, value=value
         )
     )
-    return salt.template.compile_template(
-        ":string:",
-        salt.loader.render(__opts__, __salt__),
-        __opts__["renderer"],
-        __opts__["renderer_blacklist"],
-        __opts__["renderer_whitelist"],
-        input_data=tmplstr,
-        saltenv=saltenv,
-    )
+
+    cache = __context__.setdefault("metalk8s.get_from_map", {})
+    if (saltenv, value) not in cache:
+        cache[(saltenv, value)] = salt.template.compile_template(
+            ":string:",
+            salt.loader.render(__opts__, __salt__),
+            __opts__["renderer"],
+            __opts__["renderer_blacklist"],
+            __opts__["renderer_whitelist"],
+            input_data=tmplstr,
+            saltenv=saltenv,
+        )
+
+    # Callers may update the returned value
+    return copy.deepcopy(cache[(saltenv, value)])
 
 
 def _read_bootstrap_config():
@@ -8,6 +8,7 @@ This module's functions are merged into the `metalk8s_kubernetes`
 module when called by salt by virtue of its `__virtualname__` attribute.
 """
 
+from concurrent.futures import ThreadPoolExecutor
 import json
 import logging
 import operator
@@ -119,6 +120,14 @@ def _message_from_pods_dict(errors_dict):
     return "; ".join(msg_list)
 
 
+def _pod_key(pod, with_uid=False):
+    """Identify a pod by its namespace and name (and optionally its UID)."""
+    meta = pod["metadata"]
+    if with_uid:
+        return meta["namespace"], meta["name"], meta["uid"]
+    return meta["namespace"], meta["name"]
+
+
 # pod statuses
 POD_STATUS_SUCCEEDED = "Succeeded"
 POD_STATUS_FAILED = "Failed"
@@ -133,6 +142,10 @@ class Drain(object):
 
     # According to `kubectl` code, this value should be 1 second by default
     KUBECTL_INTERVAL = 1
+    # `kubectl` waits 5 seconds before retrying a rejected eviction, we then
+    # back off exponentially for each pod independently
+    EVICTION_RETRY_INTERVAL = 5
+    EVICTION_RETRY_MAX_INTERVAL = 30
     WARNING_MSG = {
         "daemonset": "Ignoring DaemonSet-managed pods",
         "localStorage": "Deleting pods with local storage",
@@ -159,6 +172,7 @@ class Drain(object):
         ignore_daemonset=False,
         timeout=0,
         delete_local_data=False,
+        max_concurrency=10,
         **kwargs
     ):
         self._node_name = node_name
@@ -167,7 +181,10 @@ class Drain(object):
         self._ignore_daemonset = ignore_daemonset
         self._timeout = timeout or (2 ** 64 - 1)
         self._delete_local_data = delete_local_data
+        self._max_concurrency = max(int(max_concurrency), 1)
         self._kwargs = kwargs
+        self._evicted_at = {}
+        self._controllers = {}
 
     node_name = property(operator.attrgetter("_node_name"))
     force = property(operator.attrgetter("_force"))
@@ -175,6 +192,7 @@ class Drain(object):
     ignore_daemonset = property(operator.attrgetter("_ignore_daemonset"))
     timeout = property(operator.attrgetter("_timeout"))
     delete_local_data = property(operator.attrgetter("_delete_local_data"))
+    max_concurrency = property(operator.attrgetter("_max_concurrency"))
 
     def localstorage_filter(self, pod):
         """Compute eviction status for the pod according to local storage.
@@ -219,6 +237,9 @@ class Drain(object):
     def get_controller(self, namespace, controller_ref):
         """Get the controller object from a reference to it
 
+        Results are cached for the lifetime of this drain, since many pods
+        usually share the same controller.
+
         Args:
           - namespace: the queried controller's namespace
           - controller_ref: the queried controller's reference
@@ -227,13 +248,21 @@ class Drain(object):
           - None if not found
         Raises: CommandExecutionError if API fails
         """
-        return __salt__["metalk8s_kubernetes.get_object"](
-            name=controller_ref["name"],
-            kind=controller_ref["kind"],
-            apiVersion=controller_ref["api_version"],
-            namespace=namespace,
-            **self._kwargs
+        key = (
+            namespace,
+            controller_ref["api_version"],
+            controller_ref["kind"],
+            controller_ref["name"],
         )
+        if key not in self._controllers:
+            self._controllers[key] = __salt__["metalk8s_kubernetes.get_object"](
+                name=controller_ref["name"],
+                kind=controller_ref["kind"],
+                apiVersion=controller_ref["api_version"],
+                namespace=namespace,
+                **self._kwargs
+            )
+        return self._controllers[key]
 
     def get_pod_controller(self, pod):
         """Get a pod's controller object reference
@@ -389,30 +418,70 @@ class Drain(object):
     def evict_pods(self, pods):
         """Trigger the eviction process for all pods passed.
 
+        Evictions are created concurrently (at most `max_concurrency` at
+        once), and pods for which the eviction is rejected (e.g. because of
+        a disruption budget) are retried independently with a backoff, so
+        they do not delay the eviction of other pods.
+
         Args:
           - pods: list of Kubernetes API pods to evict
         Returns: None
         Raises: DrainTimeoutException if the eviction process is not complete
                 after the specified timeout value
+                CommandExecutionError if an eviction failed
         """
         self.start_timer()
-        for pod in pods:
-            while self.check_timer():
-                evicted = evict_pod(
-                    name=pod["metadata"]["name"],
-                    namespace=pod["metadata"]["namespace"],
-                    grace_period=self.grace_period,
-                    **self._kwargs
-                )
-                if evicted:
-                    break
-                time.sleep(5)  # kubectl waits 5 seconds
+
+        pending = list(pods)
+        attempts = {}
+        retry_at = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            while pending and self.check_timer():
+                now = time.time()
+                ready = [
+                    pod for pod in pending if retry_at.get(_pod_key(pod), 0) <= now
+                ]
+                if not ready:
+                    # Do not wait past the drain timeout for the next retry
+                    next_retry = min(retry_at[_pod_key(pod)] for pod in pending)
+                    deadline = self._start + self.timeout
+                    time.sleep(max(min(next_retry, deadline) - now, 0))
+                    if next_retry > deadline:
+                        raise self._timeout_exception()
+                    continue
+
+                results = executor.map(self._evict_pod, ready)
+                for pod, evicted in zip(ready, results):
+                    if evicted:
+                        self._evicted_at[_pod_key(pod)] = time.time()
+                        pending.remove(pod)
+                        continue
+
+                    key = _pod_key(pod)
+                    attempts[key] = attempts.get(key, 0) + 1
+                    retry_at[key] = time.time() + min(
+                        self.EVICTION_RETRY_INTERVAL * 2 ** (attempts[key] - 1),
+                        self.EVICTION_RETRY_MAX_INTERVAL,
+                    )
 
         self.wait_for_eviction(pods)
 
+    def _evict_pod(self, pod):
+        return evict_pod(
+            name=pod["metadata"]["name"],
+            namespace=pod["metadata"]["namespace"],
+            grace_period=self.grace_period,
+            **self._kwargs
+        )
+
     def wait_for_eviction(self, pods):
         """Wait for pods deletion.
 
+        A single LIST of the pods scheduled on the node is issued on each
+        tick, a pod being considered evicted once no pod with the same
+        namespace, name and UID is returned.
+
         Args:
           - pods: the list of pods on which eviction was triggered, for which
                   we wait until they are no longer present in API queries.
@@ -422,20 +491,34 @@ class Drain(object):
         """
         while self.check_timer():
             self.tick(self.KUBECTL_INTERVAL)
-            pending = []
-            for pod in pods:
-                response = __salt__["metalk8s_kubernetes.get_object"](
+            remaining = set(
+                _pod_key(pod, with_uid=True)
+                for pod in __salt__["metalk8s_kubernetes.list_objects"](
                     kind="Pod",
                     apiVersion="v1",
-                    name=pod["metadata"]["name"],
-                    namespace=pod["metadata"]["namespace"],
+                    all_namespaces=True,
+                    field_selector="spec.nodeName={0}".format(self.node_name),
+                    fields=["metadata.namespace", "metadata.name", "metadata.uid"],
                     **self._kwargs
                 )
-                if (
-                    not response
-                    or response["metadata"]["uid"] != pod["metadata"]["uid"]
-                ):
-                    log.info("%s evicted", pod["metadata"]["name"])
+            )
+
+            pending = []
+            for pod in pods:
+                if _pod_key(pod, with_uid=True) not in remaining:
+                    evicted_at = self._evicted_at.get(_pod_key(pod))
+                    if evicted_at is None:
+                        # Eviction not created by this drainer
+                        log.info(
+                            "%s evicted (eviction creation time unknown)",
+                            pod["metadata"]["name"],
+                        )
+                    else:
+                        log.info(
+                            "%s evicted (%.1f seconds after eviction creation)",
+                            pod["metadata"]["name"],
+                            time.time() - evicted_at,
+                        )
                 else:
                     log.debug(
                         "Waiting for eviction of Pod %s (current status: %s)",
@@ -454,11 +537,14 @@ class Drain(object):
 
     def check_timer(self):
         if time.time() - self._start > self.timeout:
-            raise DrainTimeoutException(
-                "Drain did not complete within {0} seconds".format(self.timeout)
-            )
+            raise self._timeout_exception()
         return True
 
+    def _timeout_exception(self):
+        return DrainTimeoutException(
+            "Drain did not complete within {0} seconds".format(self.timeout)
+        )
+
     def tick(self, interval):
         last_tick = getattr(self, "_tick", None)
         if last_tick is not None:
@@ -536,6 +622,7 @@ def node_drain(
     timeout=0,
     delete_local_data=False,
     dry_run=False,
+    max_concurrency=10,
     **kwargs
 ):
     """Trigger the drain process for a node.
@@ -547,6 +634,7 @@ def node_drain(
       - timeout           : drain process timeout value
       - delete_local_data : force deletion for pods with local storage
       - dry_run           : only run pod selection process, not eviction
+      - max_concurrency   : maximum number of evictions created at once
 
     Keyword args: connection parameters, passed through to connection utility
                   module.
@@ -561,6 +649,7 @@ def node_drain(
         ignore_daemonset=ignore_daemonset,
         timeout=timeout,
         delete_local_data=delete_local_data,
+        max_concurrency=max_concurrency,
         **kwargs
     )
     __salt__["metalk8s_kubernetes.cordon_node"](node_name, **kwargs)
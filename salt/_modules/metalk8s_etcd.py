@@ -2,7 +2,11 @@
 """
 Module for handling etcd client specific calls.
 """
+import concurrent.futures
+import contextlib
 import logging
+import os
+import threading
 
 from salt.ext.six.moves.urllib.parse import urlparse
 from salt.exceptions import CommandExecutionError
@@ -10,6 +14,7 @@ from salt.exceptions import CommandExecutionError
 PYTHON_ETCD_PRESENT = False
 try:
     import etcd3
+    from etcd3 import etcdrpc
 
     PYTHON_ETCD_PRESENT = True
 except ImportError:
@@ -17,6 +22,9 @@ except ImportError:
 
 # Timeout when connection to etcd server
 TIMEOUT = 30
+# Timeout when checking the status of an etcd server (as `etcdctl endpoint
+# health` does)
+PROBE_TIMEOUT = 5
 
 
 log = logging.getLogger(__name__)
@@ -31,28 +39,119 @@ def __virtual__():
         return False, "python-etcd3 not available"
 
 
-def _get_endpoint_up(ca_cert, cert_key, cert_cert, nodes=None):
-    """Pick an answering etcd endpoint among all etcd servers."""
-    etcd_hosts = __salt__["metalk8s.minions_by_role"]("etcd", nodes=nodes)
+# Clients are kept around (keyed by endpoint and certificates, including their
+# modification times), so that gRPC channels (and their TLS sessions) get
+# reused across calls
+_CLIENTS = {}
+_CLIENTS_LOCK = threading.Lock()
 
-    # Get host ip from etcd_hosts
-    cp_ips = __salt__["saltutil.runner"]("mine.get", tgt="*", fun="control_plane_ip")
-    endpoints = [cp_ips[host] for host in etcd_hosts if host in cp_ips]
 
-    for endpoint in endpoints:
+def _get_mtimes(paths):
+    mtimes = []
+    for path in paths:
         try:
-            with etcd3.client(
-                host=endpoint,
+            mtimes.append(os.stat(path).st_mtime_ns)
+        except OSError:
+            # Let the `etcd3` library report the issue
+            mtimes.append(None)
+    return tuple(mtimes)
+
+
+@contextlib.contextmanager
+def _client(host, ca_cert, cert_key, cert_cert, port=None):
+    """Retrieve a pooled etcd client, dropped from the pool if a call fails."""
+    cert_files = (ca_cert, cert_key, cert_cert)
+    key = (host, port, cert_files, _get_mtimes(cert_files))
+    stale_clients = []
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(key)
+        if client is None:
+            # Drop clients using a previous version of these certificates
+            # (e.g. before their renewal)
+            for stale_key in list(_CLIENTS):
+                if stale_key[:3] == key[:3]:
+                    stale_clients.append(_CLIENTS.pop(stale_key))
+
+            kwargs = {"port": port} if port is not None else {}
+            client = _CLIENTS[key] = etcd3.client(
+                host=host,
                 ca_cert=ca_cert,
                 cert_key=cert_key,
                 cert_cert=cert_cert,
                 timeout=TIMEOUT,
-            ) as etcd:
-                etcd.status()
-        except etcd3.exceptions.ConnectionFailedError:
-            pass
-        else:
+                **kwargs
+            )
+
+    for stale_client in stale_clients:
+        stale_client.close()
+
+    try:
+        yield client
+    except Exception:
+        with _CLIENTS_LOCK:
+            if _CLIENTS.get(key) is client:
+                del _CLIENTS[key]
+        client.close()
+        raise
+
+
+def _probe_endpoints(endpoints, ca_cert, cert_key, cert_cert):
+    """Check the status of several endpoints concurrently.
+
+    Endpoints are `(host, port)` tuples, `port` being None for the default
+    one. Yields endpoints as soon as their status is known, along with the
+    exception raised if unhealthy, each probe taking at most `PROBE_TIMEOUT`
+    seconds.
+    """
+
+    def _probe(endpoint):
+        host, port = endpoint
+        with _client(host, ca_cert, cert_key, cert_cert, port=port) as etcd:
+            # A single `Status` call, with its own deadline (unlike
+            # `etcd.status()`, also listing members, using `TIMEOUT`), so
+            # that pending probes do not outlive the caller for long
+            etcd.maintenancestub.Status(
+                etcdrpc.StatusRequest(),
+                PROBE_TIMEOUT,
+                credentials=etcd.call_credentials,
+                metadata=etcd.metadata,
+            )
+
+    if not endpoints:
+        return
+
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=len(endpoints))
+    futures = {executor.submit(_probe, endpoint): endpoint for endpoint in endpoints}
+    try:
+        for future in concurrent.futures.as_completed(futures, timeout=PROBE_TIMEOUT):
+            yield futures[future], future.exception()
+    except concurrent.futures.TimeoutError:
+        for future, endpoint in futures.items():
+            if not future.done():
+                yield endpoint, Exception("Timed out")
+    finally:
+        # Do not wait for pending probes (e.g. once an endpoint answered),
+        # they end on their own deadline
+        executor.shutdown(wait=False)
+
+
+def _get_endpoint_up(ca_cert, cert_key, cert_cert, nodes=None):
+    """Pick an answering etcd endpoint among all etcd servers.
+
+    All servers are probed concurrently, the first one answering wins.
+    """
+    etcd_hosts = __salt__["metalk8s.minions_by_role"]("etcd", nodes=nodes)
+
+    # Get host ip from etcd_hosts
+    cp_ips = __salt__["saltutil.runner"]("mine.get", tgt="*", fun="control_plane_ip")
+    endpoints = [(cp_ips[host], None) for host in etcd_hosts if host in cp_ips]
+
+    for (endpoint, _), exc in _probe_endpoints(
+        endpoints, ca_cert=ca_cert, cert_key=cert_key, cert_cert=cert_cert
+    ):
+        if exc is None:
             return endpoint
+        log.debug("etcd endpoint %s is not available: %s", endpoint, exc)
 
     raise Exception("Unable to find an available etcd member in the cluster")
 
@@ -79,13 +178,7 @@ def add_etcd_node(
             ca_cert=ca_cert, cert_key=cert_key, cert_cert=cert_cert
         )
 
-    with etcd3.client(
-        host=endpoint,
-        ca_cert=ca_cert,
-        cert_key=cert_key,
-        cert_cert=cert_cert,
-        timeout=TIMEOUT,
-    ) as etcd:
+    with _client(endpoint, ca_cert, cert_key, cert_cert) as etcd:
         node = etcd.add_member(peer_urls)
 
     return node
@@ -105,13 +198,7 @@ def urls_exist_in_cluster(
             ca_cert=ca_cert, cert_key=cert_key, cert_cert=cert_cert
         )
 
-    with etcd3.client(
-        host=endpoint,
-        ca_cert=ca_cert,
-        cert_key=cert_key,
-        cert_cert=cert_cert,
-        timeout=TIMEOUT,
-    ) as etcd:
+    with _client(endpoint, ca_cert, cert_key, cert_cert) as etcd:
         all_urls = []
         for member in etcd.members:
             all_urls.extend(member.peer_urls)
@@ -142,34 +229,32 @@ def check_etcd_health(
             ca_cert=ca_cert, cert_key=cert_key, cert_cert=cert_cert
         )
     # Get all members
-    with etcd3.client(
-        host=endpoint,
-        ca_cert=ca_cert,
-        cert_key=cert_key,
-        cert_cert=cert_cert,
-        timeout=TIMEOUT,
-    ) as etcd:
+    with _client(endpoint, ca_cert, cert_key, cert_cert) as etcd:
         etcd_members = list(etcd.members)
 
-    unhealthy_member = 0
+    # Probe all members concurrently, so that unavailable ones do not add up
+    members_by_endpoint = {}
     for member in etcd_members:
         etcd_url = urlparse(member.client_urls[0])
-        try:
-            with etcd3.client(
-                host=etcd_url.hostname,
-                port=etcd_url.port,
-                ca_cert=ca_cert,
-                cert_key=cert_key,
-                cert_cert=cert_cert,
-                timeout=TIMEOUT,
-            ) as etcd:
-                etcd.status()
-        except Exception:  # pylint: disable=broad-except
-            log.debug("failed to check the health of member %s", member.name)
+        members_by_endpoint[(etcd_url.hostname, etcd_url.port)] = member
+
+    unhealthy_member = 0
+    for endpoint, exc in _probe_endpoints(
+        list(members_by_endpoint),
+        ca_cert=ca_cert,
+        cert_key=cert_key,
+        cert_cert=cert_cert,
+    ):
+        if exc is not None:
+            log.debug(
+                "failed to check the health of member %s: %s",
+                members_by_endpoint[endpoint].name,
+                exc,
+            )
             unhealthy_member += 1
 
     # Raise on error as this function will be called by module.run in sls file
-    if unhealthy_member == len(etcd_members):
+    if unhealthy_member == len(members_by_endpoint):
         raise CommandExecutionError("cluster is unavailable")
     elif unhealthy_member > 0:
         raise CommandExecutionError("cluster is degraded")
@@ -194,13 +279,7 @@ def get_etcd_member_list(
         except Exception:  # pylint: disable=broad-except
             return []
 
-    with etcd3.client(
-        host=endpoint,
-        ca_cert=ca_cert,
-        cert_key=cert_key,
-        cert_cert=cert_cert,
-        timeout=TIMEOUT,
-    ) as etcd:
+    with _client(endpoint, ca_cert, cert_key, cert_cert) as etcd:
         return [
             {
                 "id": member.id,
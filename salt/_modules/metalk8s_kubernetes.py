@@ -76,6 +76,18 @@ def _handle_error(exception, action):
         raise CommandExecutionError(base_msg) from exception
 
 
+def _from_raw(data, model, raw=False):
+    """Convert an object loaded from a raw API response (i.e. JSON).
+
+    Unless `raw` is set, the object is converted to the same snake case dict as
+    returned by `model.to_dict()`, without building the (costly) Python
+    objects in between.
+    """
+    if raw:
+        return data
+    return __utils__["metalk8s_kubernetes.convert_raw_object"](data, model)
+
+
 def _object_manipulation_function(action):
     """Generate an execution function based on a CRUD method to use."""
     assert action in (
@@ -97,6 +109,8 @@ def _object_manipulation_function(action):
         template="jinja",
         defaults=None,
         saltenv="base",
+        dry_run=False,
+        raw=False,
         **kwargs
     ):
         if manifest is None:
@@ -146,16 +160,23 @@ def _object_manipulation_function(action):
             )
 
         # Format slots on the manifest
+        # NOTE: The manifest is only copied if it contains slots, so only
+        # update copies of it (or of its sub-dicts) below
         manifest = __salt__.metalk8s.format_slots(manifest)
 
         # Adding label containing metalk8s version (retrieved from saltenv)
         if action in ["create", "replace"]:
             match = re.search(r"^metalk8s-(?P<version>.+)$", saltenv)
-            manifest.setdefault("metadata", {}).setdefault("labels", {})[
-                "metalk8s.scality.com/version"
-            ] = (match.group("version") if match else "unknown")
-            manifest["metadata"]["labels"]["app.kubernetes.io/managed-by"] = "salt"
-            manifest["metadata"]["labels"]["heritage"] = "salt"
+            manifest = dict(manifest)
+            manifest["metadata"] = dict(manifest.get("metadata") or {})
+            labels = manifest["metadata"]["labels"] = dict(
+                manifest["metadata"].get("labels") or {}
+            )
+            labels["metalk8s.scality.com/version"] = (
+                match.group("version") if match else "unknown"
+            )
+            labels["app.kubernetes.io/managed-by"] = "salt"
+            labels["heritage"] = "salt"
 
         log.debug("%sing object with manifest: %s", action[:-1].capitalize(), manifest)
 
@@ -182,7 +203,8 @@ def _object_manipulation_function(action):
             if patch:
                 call_kwargs["body"] = patch
             else:
-                call_kwargs["body"] = manifest
+                call_kwargs["body"] = dict(manifest)
+                call_kwargs["body"]["metadata"] = dict(manifest["metadata"])
                 # When patching remove "searching" key like kind and apiVersion
                 call_kwargs["body"].pop("kind")
                 call_kwargs["body"].pop("apiVersion")
@@ -192,6 +214,15 @@ def _object_manipulation_function(action):
         elif action != "retrieve":
             call_kwargs["body"] = obj
 
+        if dry_run and action != "retrieve":
+            # Let the API server process the request without persisting it
+            call_kwargs["dry_run"] = "All"
+
+        model = getattr(kind_info, "model", None)
+        if action == "retrieve" and model is not None:
+            # Skip the deserialization into Python models, see `list_objects`
+            call_kwargs["_preload_content"] = False
+
         if action == "replace" and old_object:
             # Some attributes have to be preserved
             # otherwise exceptions will be thrown
@@ -224,6 +255,9 @@ def _object_manipulation_function(action):
         except (ApiException, HTTPError) as exc:
             return _handle_error(exc, action)
 
+        if call_kwargs.get("_preload_content") is False:
+            return _from_raw(json.loads(result.data), model, raw)
+
         # NOTE: result is always either a standard `kubernetes.client` model,
         # or a `CustomObject` as defined in the __utils__ module.
         return result.to_dict()
@@ -239,6 +273,9 @@ def _object_manipulation_function(action):
     if action in ["create", "replace"]:
         method.__doc__ = """{base_doc}
 
+    Use `dry_run=True` to get the object as it would be persisted by the API
+    server, without actually persisting it.
+
     CLI Examples:
 
     .. code-block:: bash
@@ -269,6 +306,9 @@ def _object_manipulation_function(action):
     Ability to {verb} an object using object description 'name', 'kind'
     and 'apiVersion'.
 
+    When retrieving an object, use `raw=True` to get it as returned by the API
+    server (i.e. with camel case keys).
+
     CLI Examples:
 
     .. code-block:: bash
@@ -337,26 +377,52 @@ def object_exists(kind, apiVersion, name, **kwargs):
     return get_object(kind=kind, apiVersion=apiVersion, name=name, **kwargs) is not None
 
 
+def _project(obj, fields):
+    """Only keep some fields (dotted paths, e.g. "metadata.name") of an object.
+
+    Missing fields are set to None, and lists are never traversed (i.e.
+    "spec.containers.name" is not supported, "spec.containers" is).
+    """
+    result = {}
+    for path in fields:
+        value = obj
+        *parents, leaf = path.split(".")
+        target = result
+        for key in parents:
+            value = value.get(key) if isinstance(value, dict) else None
+            target = target.setdefault(key, {})
+        target[leaf] = value.get(leaf) if isinstance(value, dict) else None
+    return result
+
+
 # Listing resources can benefit from a simpler signature
-def list_objects(
+def iter_objects(
     kind,
     apiVersion,
     namespace="default",
     all_namespaces=False,
     field_selector=None,
     label_selector=None,
+    fields=None,
+    chunk_size=500,
+    raw=False,
     **kwargs
 ):
     """
-    List all objects of a type using some object description.
+    Iterate over all objects of a type using some object description.
 
-    CLI Examples:
+    Objects are retrieved from the API server by chunks of `chunk_size`
+    objects (set it to 0 to retrieve all of them at once), so that only one
+    chunk is loaded in memory at a time.
 
-    .. code-block:: bash
+    Objects are returned as snake case dicts (as done by `to_dict` on
+    `kubernetes.client` models), or as returned by the API server (i.e. with
+    camel case keys) if `raw` is set.
+    Use `fields` to only keep some fields of each object, as a list (or a
+    comma-separated string) of dotted paths using the same case as the
+    returned objects, e.g. `fields="metadata.name,spec.node_name"`.
 
-        salt-call metalk8s_kubernetes.list_objects kind="Pod" apiVersion="v1"
-        salt-call metalk8s_kubernetes.list_objects kind="Pod" apiVersion="v1" namespace="kube-system"
-        salt-call metalk8s_kubernetes.list_objects kind="Pod" apiVersion="v1" all_namespaces=True field_selector="spec.nodeName=bootstrap"
+    NOTE: This is a generator, use `list_objects` from the CLI.
     """
     try:
         kind_info = __utils__["metalk8s_kubernetes.get_kind_info"](
@@ -370,6 +436,9 @@ def list_objects(
             'Unsupported resource "{}/{}"'.format(apiVersion, kind)
         ) from exc
 
+    if isinstance(fields, str):
+        fields = fields.split(",")
+
     call_kwargs = {}
     if all_namespaces:
         call_kwargs["all_namespaces"] = True
@@ -379,21 +448,88 @@ def list_objects(
         call_kwargs["field_selector"] = field_selector
     if label_selector:
         call_kwargs["label_selector"] = label_selector
+    if chunk_size:
+        call_kwargs["limit"] = int(chunk_size)
+
+    model = getattr(kind_info, "model", None)
+    if model is not None:
+        # Deserializing into Python models, to then call `to_dict` on each
+        # of them, is really slow for big lists, we rather load the JSON
+        # body ourselves (custom objects are already returned as dicts)
+        call_kwargs["_preload_content"] = False
 
     kubeconfig, context = __salt__["metalk8s_kubernetes.get_kubeconfig"](**kwargs)
 
     client = kind_info.client
     client.configure(config_file=kubeconfig, context=context)
 
-    try:
-        result = client.list(**call_kwargs)
-    except (ApiException, HTTPError) as exc:
-        base_msg = 'Failed to list resources "{}/{}"'.format(apiVersion, kind)
-        if "namespace" in call_kwargs:
-            base_msg += ' in namespace "{}"'.format(namespace)
-        raise CommandExecutionError(base_msg) from exc
-
-    return [obj.to_dict() for obj in result.items]
+    while True:
+        try:
+            result = client.list(**call_kwargs)
+        except (ApiException, HTTPError) as exc:
+            base_msg = 'Failed to list resources "{}/{}"'.format(apiVersion, kind)
+            if "namespace" in call_kwargs:
+                base_msg += ' in namespace "{}"'.format(namespace)
+            raise CommandExecutionError(base_msg) from exc
+
+        if model is not None:
+            chunk = json.loads(result.data)
+        else:
+            chunk = result.to_dict()
+        # Only keep the loaded chunk in memory
+        del result
+
+        for obj in chunk["items"] or []:
+            if model is not None:
+                obj = _from_raw(obj, model, raw)
+            yield _project(obj, fields) if fields else obj
+
+        continue_token = (chunk.get("metadata") or {}).get("continue")
+        if not continue_token:
+            return
+        call_kwargs["_continue"] = continue_token
+
+
+def list_objects(
+    kind,
+    apiVersion,
+    namespace="default",
+    all_namespaces=False,
+    field_selector=None,
+    label_selector=None,
+    fields=None,
+    chunk_size=500,
+    raw=False,
+    **kwargs
+):
+    """
+    List all objects of a type using some object description.
+
+    See `iter_objects` for details about `fields`, `chunk_size` and `raw`.
+
+    CLI Examples:
+
+    .. code-block:: bash
+
+        salt-call metalk8s_kubernetes.list_objects kind="Pod" apiVersion="v1"
+        salt-call metalk8s_kubernetes.list_objects kind="Pod" apiVersion="v1" namespace="kube-system"
+        salt-call metalk8s_kubernetes.list_objects kind="Pod" apiVersion="v1" all_namespaces=True field_selector="spec.nodeName=bootstrap"
+        salt-call metalk8s_kubernetes.list_objects kind="Pod" apiVersion="v1" all_namespaces=True fields="metadata.name,spec.node_name"
+    """
+    return list(
+        iter_objects(
+            kind=kind,
+            apiVersion=apiVersion,
+            namespace=namespace,
+            all_namespaces=all_namespaces,
+            field_selector=field_selector,
+            label_selector=label_selector,
+            fields=fields,
+            chunk_size=chunk_size,
+            raw=raw,
+            **kwargs
+        )
+    )
 
 
 def get_object_digest(path=None, checksum="sha256", *args, **kwargs):
@@ -118,6 +118,18 @@ def ping(**kwargs):
     return True
 
 
+def client_cache_info():
+    """Retrieve statistics about the cached Kubernetes API clients.
+
+    Clients are reused across calls for a given kubeconfig and context, the
+    hit/miss counters allow to confirm this reuse.
+
+    CLI Example:
+        salt '*' metalk8s_kubernetes.client_cache_info
+    """
+    return __utils__["metalk8s_kubernetes.client_cache_info"]()
+
+
 def read_and_render_yaml_file(source, template, context=None, saltenv="base"):
     """
     Read a yaml file and, if needed, renders that using the specifieds
@@ -270,29 +270,22 @@ def _archive_info_from_manifest(manifest):
 def manifest_from_iso(path):
     """Extract the manifest from a Solution ISO
 
+    The manifest is read directly from the ISO, and cached until the ISO gets
+    modified (see `metalk8s_iso.read_file` utility).
+
     Arguments:
         path (str): path to an ISO
     """
     log.debug("Reading Solution archive version from %r", path)
 
-    cmd = " ".join(
-        [
-            "isoinfo",
-            "-x",
-            r"/{}\;1".format(SOLUTION_MANIFEST.upper()),
-            "-i",
-            '"{}"'.format(path),
-        ]
-    )
-    result = __salt__["cmd.run_all"](cmd=cmd)
-    log.debug("Result: %r", result)
-
-    if result["retcode"] != 0:
+    try:
+        content = __utils__["metalk8s_iso.read_file"](path, SOLUTION_MANIFEST.upper())
+    except (OSError, ValueError) as exc:
         raise CommandExecutionError(
-            "Failed to run isoinfo: {}".format(result.get("stderr", result["stdout"]))
-        )
+            "Failed to read ISO {}: {}".format(path, exc)
+        ) from exc
 
-    if not result["stdout"]:
+    if not content:
         raise CommandExecutionError(
             "Solution ISO at '{}' must contain a '{}' file".format(
                 path, SOLUTION_MANIFEST
@@ -300,7 +293,7 @@ def manifest_from_iso(path):
         )
 
     try:
-        manifest = yaml.safe_load(result["stdout"])
+        manifest = yaml.safe_load(content)
     except yaml.YAMLError as exc:
         raise CommandExecutionError(
             "Failed to load YAML from Solution manifest {}".format(path)
@@ -0,0 +1,275 @@
+"""Utility methods to plan the upgrade of several MetalK8s nodes at once.
+
+Nodes hosting control-plane or etcd components are always upgraded one by
+one. Other nodes get grouped in "waves", each wave being drained and upgraded
+in parallel, such that draining all nodes of a wave at the same time:
+
+- does not exceed the number of disruptions allowed by any
+  PodDisruptionBudget,
+- does not evict several replicas of a workload spread using (required)
+  pod anti-affinity,
+- only impacts a single topology domain (e.g. zone).
+"""
+
+import collections
+import logging
+
+from salt.exceptions import CommandExecutionError
+
+
+log = logging.getLogger(__name__)
+
+__virtualname__ = "metalk8s_upgrade"
+
+ROLE_LABEL_PREFIX = "node-role.kubernetes.io/"
+SERIAL_ROLES = frozenset(["master", "etcd"])
+DEFAULT_TOPOLOGY_LABEL = "topology.kubernetes.io/zone"
+
+# pod statuses
+POD_STATUS_SUCCEEDED = "Succeeded"
+POD_STATUS_FAILED = "Failed"
+
+# Only retrieve what is needed to plan the waves, Pods may be numerous
+POD_FIELDS = [
+    "metadata.name",
+    "metadata.namespace",
+    "metadata.labels",
+    "metadata.owner_references",
+    "spec.node_name",
+    "spec.affinity",
+    "status.phase",
+]
+
+
+def __virtual__():
+    return __virtualname__
+
+
+def _node_roles(labels):
+    return set(
+        label[len(ROLE_LABEL_PREFIX) :]
+        for label in labels
+        if label.startswith(ROLE_LABEL_PREFIX)
+    )
+
+
+def _parse_max_unavailable(value, total):
+    """Compute the maximum number of nodes per wave.
+
+    `value` is either an absolute number of nodes or a percentage (e.g.
+    "25%") of `total`, always rounded down to at least 1 node.
+    """
+    try:
+        if isinstance(value, str) and value.endswith("%"):
+            result = int(total * float(value[:-1]) / 100)
+        else:
+            result = int(value)
+    except (TypeError, ValueError) as exc:
+        raise CommandExecutionError(
+            'Invalid max_unavailable "{}", must be a number of nodes or a '
+            'percentage (e.g. "25%")'.format(value)
+        ) from exc
+
+    return max(result, 1)
+
+
+def _match_selector(selector, labels):
+    """Check if some labels match a label selector.
+
+    Note that, as for a PodDisruptionBudget, an empty selector does not
+    match anything.
+    """
+    if not selector:
+        return False
+
+    match_labels = selector.get("match_labels") or {}
+    match_expressions = selector.get("match_expressions") or []
+    if not match_labels and not match_expressions:
+        return False
+
+    for key, value in match_labels.items():
+        if labels.get(key) != value:
+            return False
+
+    for expr in match_expressions:
+        operator = expr["operator"]
+        values = expr.get("values") or []
+        if operator == "In":
+            matched = expr["key"] in labels and labels[expr["key"]] in values
+        elif operator == "NotIn":
+            matched = expr["key"] not in labels or labels[expr["key"]] not in values
+        elif operator == "Exists":
+            matched = expr["key"] in labels
+        elif operator == "DoesNotExist":
+            matched = expr["key"] not in labels
+        else:
+            raise CommandExecutionError(
+                'Unsupported label selector operator "{}"'.format(operator)
+            )
+        if not matched:
+            return False
+
+    return True
+
+
+def _anti_affinity_group(pod):
+    """Identify the workload of a pod using required pod anti-affinity.
+
+    Returns None if the pod does not use anti-affinity, or has no controller.
+    """
+    affinity = pod["spec"].get("affinity") or {}
+    anti_affinity = affinity.get("pod_anti_affinity") or {}
+    if not anti_affinity.get("required_during_scheduling_ignored_during_execution"):
+        return None
+
+    for owner_ref in pod["metadata"].get("owner_references") or []:
+        if owner_ref.get("controller"):
+            return (pod["metadata"]["namespace"], owner_ref["kind"], owner_ref["name"])
+
+    return None
+
+
+def _plan_parallel_waves(nodes, node_labels, pods, pdbs, limit, topology_label):
+    # Pods currently running on each node
+    node_pods = {node: [] for node in nodes}
+    for pod in pods:
+        node = pod["spec"].get("node_name")
+        if node in node_pods and pod["status"]["phase"] not in (
+            POD_STATUS_SUCCEEDED,
+            POD_STATUS_FAILED,
+        ):
+            node_pods[node].append(pod)
+
+    # Number of pods covered by each PodDisruptionBudget, on each node
+    allowed = {}
+    node_budgets = {node: collections.Counter() for node in nodes}
+    for pdb in pdbs:
+        key = (pdb["metadata"]["namespace"], pdb["metadata"]["name"])
+        allowed[key] = (pdb.get("status") or {}).get("disruptions_allowed") or 0
+        for node, pods_on_node in node_pods.items():
+            for pod in pods_on_node:
+                if pod["metadata"]["namespace"] == key[0] and _match_selector(
+                    pdb["spec"].get("selector"), pod["metadata"].get("labels") or {}
+                ):
+                    node_budgets[node][key] += 1
+
+    node_groups = {
+        node: set(filter(None, map(_anti_affinity_group, pods_on_node)))
+        for node, pods_on_node in node_pods.items()
+    }
+
+    def _domain(node):
+        if not topology_label:
+            return None
+        return node_labels[node].get(topology_label)
+
+    waves = []
+    remaining = list(nodes)
+    while remaining:
+        # A node always fits in an empty wave, if it cannot be drained without
+        # breaking a budget then the drain will wait for it
+        wave = [remaining[0]]
+        usage = collections.Counter(node_budgets[remaining[0]])
+        groups = set(node_groups[remaining[0]])
+
+        for node in remaining[1:]:
+            if len(wave) >= limit:
+                break
+            if _domain(node) != _domain(wave[0]):
+                continue
+            if groups & node_groups[node]:
+                continue
+            new_usage = usage + node_budgets[node]
+            if any(new_usage[key] > allowed[key] for key in node_budgets[node]):
+                continue
+
+            wave.append(node)
+            usage = new_usage
+            groups |= node_groups[node]
+
+        waves.append(wave)
+        remaining = [node for node in remaining if node not in wave]
+
+    return waves
+
+
+def plan_waves(
+    nodes=None, max_unavailable=1, topology_label=DEFAULT_TOPOLOGY_LABEL, **kwargs
+):
+    """Compute the waves of nodes to drain and upgrade together.
+
+    Nodes with the `master` or `etcd` role (or unknown from Kubernetes) are
+    returned first, each one in its own wave, in the order they were given.
+
+    Arguments:
+        nodes (list): names of the nodes to upgrade, default to all nodes
+        max_unavailable (int|str): maximum number of nodes per wave, either
+            absolute or as a percentage (e.g. "25%") of all the cluster nodes
+        topology_label (str): Node label defining the topology domains,
+            nodes from different domains never belong to the same wave (set
+            to an empty value to ignore topology)
+
+    Returns:
+        A list of waves, each wave being a list of node names
+
+    CLI Examples:
+
+    .. code-block:: bash
+
+        salt-call metalk8s_upgrade.plan_waves
+        salt-call metalk8s_upgrade.plan_waves max_unavailable="25%"
+        salt-call metalk8s_upgrade.plan_waves nodes='["node-1", "node-2"]' max_unavailable=2
+    """
+    node_labels = {
+        node["metadata"]["name"]: node["metadata"].get("labels") or {}
+        for node in __salt__["metalk8s_kubernetes.list_objects"](
+            kind="Node",
+            apiVersion="v1",
+            fields=["metadata.name", "metadata.labels"],
+            **kwargs
+        )
+    }
+    if nodes is None:
+        nodes = sorted(node_labels)
+
+    limit = _parse_max_unavailable(max_unavailable, len(node_labels))
+
+    serial_nodes = []
+    parallel_nodes = []
+    for node in nodes:
+        if node not in node_labels or _node_roles(node_labels[node]) & SERIAL_ROLES:
+            serial_nodes.append(node)
+        else:
+            parallel_nodes.append(node)
+
+    waves = [[node] for node in serial_nodes]
+    if not parallel_nodes:
+        return waves
+
+    if limit == 1:
+        waves.extend([node] for node in parallel_nodes)
+        return waves
+
+    pods = __salt__["metalk8s_kubernetes.list_objects"](
+        kind="Pod", apiVersion="v1", all_namespaces=True, fields=POD_FIELDS, **kwargs
+    )
+    pdbs = __salt__["metalk8s_kubernetes.list_objects"](
+        kind="PodDisruptionBudget",
+        apiVersion="policy/v1beta1",
+        all_namespaces=True,
+        **kwargs
+    )
+
+    parallel_waves = _plan_parallel_waves(
+        parallel_nodes, node_labels, pods, pdbs, limit, topology_label
+    )
+    log.info(
+        "Planned %d wave(s) for %d node(s) upgradable in parallel (at most %d "
+        "node(s) per wave)",
+        len(parallel_waves),
+        len(parallel_nodes),
+        limit,
+    )
+    waves.extend(parallel_waves)
+
+    return waves
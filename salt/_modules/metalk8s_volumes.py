@@ -2,14 +2,19 @@
 """Metalk8s volumes module."""
 
 import abc
+import collections
+import concurrent.futures
 import contextlib
 import errno
+import fcntl
 import functools
 import glob
 import json
 import re
 import operator
 import os
+import stat
+import threading
 import time
 
 import logging
@@ -23,6 +28,20 @@ log = logging.getLogger(__name__)
 
 __virtualname__ = "metalk8s_volumes"
 
+DEFAULT_MAX_WORKERS = 8
+
+# Time to wait for a device to be handled by udev, once created (in seconds)
+DEVICE_TIMEOUT = 30
+# Interval between checks for a device, while waiting for its uevents
+DEVICE_POLL_INTERVAL = 1
+
+INVENTORY_KEY = "metalk8s_volumes.inventory"
+_INVENTORY_LOCK = threading.Lock()
+
+# Lock taken by a `metalk8s-sparse-volume@` unit when attaching the loop
+# device of its volume (identified by its UUID)
+SPARSE_VOLUME_LOCK = "/var/lock/metalk8s-sparse-volume-{}.lock"
+
 
 def __virtual__():
     return __virtualname__
@@ -127,14 +146,15 @@ def clean_up(name):
     _get_volume(name).clean_up()
 
 
-def device_name(path):
+def device_name(path, timeout=1):
     """Resolve the given device path into the "real" device name.
 
     For instance, `/dev/disk/by-uuid/668efc89-be5b-4b13-b3d1-1294e829f33b` could
     resolve to `sda`.
 
     Args:
-        name (str): volume name
+        path    (str):   device path
+        timeout (float): time to wait for the device to appear (in seconds)
 
     CLI Example:
 
@@ -142,17 +162,36 @@ def device_name(path):
 
         salt '<NODE_NAME>' metalk8s_volumes.device_name /dev/disk/by-uuid/668efc89-be5b-4b13-b3d1-1294e829f33b
     """
-    # Have some retry logic, because some device manipulations may lead to
+    # Wait for the device, because some device manipulations may lead to
     # transient absence.
-    for _ in range(10):
-        # TOCTTOU, but `realpath` doesn't return error on non-existing path…
-        if os.path.exists(path):
-            realpath = os.path.realpath(path)
-            return {"success": True, "result": os.path.basename(realpath)}
-        time.sleep(0.1)
+    # TOCTTOU, but `realpath` doesn't return error on non-existing path…
+    if _wait_for_device(path, timeout):
+        realpath = os.path.realpath(path)
+        return {"success": True, "result": os.path.basename(realpath)}
     return {"success": False, "result": "device `{}` not found".format(path)}
 
 
+def loop_device_options(name):
+    """Return the `losetup` options to use for the given sparse loop volume.
+
+    These options are derived from the Volume StorageClass parameters (e.g.
+    `directIO`).
+
+    Args:
+        name (str): volume name
+
+    Returns:
+        list: the options to pass to `losetup` when attaching the loop device
+
+    CLI Example:
+
+    .. code-block:: bash
+
+        salt '<NODE_NAME>' metalk8s_volumes.loop_device_options example-volume
+    """
+    return _get_sparse_volume(name).loop_options
+
+
 def device_info(name):
     """Return information about the backing storage device of the given volume.
 
@@ -176,9 +215,189 @@ def device_info(name):
     except KeyError:
         __salt__["saltutil.refresh_pillar"](wait=True)
         volume = _get_volume(name)
+    # The device may just have been attached (e.g. a sparse loop device), and
+    # not be handled by udev yet
+    if volume.persistent_path is not None:
+        _device_name(volume.persistent_path, timeout=DEVICE_TIMEOUT)
     return volume.device_info()
 
 
+def prepare_volumes(names=None, max_workers=DEFAULT_MAX_WORKERS):
+    """Create and prepare several volumes concurrently.
+
+    Volumes are processed by at most `max_workers` threads, volumes backed by
+    the same disk (or by disks of the same LVM VolumeGroup) being processed
+    one after the other.
+
+    Args:
+        names       (list): volume names, all volumes from the pillar if None
+        max_workers (int):  maximum number of volumes processed concurrently
+
+    Returns:
+        dict: for each volume, whether it succeeded, the list of changes done
+              ("Present" and/or "Prepared") and the error, if any
+
+    CLI Example:
+
+    .. code-block:: bash
+
+        salt '<NODE_NAME>' metalk8s_volumes.prepare_volumes '["vol-1", "vol-2"]'
+    """
+    if names is None:
+        names = list(__pillar__["metalk8s"]["volumes"])
+
+    result = {}
+    # Groups of volumes sharing disks, as (disks, volume names) pairs
+    groups = []
+    for name in names:
+        try:
+            disks = set(_get_volume(name).disks)
+        except Exception as exn:  # pylint: disable=broad-except
+            result[name] = {"success": False, "changes": [], "error": str(exn)}
+            continue
+        group_names = []
+        for group in [group for group in groups if group[0] & disks]:
+            groups.remove(group)
+            disks.update(group[0])
+            group_names.extend(group[1])
+        group_names.append(name)
+        groups.append((disks, sorted(group_names, key=names.index)))
+
+    def _prepare_all(group_names):
+        return [(name, _prepare_volume(name)) for name in group_names]
+
+    if groups:
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=min(max_workers, len(groups))
+        ) as executor:
+            for group_results in executor.map(
+                _prepare_all, [group_names for _, group_names in groups]
+            ):
+                result.update(group_results)
+
+    return result
+
+
+def space_usage(names=None):
+    """Return the space used on disk by the sparse files of sparse loop volumes.
+
+    Args:
+        names (list): volume names, all sparse loop volumes from the pillar if
+                      None
+
+    Returns:
+        dict: for each volume, the apparent size of its sparse file and the
+              space actually allocated for it (in bytes), or None if the
+              sparse file does not exist
+
+    CLI Example:
+
+    .. code-block:: bash
+
+        salt '<NODE_NAME>' metalk8s_volumes.space_usage
+    """
+    result = {}
+    for name, volume in _get_sparse_volumes(names).items():
+        try:
+            info = os.stat(volume.path)
+        except OSError as exn:
+            if exn.errno != errno.ENOENT:
+                raise
+            result[name] = None
+        else:
+            result[name] = {
+                "apparent_size": info.st_size,
+                # `st_blocks` is always in 512-bytes units
+                "allocated_size": info.st_blocks * 512,
+            }
+    return result
+
+
+def reclaim(names=None):
+    """Give back to the host the space freed in sparse loop volumes.
+
+    For each volume:
+    - if its filesystem is mounted, it is trimmed using `fstrim`, the loop
+      device punching holes in the sparse file for the discarded blocks,
+    - if its loop device is detached, holes are punched in the ranges of the
+      sparse file only filled with zeros,
+    - otherwise (e.g. a "Block" volume), it is left untouched.
+
+    Preallocated volumes are skipped, since this would undo the preallocation.
+
+    Args:
+        names (list): volume names, all sparse loop volumes from the pillar if
+                      None
+
+    Returns:
+        dict: for each volume, whether it succeeded, the method used
+              ("fstrim", "punch-hole", or None if skipped), the number of bytes
+              reclaimed and the error, if any
+
+    CLI Example:
+
+    .. code-block:: bash
+
+        salt '<NODE_NAME>' metalk8s_volumes.reclaim
+    """
+    mounts = __salt__["mount.active"]()
+
+    result = {}
+    for name, volume in _get_sparse_volumes(names).items():
+        try:
+            allocated = _get_allocated_size(volume.path)
+            if allocated is None:
+                # The sparse file is not created yet
+                method, reclaimed = None, 0
+            else:
+                method = _reclaim_volume(volume, mounts)
+                reclaimed = allocated - _get_allocated_size(volume.path)
+        except Exception as exn:  # pylint: disable=broad-except
+            result[name] = {
+                "success": False,
+                "method": None,
+                "reclaimed": 0,
+                "error": str(exn),
+            }
+        else:
+            result[name] = {"success": True, "method": method, "reclaimed": reclaimed}
+    return result
+
+
+def device_inventory(refresh=False):
+    """Return the inventory of the block devices of this node.
+
+    The inventory is built once per run (e.g. a state run), and cached in
+    `__context__`, instead of probing each device for each volume:
+    - the sizes of all block devices are read from sysfs,
+    - LVM LogicalVolumes are listed using a single `lvs` command,
+    - each device is probed by libblkid once, when first needed.
+
+    It is invalidated as soon as a device is created or formatted.
+
+    Args:
+        refresh (bool): rebuild the inventory from scratch
+
+    Returns:
+        dict: the sizes of the block devices (by name, in bytes), the LVM
+              LogicalVolumes (by path) and the information of the devices
+              probed so far (by path)
+
+    CLI Example:
+
+    .. code-block:: bash
+
+        salt '<NODE_NAME>' metalk8s_volumes.device_inventory
+    """
+    if refresh:
+        _invalidate_inventory()
+    return {
+        "sizes": _get_inventory("sizes", _read_device_sizes),
+        "logical_volumes": _get_inventory("logical_volumes", _list_logical_volumes),
+        "devices": dict(_get_inventory("devices", dict)),
+    }
+
+
 # Volume {{{
 
 
@@ -211,7 +430,7 @@ class Volume:
 
     def device_info(self):
         """Return size and path of the underlying block device"""
-        size = __salt__["disk.dump"](self.persistent_path)["getsize64"]
+        size = _get_device_size(_device_name(self.persistent_path))
         return {"size": size, "path": self.persistent_path}
 
     @abc.abstractproperty
@@ -219,6 +438,11 @@ class Volume:
         """Path to the backing device."""
         return
 
+    @property
+    def disks(self):
+        """Names of the disks holding the backing device."""
+        return [_get_disk(self.path)]
+
     @property
     def uuid(self):
         return self.get("metadata.uid").lower()
@@ -231,7 +455,7 @@ class Volume:
     @property
     def is_prepared(self):
         """Check if the volume is already prepared by us."""
-        return _get_from_blkid(self.path).uuid == self.uuid
+        return _get_from_blkid(self.path)["uuid"] == self.uuid
 
     def prepare(self, force=False):
         """Prepare the volume.
@@ -241,9 +465,9 @@ class Volume:
         # Check that the backing device is not already formatted.
         # Bail out if it is: we don't want data loss because of a typo…
         device_info = _get_from_blkid(self.path)
-        if device_info.fstype:
+        if device_info["fstype"]:
             raise Exception("backing device `{}` already formatted".format(self.path))
-        if device_info.has_partition:
+        if device_info["has_partition"]:
             raise Exception(
                 "backing device `{}` contains a partition table".format(self.path)
             )
@@ -253,15 +477,38 @@ class Volume:
             raise Exception("StorageClass {} not found".format(storage_class))
         params = storage_class["parameters"]
         # mkfs options, if any, are stored as JSON-encoded list.
-        options = json.loads(params.get("mkfsOptions", "[]"))
         fs_type = params["fsType"]
+        options = self.default_mkfs_options(fs_type)
+        options.extend(json.loads(params.get("mkfsOptions", "[]")))
         command = _mkfs(self.path, fs_type, self.uuid, force, options)
-        _run_cmd(" ".join(command))
+        try:
+            _run_cmd(" ".join(command))
+        finally:
+            _invalidate_inventory()
+        # Wait for udev to pick up the new filesystem
+        if __salt__["file.is_blkdev"](self.path):
+            _device_name(self.persistent_path, timeout=DEVICE_TIMEOUT)
+
+    def default_mkfs_options(self, fs_type):
+        """Return the options to format with, before the StorageClass ones."""
+        return []
 
     def get(self, path):
         """Return the Volume attribute `path` from the Volume dict."""
         return functools.reduce(operator.getitem, path.split("."), self._volume)
 
+    def get_parameter(self, name, default=None):
+        """Return the StorageClass parameter `name`, or `default` if unset."""
+        storage_class = self._volume["spec"].get("storageClass")
+        # Not set, or the name wasn't replaced by the object.
+        if not isinstance(storage_class, dict):
+            return default
+        return (storage_class.get("parameters") or {}).get(name, default)
+
+    def get_flag(self, name):
+        """Return whether the boolean StorageClass parameter `name` is set."""
+        return str(self.get_parameter(name, "false")).lower() == "true"
+
 
 # }}}
 # SparseLoopDevice {{{
@@ -276,17 +523,53 @@ class SparseLoopDevice(Volume):
     def size(self):
         return _quantity_to_bytes(self.get("spec.sparseLoopDevice.size"))
 
+    @property
+    def disks(self):
+        # The sparse file may not exist yet
+        return [_get_disk(os.path.dirname(self.path))]
+
     @property
     def exists(self):
         return os.path.isfile(self.path) and os.path.getsize(self.path) == self.size
 
+    @property
+    def loop_options(self):
+        """Options to use when attaching the loop device, with `losetup`."""
+        options = []
+        if self.get_flag("directIO"):
+            # Bypass the page cache of the backing file, which would otherwise
+            # duplicate the one of the loop device itself
+            options.append("--direct-io=on")
+        return options
+
+    def default_mkfs_options(self, fs_type):
+        if self.get_flag("preallocate"):
+            # Discarding blocks of a file punches holes in it, which would
+            # undo the preallocation (and `mkfs` discards by default)
+            if fs_type == "ext4":
+                return ["-E", "nodiscard"]
+            if fs_type == "xfs":
+                return ["-K"]
+            return []
+        if fs_type == "ext4":
+            # Discard the whole file, so that it stays sparse: discarded
+            # blocks of a file read as zeros, hence `mkfs.ext4` also skips the
+            # zeroing of the inode tables (`mkfs.xfs` never zeroes them).
+            return ["-E", "discard"]
+        return []
+
     def create(self):
         # Try to create a sparse file, don't clobber existing one!
         open_flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL
         try:
             with _open_fd(self.path, open_flags) as fd:
                 try:
-                    os.ftruncate(fd, self.size)
+                    if self.get_flag("preallocate"):
+                        # Allocate all blocks upfront (as unwritten extents),
+                        # so that the file does not fragment as it fills up
+                        os.posix_fallocate(fd, 0, self.size)
+                    else:
+                        os.ftruncate(fd, self.size)
                 except Exception:
                     os.unlink(self.path)
                     raise
@@ -409,18 +692,22 @@ class RawBlockDeviceBlock(RawBlockDevice):
         name = self.get("metadata.name")
         # For partition, set the partition's label & UID to the volume's ones.
         if self._kind == DeviceType.PARTITION:
-            _run_cmd(
-                " ".join(
-                    [
-                        "sgdisk",
-                        "--partition-guid",
-                        "{}:{}".format(self._partition, self.uuid),
-                        "--change-name",
-                        "{}:{}".format(self._partition, name),
-                        self.device_path,
-                    ]
+            try:
+                _run_cmd(
+                    " ".join(
+                        [
+                            "sgdisk",
+                            "--partition-guid",
+                            "{}:{}".format(self._partition, self.uuid),
+                            "--change-name",
+                            "{}:{}".format(self._partition, name),
+                            self.device_path,
+                        ]
+                    )
                 )
-            )
+            finally:
+                _invalidate_inventory()
+            _device_name(self.persistent_path, timeout=DEVICE_TIMEOUT)
         # Otherwise, create a GPT table and a unique partition.
         else:
             prepare_block(self.path, name, self.uuid)
@@ -451,15 +738,24 @@ class LVMLogicalVolume(RawBlockDevice):
     def lv_name(self):
         return self.get("metadata.name")
 
+    @property
+    def disks(self):
+        # The LV may not exist yet, and may span all the disks of its VG
+        pv_paths = _get_inventory("physical_volumes", _list_physical_volumes).get(
+            self.vg_name
+        )
+        if not pv_paths:
+            # Unknown VG, the LV cannot be created anyway
+            return ["lvm:{}".format(self.vg_name)]
+        return sorted({_get_disk(pv_path) for pv_path in pv_paths})
+
     @property
     def path(self):
         return "/dev/{}/{}".format(self.vg_name, self.lv_name)
 
     @property
     def exists(self):
-        lv_info = __salt__["lvm.lvdisplay"](lvname=self.path, quiet=True)
-
-        return bool(lv_info and lv_info.get(self.path))
+        return self.path in _get_inventory("logical_volumes", _list_logical_volumes)
 
     def create(self):
         try:
@@ -472,6 +768,8 @@ class LVMLogicalVolume(RawBlockDevice):
                     self.lv_name, self.vg_name
                 )
             ) from exc
+        finally:
+            _invalidate_inventory()
 
         # NOTE: `lvm.lvcreate` does not properly raise if command fail
         # Command Return : {
@@ -538,14 +836,284 @@ def _get_volume(name):
         raise ValueError("unsupported Volume type for Volume {}".format(name))
 
 
-def _device_name(path):
+def _get_sparse_volume(name):
+    """Get a SparseLoopDevice object from the pillar."""
+    volume = _get_volume(name)
+    if not isinstance(volume, SparseLoopDevice):
+        raise ValueError("volume {} is not a sparse loop volume".format(name))
+    return volume
+
+
+def _get_sparse_volumes(names=None):
+    """Get SparseLoopDevice objects, all the ones from the pillar if `names`
+    is None."""
+    if names is None:
+        volumes = __pillar__["metalk8s"]["volumes"] or {}
+        if "_errors" in volumes:
+            raise CommandExecutionError(
+                "errors in pillar: {}".format(", ".join(volumes["_errors"]))
+            )
+        names = [
+            name
+            for name, volume in volumes.items()
+            if "sparseLoopDevice" in volume["spec"]
+        ]
+    return collections.OrderedDict((name, _get_sparse_volume(name)) for name in names)
+
+
+def _prepare_volume(name):
+    """Create and prepare the given volume, if needed.
+
+    Returns:
+        dict: whether it succeeded, the changes done and the error, if any
+    """
+    changes = []
+    try:
+        volume = _get_volume(name)
+        if not volume.exists:
+            volume.create()
+            changes.append("Present")
+            # Some volumes inspect their backing device when instantiated
+            volume = _get_volume(name)
+        if not volume.is_prepared:
+            volume.prepare()
+            changes.append("Prepared")
+    except Exception as exn:  # pylint: disable=broad-except
+        return {"success": False, "changes": changes, "error": str(exn)}
+    return {"success": True, "changes": changes}
+
+
+def _reclaim_volume(volume, mounts):
+    """Reclaim the space freed in a sparse loop volume, if possible.
+
+    Returns:
+        str: the method used, or None if the volume was skipped
+    """
+    if volume.get_flag("preallocate") or not os.path.isfile(volume.path):
+        return None
+
+    # Prevent the loop device from being attached while we punch holes, this
+    # lock is only taken by the unit of this volume, so the others can still
+    # be attached in the meantime
+    with open(SPARSE_VOLUME_LOCK.format(volume.uuid), "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        device = _get_loop_device(volume.path)
+        if device is None:
+            __utils__["metalk8s_volumes.dig_holes"](volume.path)
+            return "punch-hole"
+
+    mountpoints = sorted(
+        mountpoint
+        for mountpoint, info in mounts.items()
+        if info.get("device") == device
+    )
+    if not mountpoints:
+        return None
+    # Bind mounts of the same filesystem are trimmed at once
+    _run_cmd("fstrim {}".format(mountpoints[0]))
+    return "fstrim"
+
+
+def _get_allocated_size(path):
+    """Return the space allocated for the file `path` (in bytes), or None if
+    it does not exist."""
+    try:
+        info = os.stat(path)
+    except OSError as exn:
+        if exn.errno != errno.ENOENT:
+            raise
+        return None
+    # `st_blocks` is always in 512-bytes units
+    return info.st_blocks * 512
+
+
+def _get_loop_device(path):
+    """Return the loop device attached to the file `path`, if any."""
+    for backing_file in glob.glob("/sys/block/loop*/loop/backing_file"):
+        try:
+            with open(backing_file) as fd:
+                if fd.read().strip() == path:
+                    return "/dev/{}".format(backing_file.split("/")[3])
+        # The loop device may be detached in the meantime
+        except OSError:
+            continue
+    return None
+
+
+def _get_disk(path):
+    """Return the name of the disk holding `path` (a block device or a file).
+
+    Partitions are resolved to their parent disk, using sysfs. If `path` does
+    not exist, it is returned as is.
+    """
+    try:
+        info = os.stat(path)
+    except OSError:
+        return path
+    device = info.st_rdev if stat.S_ISBLK(info.st_mode) else info.st_dev
+    sys_path = os.path.realpath(
+        "/sys/dev/block/{}:{}".format(os.major(device), os.minor(device))
+    )
+    # Partitions are nested in the directory of their disk
+    if os.path.exists(os.path.join(sys_path, "partition")):
+        sys_path = os.path.dirname(sys_path)
+    return os.path.basename(sys_path)
+
+
+def _get_inventory(part, build):
+    """Return a part of the device inventory, built by `build` if needed."""
+    with _INVENTORY_LOCK:
+        inventory = __context__.setdefault(INVENTORY_KEY, {})
+        if part not in inventory:
+            inventory[part] = build()
+        return inventory[part]
+
+
+def _invalidate_inventory():
+    """Forget the device inventory, after a device is created or modified."""
+    with _INVENTORY_LOCK:
+        __context__.pop(INVENTORY_KEY, None)
+
+
+def _read_device_sizes():
+    """Read the sizes of all block devices (in bytes) from sysfs."""
+    sizes = {}
+    for size_path in glob.glob("/sys/class/block/*/size"):
+        try:
+            with open(size_path) as fd:
+                # Sizes are always in 512-bytes sectors
+                size = int(fd.read()) * 512
+        # The device may be removed in the meantime
+        except OSError:
+            continue
+        # Empty devices (e.g. detached loop devices) may be resized at any
+        # time, so they are not cached
+        if size:
+            sizes[size_path.split("/")[4]] = size
+    return sizes
+
+
+def _get_device_size(name):
+    """Return the size of the block device `name` (in bytes)."""
+    sizes = _get_inventory("sizes", _read_device_sizes)
+    if name in sizes:
+        return sizes[name]
+
+    # Created after the inventory was built, or empty (e.g. a loop device
+    # which was detached when the inventory was built)
+    try:
+        with open("/sys/class/block/{}/size".format(name)) as fd:
+            size = int(fd.read()) * 512
+    except OSError as exn:
+        raise CommandExecutionError(
+            "cannot read size of device {}: {}".format(name, exn)
+        ) from exn
+    if size:
+        sizes[name] = size
+    return size
+
+
+def _list_logical_volumes():
+    """List all LVM LogicalVolumes, by path, using a single `lvs` command."""
+    ret = _run_cmd(
+        "lvs --reportformat json --units b --nosuffix "
+        "--options lv_path,lv_name,vg_name,lv_size"
+    )
+    logical_volumes = {}
+    for report in json.loads(ret["stdout"])["report"]:
+        for lv_info in report["lv"]:
+            lv_info["lv_size"] = int(lv_info["lv_size"])
+            logical_volumes[lv_info["lv_path"]] = lv_info
+    return logical_volumes
+
+
+def _list_physical_volumes():
+    """List the paths of LVM PhysicalVolumes, by VolumeGroup, using a single
+    `pvs` command."""
+    ret = _run_cmd("pvs --reportformat json --options pv_name,vg_name")
+    physical_volumes = {}
+    for report in json.loads(ret["stdout"])["report"]:
+        for pv_info in report["pv"]:
+            # PhysicalVolumes may not belong to any VolumeGroup
+            if pv_info["vg_name"]:
+                physical_volumes.setdefault(pv_info["vg_name"], []).append(
+                    pv_info["pv_name"]
+                )
+    return physical_volumes
+
+
+def _device_name(path, **kwargs):
     """Return the device name from the path, raise on error."""
-    res = device_name(path)
+    res = device_name(path, **kwargs)
     if res["success"]:
         return res["result"]
     raise CommandExecutionError(message=res["result"])
 
 
+def _wait_for_device(path, timeout):
+    """Wait for the device `path` to exist, for at most `timeout` seconds.
+
+    The uevents of the device, sent when it is added or changed, are waited
+    for. If they cannot be monitored, its existence is polled instead.
+
+    Returns:
+        bool: whether the device exists
+    """
+    if os.path.exists(path):
+        return True
+
+    deadline = time.monotonic() + timeout
+    try:
+        with __utils__["metalk8s_volumes.uevent_monitor"]() as monitor:
+            # The device may have appeared before we started monitoring
+            while not os.path.exists(path):
+                if time.monotonic() >= deadline:
+                    return False
+                # Check again on an uevent for this device, or from time to
+                # time, in case such an uevent is missed
+                check_at = min(time.monotonic() + DEVICE_POLL_INTERVAL, deadline)
+                uevent = _receive_uevent(monitor, check_at - time.monotonic())
+                while uevent is not None and not _is_uevent_for(uevent, path):
+                    uevent = _receive_uevent(
+                        monitor, max(check_at - time.monotonic(), 0)
+                    )
+            return True
+    except OSError as exn:
+        log.warning("Cannot monitor uevents, polling for %s instead: %s", path, exn)
+
+    while not os.path.exists(path):
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(0.1)
+    return True
+
+
+def _receive_uevent(monitor, timeout):
+    """Wait for the next uevent from `monitor`, for at most `timeout` seconds.
+
+    Returns:
+        dict: properties of the uevent (empty if the message cannot be
+              parsed), or None if `timeout` expired
+    """
+    try:
+        return monitor.receive(timeout)
+    except ValueError as exn:
+        # Skip this message, the device existence is checked again from time
+        # to time anyway
+        log.debug("Ignoring invalid uevent: %s", exn)
+        return {}
+
+
+def _is_uevent_for(uevent, path):
+    """Check if the uevent is for the device `path`, or one of its links."""
+    if uevent.get("SUBSYSTEM") != "block":
+        return False
+    # Kernel uevents only have the device name, udev ones the full path
+    if os.path.join("/dev", uevent.get("DEVNAME", "")) == path:
+        return True
+    return path in uevent.get("DEVLINKS", "").split()
+
+
 def _run_cmd(cmd):
     """Execute the given `cmd` command and return its result.
 
@@ -638,14 +1206,24 @@ def _open_fd(*args, **kwargs):
 #
 # So yeah, let's not rely on this…
 def _get_from_blkid(path):
-    flags = __utils__["metalk8s_volumes.get_superblock_flags"]("UUID", "TYPE")
-    kwargs = {
-        "use_superblocks": True,
-        "superblocks_flags": flags,
-        "use_partitions": True,
-    }
-    with __utils__["metalk8s_volumes.get_blkid_probe"](path, **kwargs) as probe:
-        return probe.probe()
+    """Return the filesystem UUID and type of `path`, and whether it has a
+    partition table, probing it only once per run."""
+    devices = _get_inventory("devices", dict)
+    if path not in devices:
+        flags = __utils__["metalk8s_volumes.get_superblock_flags"]("UUID", "TYPE")
+        kwargs = {
+            "use_superblocks": True,
+            "superblocks_flags": flags,
+            "use_partitions": True,
+        }
+        with __utils__["metalk8s_volumes.get_blkid_probe"](path, **kwargs) as probe:
+            info = probe.probe()
+        devices[path] = {
+            "fstype": info.fstype,
+            "uuid": info.uuid,
+            "has_partition": info.has_partition,
+        }
+    return devices[path]
 
 
 def _mkfs(path, fs_type, uuid, force=False, options=None):
@@ -695,20 +1273,26 @@ def prepare_block(path, name, uuid):
     We use a GPT table and a single partition to have a link between the volume
     name/uuid and the partition label/GUID.
     """
-    _run_cmd(
-        " ".join(
-            [
-                "sgdisk",
-                "--largest-new",
-                "1",
-                "--partition-guid",
-                "1:{}".format(uuid),
-                "--change-name",
-                "1:{}".format(name),
-                path,
-            ]
+    try:
+        _run_cmd(
+            " ".join(
+                [
+                    "sgdisk",
+                    "--largest-new",
+                    "1",
+                    "--partition-guid",
+                    "1:{}".format(uuid),
+                    "--change-name",
+                    "1:{}".format(name),
+                    path,
+                ]
+            )
         )
-    )
+    finally:
+        _invalidate_inventory()
+    # Wait for udev to pick up the new partition
+    if __salt__["file.is_blkdev"](path):
+        _device_name("/dev/disk/by-partuuid/{}".format(uuid), timeout=DEVICE_TIMEOUT)
 
 
 # }}}
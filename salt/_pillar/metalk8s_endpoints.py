@@ -17,11 +17,28 @@ def __virtual__():
         return __virtualname__
 
 
-def ext_pillar(minion_id, pillar, kubeconfig):  # pylint: disable=unused-argument
+def get_endpoints(kubeconfig):
     services = {
         "kube-system": ["salt-master", "repositories"],
     }
 
+    endpoints = {}
+
+    for namespace, services in services.items():
+        for service in services:
+            try:
+                service_endpoints = __salt__[
+                    "metalk8s_kubernetes.get_service_endpoints"
+                ](service, namespace, kubeconfig)
+            except CommandExecutionError as exc:
+                service_endpoints = __utils__["pillar_utils.errors_to_dict"](str(exc))
+            endpoints.update({service: service_endpoints})
+            __utils__["pillar_utils.promote_errors"](endpoints, service)
+
+    return endpoints
+
+
+def ext_pillar(minion_id, pillar, kubeconfig):  # pylint: disable=unused-argument
     if not os.path.isfile(kubeconfig):
         error_tplt = "{}: kubeconfig not found at {}"
         endpoints = __utils__["pillar_utils.errors_to_dict"](
@@ -29,20 +46,9 @@ def ext_pillar(minion_id, pillar, kubeconfig):  # pylint: disable=unused-argumen
         )
 
     else:
-        endpoints = {}
-
-        for namespace, services in services.items():
-            for service in services:
-                try:
-                    service_endpoints = __salt__[
-                        "metalk8s_kubernetes.get_service_endpoints"
-                    ](service, namespace, kubeconfig)
-                except CommandExecutionError as exc:
-                    service_endpoints = __utils__["pillar_utils.errors_to_dict"](
-                        str(exc)
-                    )
-                endpoints.update({service: service_endpoints})
-                __utils__["pillar_utils.promote_errors"](endpoints, service)
+        endpoints = __utils__["pillar_utils.get_snapshot"](
+            __virtualname__, lambda: get_endpoints(kubeconfig)
+        )
 
     result = {"metalk8s": {"endpoints": endpoints}}
 
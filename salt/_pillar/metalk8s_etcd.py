@@ -12,8 +12,11 @@ def __virtual__():
 def _load_members(pillar):
     errors = []
     try:
-        members = __salt__["metalk8s_etcd.get_etcd_member_list"](
-            nodes=pillar["metalk8s"]["nodes"]
+        members = __utils__["pillar_utils.get_snapshot"](
+            __virtualname__,
+            lambda: __salt__["metalk8s_etcd.get_etcd_member_list"](
+                nodes=pillar["metalk8s"]["nodes"]
+            ),
         )
     except Exception as exc:  # pylint: disable=broad-except
         members = []
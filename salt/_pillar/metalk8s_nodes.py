@@ -70,7 +70,38 @@ def iso_timestamp_converter(timestamp):
     return timestamp.isoformat()
 
 
+def _get_informer_items(name):
+    """Retrieve objects from the `metalk8s_kubernetes_informer` engine store.
+
+    Returns None if not available, objects must then be listed from the API.
+    """
+    store = __utils__["metalk8s_kubernetes.get_informer_store"](name)
+    if store is None:
+        return None
+    log.debug("Using %s from the informer store", name)
+    return list(store["items"].values())
+
+
+def _get_volumes_version():
+    """Retrieve the `resourceVersion` of the Volumes in the informer store.
+
+    Volumes are prepared by the storage-operator right after their creation,
+    so the cluster snapshot must not be reused once they changed.
+    Returns None if the store is not available, the snapshot then expires
+    after `metalk8s.pillar_snapshot_ttl` seconds.
+    """
+    store = __utils__["metalk8s_kubernetes.get_informer_store"]("volumes")
+    if store is None:
+        return None
+    return store["resource_version"]
+
+
 def get_storage_classes(kubeconfig=None):
+    informer_items = _get_informer_items("storageclasses")
+    if informer_items is not None:
+        # Timestamps are already stored in ISO format
+        return {item["metadata"]["name"]: item for item in informer_items}
+
     storage_classes = {}
     storageclass_list = __salt__["metalk8s_kubernetes.list_objects"](
         kind="StorageClass", apiVersion="storage.k8s.io/v1", kubeconfig=kubeconfig
@@ -89,7 +120,7 @@ def get_storage_classes(kubeconfig=None):
     return storage_classes
 
 
-def list_volumes(minion_id, kubeconfig=None):
+def get_volumes(kubeconfig=None):
     try:
         storage_classes = get_storage_classes(kubeconfig=kubeconfig)
     except CommandExecutionError as exc:
@@ -97,33 +128,83 @@ def list_volumes(minion_id, kubeconfig=None):
             ["Unable to retrieve list of storage class: {}".format(exc)]
         )
 
-    try:
-        volumes = __salt__["metalk8s_kubernetes.list_objects"](
-            kind="Volume",
-            apiVersion="storage.metalk8s.scality.com/v1alpha1",
-            kubeconfig=kubeconfig,
-        )
-    except CommandExecutionError as exc:
-        return __utils__["pillar_utils.errors_to_dict"](
-            ["Unable to retrieve list of Volumes: {}".format(exc)]
-        )
+    volumes = _get_informer_items("volumes")
+    if volumes is None:
+        try:
+            volumes = __salt__["metalk8s_kubernetes.list_objects"](
+                kind="Volume",
+                apiVersion="storage.metalk8s.scality.com/v1alpha1",
+                kubeconfig=kubeconfig,
+            )
+        except CommandExecutionError as exc:
+            return __utils__["pillar_utils.errors_to_dict"](
+                ["Unable to retrieve list of Volumes: {}".format(exc)]
+            )
 
     results = {}
-    local_volumes = (
-        volume for volume in volumes if volume["spec"]["nodeName"] == minion_id
-    )
-    for volume in local_volumes:
-        name = volume["metadata"]["name"]
+    for volume in volumes:
         storageclass = storage_classes.get(
             volume["spec"]["storageClassName"], volume["spec"]["storageClassName"]
         )
         volume["spec"]["storageClass"] = storageclass
-        name = volume["metadata"]["name"]
-        results[name] = volume
+        results[volume["metadata"]["name"]] = volume
 
     return results
 
 
+def _local_volumes(volumes, minion_id):
+    if "_errors" in volumes:
+        return volumes
+
+    return {
+        name: volume
+        for name, volume in volumes.items()
+        if volume["spec"]["nodeName"] == minion_id
+    }
+
+
+def get_nodes(kubeconfig=None):
+    node_list = _get_informer_items("nodes")
+    if node_list is None:
+        try:
+            node_list = __salt__["metalk8s_kubernetes.list_objects"](
+                kind="Node",
+                apiVersion="v1",
+                fields=["metadata.name", "metadata.labels"],
+                kubeconfig=kubeconfig,
+            )
+        except CommandExecutionError as exc:
+            log.exception("Failed to retrieve nodes for ext_pillar", exc_info=exc)
+            return __utils__["pillar_utils.errors_to_dict"](
+                ["Failed to retrieve NodeList: {!s}".format(exc)]
+            )
+
+    log.debug("Successfully retrieved nodes for ext_pillar")
+    # Only keep what `node_info` needs, so the snapshot stays small
+    return {
+        node["metadata"]["name"]: {
+            "metadata": {
+                "name": node["metadata"]["name"],
+                "labels": node["metadata"]["labels"],
+            }
+        }
+        for node in node_list
+    }
+
+
+def get_cluster_snapshot(kubeconfig=None):
+    """Retrieve all the cluster-wide data this ext_pillar relies on.
+
+    The result is shared by all minions, each minion pillar being a
+    projection of this snapshot.
+    """
+    return {
+        "nodes": get_nodes(kubeconfig=kubeconfig),
+        "cluster_version": get_cluster_version(kubeconfig=kubeconfig),
+        "volumes": get_volumes(kubeconfig=kubeconfig),
+    }
+
+
 def ext_pillar(minion_id, pillar, kubeconfig):
     if not os.path.isfile(kubeconfig):
         error_tplt = "{}: kubeconfig not found at {}"
@@ -139,24 +220,21 @@ def ext_pillar(minion_id, pillar, kubeconfig):
             if "ca" in pillar["metalk8s"]:
                 ca_minion = pillar["metalk8s"]["ca"].get("minion", None)
 
-        try:
-            node_list = __salt__["metalk8s_kubernetes.list_objects"](
-                kind="Node", apiVersion="v1", kubeconfig=kubeconfig
-            )
-        except CommandExecutionError as exc:
-            log.exception("Failed to retrieve nodes for ext_pillar", exc_info=exc)
-            pillar_nodes = __utils__["pillar_utils.errors_to_dict"](
-                ["Failed to retrieve NodeList: {!s}".format(exc)]
-            )
-        else:
-            log.debug("Successfully retrieved nodes for ext_pillar")
+        snapshot = __utils__["pillar_utils.get_snapshot"](
+            __virtualname__,
+            lambda: get_cluster_snapshot(kubeconfig=kubeconfig),
+            version=_get_volumes_version(),
+        )
+
+        pillar_nodes = snapshot["nodes"]
+        if "_errors" not in pillar_nodes:
             pillar_nodes = dict(
-                (node["metadata"]["name"], node_info(node, ca_minion))
-                for node in node_list
+                (name, node_info(node, ca_minion))
+                for name, node in pillar_nodes.items()
             )
 
-        cluster_version = get_cluster_version(kubeconfig=kubeconfig)
-        volume_information = list_volumes(minion_id, kubeconfig=kubeconfig)
+        cluster_version = snapshot["cluster_version"]
+        volume_information = _local_volumes(snapshot["volumes"], minion_id)
 
     result = {
         "metalk8s": {
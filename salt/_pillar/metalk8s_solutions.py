@@ -1,10 +1,16 @@
 import logging
+
+import salt.cache
 from salt.exceptions import CommandExecutionError
 
 log = logging.getLogger(__name__)
 
 __virtualname__ = "metalk8s_solutions"
 
+# Name of the mine entry where the Bootstrap minion advertises the available
+# Solutions (see `metalk8s.solutions.available` formula)
+AVAILABLE_MINE_ENTRY = "metalk8s_solutions_available"
+
 
 def __virtual__():
     if "metalk8s_solutions.read_config" not in __salt__:
@@ -12,6 +18,32 @@ def __virtual__():
     return __virtualname__
 
 
+def _list_available(bootstrap_id):
+    """List Solutions available (i.e. mounted) on the Bootstrap node.
+
+    The Bootstrap minion advertises them in the mine whenever Solution
+    archives get (un)mounted, so that pillar compilations only have to read
+    the master cache. Remote execution is only used if nothing was advertised.
+    """
+    mine = salt.cache.Cache(__opts__).fetch("minions/{}".format(bootstrap_id), "mine")
+    if isinstance(mine, dict) and AVAILABLE_MINE_ENTRY in mine:
+        return mine[AVAILABLE_MINE_ENTRY]
+
+    log.debug(
+        "No available Solutions advertised in the mine, querying %s", bootstrap_id
+    )
+    available_ret = __salt__["saltutil.cmd"](
+        tgt=bootstrap_id,
+        fun="metalk8s_solutions.list_available",
+    )[bootstrap_id]
+    if available_ret["retcode"] != 0:
+        raise Exception(
+            "[{}] {}".format(available_ret["retcode"], available_ret["ret"])
+        )
+
+    return available_ret["ret"]
+
+
 def _load_solutions(bootstrap_id):
     """Load Solutions from ConfigMap and config file."""
     result = {
@@ -29,16 +61,7 @@ def _load_solutions(bootstrap_id):
 
     errors = []
     try:
-        available_ret = __salt__["saltutil.cmd"](
-            tgt=bootstrap_id,
-            fun="metalk8s_solutions.list_available",
-        )[bootstrap_id]
-        if available_ret["retcode"] != 0:
-            raise Exception(
-                "[{}] {}".format(available_ret["retcode"], available_ret["ret"])
-            )
-
-        result["available"] = available_ret["ret"]
+        result["available"] = _list_available(bootstrap_id)
     except Exception as exc:  # pylint: disable=broad-except
         errors.append("Error when listing available Solutions: {}".format(exc))
 
@@ -71,8 +94,8 @@ def _load_solutions(bootstrap_id):
 
 def ext_pillar(minion_id, pillar):  # pylint: disable=unused-argument
     # NOTE: this ext_pillar relies on the `metalk8s_nodes` ext_pillar to find
-    # the Bootstrap minion ID, for the remote execution of
-    # `metalk8s_solutions.list_available`.
+    # the Bootstrap minion ID, for the retrieval of
+    # `metalk8s_solutions.list_available` results.
     errors = []
     pillar_nodes = pillar.get("metalk8s", {}).get("nodes", {})
     if "_errors" in pillar_nodes:
@@ -19,10 +19,16 @@ The supported options are:
   salt-master configuration
 - `absent`, a boolean to toggle which state function variant (`object_present`
   or `object_absent`) to use (defaults to False)
+- `bulk`, a boolean to render a single state for all the objects, using the
+  `objects_present` (or `objects_absent`) state function, which handles
+  objects concurrently in batches of the same kind (defaults to False)
+- `concurrency`, the maximum number of objects handled at the same time in
+  `bulk` mode (defaults to 10)
 """
 import yaml
 
 from salt.exceptions import SaltRenderError
+import salt.utils.data
 from salt.ext import six
 from salt.utils.yaml import SaltYamlSafeLoader
 from salt.utils.odict import OrderedDict
@@ -70,6 +76,32 @@ def _step(manifest, kubeconfig=None, context=None, absent=False):
     return step_name, {state_func: state_args}
 
 
+def _bulk_step(
+    manifests, sls="", kubeconfig=None, context=None, absent=False, concurrency=None
+):
+    """Render all Kubernetes objects into a single state 'step'."""
+    # Validate all manifests at render time, as done for single steps
+    for manifest in manifests:
+        _step_name(manifest, absent)
+
+    step_name = "{verb} all objects from '{sls}'".format(
+        verb="Remove" if absent else "Apply", sls=sls
+    )
+    state_func = "metalk8s_kubernetes.objects_{}".format(
+        "absent" if absent else "present"
+    )
+    state_args = [
+        {"name": step_name},
+        {"kubeconfig": kubeconfig},
+        {"context": context},
+        {"manifests": manifests},
+    ]
+    if concurrency is not None:
+        state_args.append({"concurrency": int(concurrency)})
+
+    return step_name, {state_func: state_args}
+
+
 def render(
     source, saltenv="", sls="", argline="", **_kwargs
 ):  # pylint: disable=unused-argument
@@ -78,6 +110,8 @@ def render(
     kubeconfig = args.get("kubeconfig", [None])[0]
     context = args.get("context", [None])[0]
     absent = args.get("absent", [False])[0]
+    bulk = salt.utils.data.is_true(args.get("bulk", [False])[0])
+    concurrency = args.get("concurrency", [None])[0]
 
     if not isinstance(source, six.string_types):
         # Assume it is a file handle
@@ -85,6 +119,20 @@ def render(
 
     data = yaml.load_all(source, Loader=SaltYamlSafeLoader)
 
+    if bulk:
+        return OrderedDict(
+            [
+                _bulk_step(
+                    [manifest for manifest in data if manifest],
+                    sls=sls,
+                    kubeconfig=kubeconfig,
+                    context=context,
+                    absent=absent,
+                    concurrency=concurrency,
+                )
+            ]
+        )
+
     return OrderedDict(
         _step(manifest, kubeconfig=kubeconfig, context=context, absent=absent)
         for manifest in data
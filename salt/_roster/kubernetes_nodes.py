@@ -16,13 +16,23 @@ def targets(tgt, tgt_type="glob", **_kwargs):
         log.error('Only "glob" and "list" lookups are supported for now')
         return {}
 
-    try:
-        nodes = __runner__["salt.cmd"](
-            "metalk8s_kubernetes.list_objects", kind="Node", apiVersion="v1"
-        )
-    except Exception:
-        log.exception("Failed to retrieve v1/NodeList")
-        raise
+    store = None
+    if "metalk8s_kubernetes.get_informer_store" in __utils__:
+        store = __utils__["metalk8s_kubernetes.get_informer_store"]("nodes")
+
+    if store is not None:
+        nodes = store["items"].values()
+    else:
+        try:
+            nodes = __runner__["salt.cmd"](
+                "metalk8s_kubernetes.list_objects",
+                kind="Node",
+                apiVersion="v1",
+                fields=["metadata.name", "metadata.annotations"],
+            )
+        except Exception:
+            log.exception("Failed to retrieve v1/NodeList")
+            raise
 
     # TODO Use `tgt_type`
     prefix = "metalk8s.scality.com/ssh-"
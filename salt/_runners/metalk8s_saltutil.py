@@ -152,3 +152,31 @@ def orchestrate_show_sls(
 
     ret = {minion.opts["id"]: running}
     return ret
+
+
+def pillar_snapshot_info():
+    """
+    Display the age (in seconds) of the cluster snapshots shared across
+    minion pillar compilations.
+
+    CLI Example:
+    .. code-block:: bash
+
+        salt-run metalk8s_saltutil.pillar_snapshot_info
+    """
+    return __utils__["pillar_utils.snapshot_info"]()
+
+
+def flush_pillar_snapshot(name=None):
+    """
+    Invalidate one (or all) cluster snapshots shared across minion pillar
+    compilations, so the next pillar refresh retrieves fresh data.
+
+    CLI Example:
+    .. code-block:: bash
+
+        salt-run metalk8s_saltutil.flush_pillar_snapshot
+        salt-run metalk8s_saltutil.flush_pillar_snapshot name=metalk8s_nodes
+    """
+    __utils__["pillar_utils.flush_snapshots"](name)
+    return True
@@ -0,0 +1,25 @@
+import logging
+
+import salt.minion
+
+log = logging.getLogger(__name__)
+
+
+def plan_waves(nodes=None, max_unavailable=1, topology_label=None, saltenv="base"):
+    """
+    Display the waves of nodes that would be drained and upgraded together,
+    as computed by the `metalk8s_upgrade.plan_waves` execution module.
+
+    CLI Example:
+    .. code-block:: bash
+
+        salt-run metalk8s_upgrade.plan_waves max_unavailable="25%"
+        salt-run metalk8s_upgrade.plan_waves nodes='["node-1", "node-2"]' max_unavailable=2
+    """
+    kwargs = {"nodes": nodes, "max_unavailable": max_unavailable}
+    if topology_label is not None:
+        kwargs["topology_label"] = topology_label
+
+    opts = dict(__opts__, saltenv=saltenv, file_client="local")
+    minion = salt.minion.MasterMinion(opts)
+    return minion.functions["metalk8s_upgrade.plan_waves"](**kwargs)
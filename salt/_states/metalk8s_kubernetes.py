@@ -4,11 +4,35 @@ This module defines three state functions: `object_present`, `object_absent`
 and `object_updated`.
 Those will then simply delegate all the logic to the `metalk8s_kubernetes`
 execution module, only managing simple dicts in this state module.
+
+The `objects_present` and `objects_absent` state functions manage a list of
+manifests at once, concurrently (see the `bulk` option of the
+`metalk8s_kubernetes` renderer).
 """
+from concurrent.futures import ThreadPoolExecutor
+import logging
 import time
 
+from salt.exceptions import CommandExecutionError
+
+log = logging.getLogger(__name__)
+
 __virtualname__ = "metalk8s_kubernetes"
 
+# Metadata updated by the API server on every write, even if nothing changed
+VOLATILE_METADATA = (
+    "managed_fields",
+    "managedFields",
+    "resource_version",
+    "resourceVersion",
+)
+
+
+# Custom objects can only be created once their CustomResourceDefinition is
+# established, this is checked every `CRD_ESTABLISHED_SLEEP` seconds
+CRD_ESTABLISHED_ATTEMPTS = 30
+CRD_ESTABLISHED_SLEEP = 1
+
 
 def __virtual__():
     if "metalk8s_kubernetes.create_object" not in __salt__:
@@ -16,6 +40,56 @@ def __virtual__():
     return __virtualname__
 
 
+# Order in which objects are applied by `objects_present` (and removed in
+# reverse order by `objects_absent`), based on their kind. Objects of unknown
+# kinds (e.g. custom objects) come last.
+KIND_ORDER = [
+    "Namespace",
+    "NetworkPolicy",
+    "ResourceQuota",
+    "LimitRange",
+    "PodSecurityPolicy",
+    "PodDisruptionBudget",
+    "ServiceAccount",
+    "Secret",
+    "ConfigMap",
+    "StorageClass",
+    "PersistentVolume",
+    "PersistentVolumeClaim",
+    "CustomResourceDefinition",
+    "ClusterRole",
+    "ClusterRoleBinding",
+    "Role",
+    "RoleBinding",
+    "Service",
+    "DaemonSet",
+    "Pod",
+    "ReplicaSet",
+    "Deployment",
+    "StatefulSet",
+    "Job",
+    "CronJob",
+    "Ingress",
+    "APIService",
+    "MutatingWebhookConfiguration",
+    "ValidatingWebhookConfiguration",
+]
+
+
+def _diff_objects(old, new):
+    """Compute the differences between two versions of an object."""
+
+    def _strip(obj):
+        metadata = {
+            key: value
+            for key, value in (obj.get("metadata") or {}).items()
+            if key not in VOLATILE_METADATA
+        }
+        return dict(obj, metadata=metadata)
+
+    return __utils__["dictdiffer.recursive_diff"](_strip(old), _strip(new))
+
+
 def object_absent(name, manifest=None, wait=None, **kwargs):
     """Ensure that the object is absent.
 
@@ -101,6 +175,9 @@ def object_absent(name, manifest=None, wait=None, **kwargs):
 def object_present(name, manifest=None, **kwargs):
     """Ensure that the object is present.
 
+    An existing object is only replaced if the result of a dry-run replace
+    differs from the current object.
+
     Arguments:
         name (str): Path to a manifest yaml file
                     or just a name if manifest provided
@@ -114,14 +191,13 @@ def object_present(name, manifest=None, **kwargs):
     obj = __salt__["metalk8s_kubernetes.get_object"](
         name=name_arg, manifest=manifest, saltenv=__env__, **kwargs
     )
-    if __opts__["test"]:
-        ret["result"] = None
-        ret["comment"] = "The object is going to be {}".format(
-            "created" if obj is None else "replaced"
-        )
-        return ret
 
     if obj is None:
+        if __opts__["test"]:
+            ret["result"] = None
+            ret["comment"] = "The object is going to be created"
+            return ret
+
         __salt__["metalk8s_kubernetes.create_object"](
             name=name_arg, manifest=manifest, saltenv=__env__, **kwargs
         )
@@ -130,16 +206,41 @@ def object_present(name, manifest=None, **kwargs):
 
         return ret
 
-    # TODO: Attempt to handle idempotency as much as possible here, we don't
-    #       want to always replace if nothing changed. Currently though, we
-    #       don't know how to achieve this, since some fields may be set by
-    #       api-server or by the user without us being able to distinguish
-    #       them.
+    # Let the API server compute the replaced object (with defaults and
+    # mutations applied) without persisting it, so that we only write the
+    # object (bumping its resourceVersion and waking up all its watchers)
+    # if something actually changed
+    try:
+        expected = __salt__["metalk8s_kubernetes.replace_object"](
+            name=name_arg,
+            manifest=manifest,
+            old_object=obj,
+            saltenv=__env__,
+            dry_run=True,
+            **kwargs
+        )
+    except CommandExecutionError as exc:
+        # e.g. an admission webhook not supporting dry-run requests
+        log.debug("Dry-run replace failed, replacing the object anyway: %s", exc)
+        expected = None
+
+    if expected is not None:
+        diff = _diff_objects(obj, expected)
+        if not diff.diffs:
+            ret["comment"] = "The object is already good"
+            return ret
+
+    if __opts__["test"]:
+        ret["result"] = None
+        ret["comment"] = "The object is going to be replaced"
+        if expected is not None:
+            ret["changes"] = diff.diffs
+        return ret
+
     new = __salt__["metalk8s_kubernetes.replace_object"](
         name=name_arg, manifest=manifest, old_object=obj, saltenv=__env__, **kwargs
     )
-    diff = __utils__["dictdiffer.recursive_diff"](obj, new)
-    ret["changes"] = diff.diffs
+    ret["changes"] = _diff_objects(obj, new).diffs
     ret["comment"] = "The object was replaced"
 
     return ret
@@ -197,3 +298,156 @@ def object_updated(name, manifest=None, **kwargs):
     ret["comment"] = "The object was updated"
 
     return ret
+
+
+def _kind_rank(manifest):
+    try:
+        return KIND_ORDER.index(manifest.get("kind"))
+    except ValueError:
+        return len(KIND_ORDER)
+
+
+def _object_name(manifest):
+    metadata = manifest.get("metadata") or {}
+    name = metadata.get("name")
+    if metadata.get("namespace"):
+        name = "{}/{}".format(metadata["namespace"], name)
+
+    return "{}/{} '{}'".format(manifest.get("apiVersion"), manifest.get("kind"), name)
+
+
+def _crd_established(manifest, **kwargs):
+    obj = __salt__["metalk8s_kubernetes.get_object"](
+        manifest=manifest, saltenv=__env__, **kwargs
+    )
+    conditions = ((obj or {}).get("status") or {}).get("conditions") or []
+    return any(
+        condition.get("type") == "Established" and condition.get("status") == "True"
+        for condition in conditions
+    )
+
+
+def _wait_for_crds(manifests, **kwargs):
+    """Wait for CustomResourceDefinitions to be established.
+
+    Returns:
+        list: names of the CustomResourceDefinitions still not established
+    """
+    pending = list(manifests)
+    attempts = 1
+    while True:
+        pending = [
+            manifest for manifest in pending if not _crd_established(manifest, **kwargs)
+        ]
+        if not pending or attempts >= CRD_ESTABLISHED_ATTEMPTS:
+            return [_object_name(manifest) for manifest in pending]
+        time.sleep(CRD_ESTABLISHED_SLEEP)
+        attempts += 1
+
+
+def _objects_bulk(state_func, name, manifests, concurrency, reverse, **kwargs):
+    """Call a state function on each manifest, grouped by kind.
+
+    Objects of the same kind are handled concurrently, while each group of
+    kinds waits for the previous one to complete (and is not handled if the
+    previous one failed). When applying objects, custom objects also wait for
+    the CustomResourceDefinitions to be established.
+    """
+    ret = {"name": name, "changes": {}, "result": True, "comment": ""}
+
+    groups = {}
+    for manifest in manifests:
+        groups.setdefault(_kind_rank(manifest), []).append(manifest)
+
+    def _run(manifest):
+        obj_name = _object_name(manifest)
+        try:
+            return obj_name, state_func(name=obj_name, manifest=manifest, **kwargs)
+        except CommandExecutionError as exc:
+            return obj_name, {"result": False, "changes": {}, "comment": str(exc)}
+        except Exception as exc:  # pylint: disable=broad-except
+            # Report the failure of this object only, like any other failure
+            log.exception("Unexpected error while handling %s", obj_name)
+            return obj_name, {
+                "result": False,
+                "changes": {},
+                "comment": "Unexpected error: {!r}".format(exc),
+            }
+
+    crd_rank = KIND_ORDER.index("CustomResourceDefinition")
+
+    comments = []
+    with ThreadPoolExecutor(max_workers=max(int(concurrency), 1)) as executor:
+        ranks = sorted(groups, reverse=reverse)
+        for index, rank in enumerate(ranks):
+            for obj_name, obj_ret in executor.map(_run, groups[rank]):
+                comments.append("{}: {}".format(obj_name, obj_ret["comment"]))
+                if obj_ret["changes"]:
+                    ret["changes"][obj_name] = obj_ret["changes"]
+                if obj_ret["result"] is False:
+                    ret["result"] = False
+                elif obj_ret["result"] is None and ret["result"] is True:
+                    ret["result"] = None
+
+            if (
+                rank == crd_rank
+                and not reverse
+                and not __opts__["test"]
+                and ret["result"] is not False
+                and index < len(ranks) - 1
+            ):
+                try:
+                    not_established = _wait_for_crds(groups[rank], **kwargs)
+                except CommandExecutionError as exc:
+                    ret["result"] = False
+                    comments.append(
+                        "Failed to check CustomResourceDefinitions: {}".format(exc)
+                    )
+                else:
+                    if not_established:
+                        ret["result"] = False
+                        comments.append(
+                            "CustomResourceDefinitions not established: {}".format(
+                                ", ".join(not_established)
+                            )
+                        )
+
+            if ret["result"] is False and index < len(ranks) - 1:
+                comments.append("Remaining objects were not handled due to failures")
+                break
+
+    ret["comment"] = "\n".join(comments)
+
+    return ret
+
+
+def objects_present(name, manifests, concurrency=10, **kwargs):
+    """Ensure that several objects are present.
+
+    Objects are applied concurrently, in batches of the same kind, following
+    `KIND_ORDER` (e.g. Namespaces and CustomResourceDefinitions first).
+
+    Arguments:
+        name (str): Name of the state
+        manifests (list): Manifests content
+        concurrency (int): Maximum number of objects applied at the same time
+    """
+    return _objects_bulk(
+        object_present, name, manifests, concurrency, reverse=False, **kwargs
+    )
+
+
+def objects_absent(name, manifests, concurrency=10, **kwargs):
+    """Ensure that several objects are absent.
+
+    Objects are removed concurrently, in batches of the same kind, following
+    `KIND_ORDER` in reverse order.
+
+    Arguments:
+        name (str): Name of the state
+        manifests (list): Manifests content
+        concurrency (int): Maximum number of objects removed at the same time
+    """
+    return _objects_bulk(
+        object_absent, name, manifests, concurrency, reverse=True, **kwargs
+    )
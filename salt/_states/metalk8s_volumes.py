@@ -81,6 +81,60 @@ def prepared(name):
     return ret
 
 
+def batch_prepared(name, volumes, max_workers=None):
+    """Ensure that the backing storage of the given volume exists and is
+    prepared, processing it along with a batch of volumes.
+
+    All the volumes of the batch are processed concurrently by the first state
+    of this batch, the others reusing its results, so that each volume gets
+    its own state result.
+
+    Args:
+        name        (str):  Volume name
+        volumes     (list): Volume names of the batch (including `name`)
+        max_workers (int):  maximum number of volumes processed concurrently
+
+    Returns:
+        dict: state return value
+    """
+    ret = {"name": name, "changes": {}, "result": False, "comment": ""}
+    # Dry-run.
+    if __opts__["test"]:
+        if not __salt__["metalk8s_volumes.exists"](name):
+            ret["changes"][name] = ["Present", "Prepared"]
+        elif not __salt__["metalk8s_volumes.is_prepared"](name):
+            ret["changes"][name] = ["Prepared"]
+        if ret["changes"]:
+            ret["result"] = None
+            ret["comment"] = "Volume {} is going to be prepared.".format(name)
+        else:
+            ret["result"] = True
+            ret["comment"] = "Volume {} already prepared.".format(name)
+        return ret
+    # Let's go for real.
+    batches = __context__.setdefault("metalk8s_volumes.batch_prepared", {})
+    batch = tuple(volumes)
+    if batch not in batches:
+        kwargs = {}
+        if max_workers is not None:
+            kwargs["max_workers"] = max_workers
+        batches[batch] = __salt__["metalk8s_volumes.prepare_volumes"](
+            list(volumes), **kwargs
+        )
+
+    volume_ret = batches[batch][name]
+    if volume_ret["changes"]:
+        ret["changes"][name] = volume_ret["changes"]
+    if volume_ret["success"]:
+        ret["result"] = True
+        ret["comment"] = "Volume {} prepared.".format(name)
+    else:
+        ret["comment"] = "Failed to prepare volume {}: {}.".format(
+            name, volume_ret["error"]
+        )
+    return ret
+
+
 def removed(name):
     """Remove and cleanup the given volume.
 
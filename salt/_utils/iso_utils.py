@@ -0,0 +1,189 @@
+"""Utility module for reading files from ISO 9660 images.
+
+MetalK8s and Solutions archives are ISOs of several GB, from which only a
+small metadata file is needed (e.g. `PRODUCT.TXT`). Such files are read by
+walking the ISO 9660 directory records, instead of spawning `isoinfo` for each
+of them, and cached (in memory and in the Salt cache) until the ISO changes.
+"""
+import hashlib
+import logging
+import os
+import struct
+
+import salt.cache
+from salt.exceptions import SaltCacheError
+
+
+log = logging.getLogger(__name__)
+
+__virtualname__ = "metalk8s_iso"
+
+CACHE_BANK = "metalk8s/iso_files"
+
+SECTOR_SIZE = 2048
+# Volume descriptors start after the 16 sectors of the system area
+FIRST_DESCRIPTOR_SECTOR = 16
+PRIMARY_DESCRIPTOR = 1
+TERMINATOR_DESCRIPTOR = 255
+DIRECTORY_FLAG = 0x02
+
+# Files already read in this process, as `(path, name): (signature, content)`
+_FILES = {}
+
+
+def __virtual__():
+    return __virtualname__
+
+
+def _parse_record(record):
+    """Parse a directory record into `(name, is_dir, extent, size)`."""
+    extent, size = struct.unpack_from("<I4xI", record, 2)
+    name_length = record[32]
+    name = record[33 : 33 + name_length]
+    return name, bool(record[25] & DIRECTORY_FLAG), extent, size
+
+
+def _iter_directory(fd, block_size, extent, size):
+    """Yield the `(name, is_dir, extent, size)` entries of a directory."""
+    fd.seek(extent * block_size)
+    data = fd.read(size)
+
+    offset = 0
+    while offset < len(data):
+        length = data[offset]
+        if length == 0:
+            # Records never cross sector boundaries, the rest is padding
+            offset = (offset // SECTOR_SIZE + 1) * SECTOR_SIZE
+            continue
+
+        name, is_dir, entry_extent, entry_size = _parse_record(
+            data[offset : offset + length]
+        )
+        offset += length
+
+        # Skip the "." and ".." entries
+        if name in (b"\x00", b"\x01"):
+            continue
+
+        # Drop the version number and the trailing dot of files without
+        # extension (e.g. `PRODUCT.TXT;1` or `README.;1`)
+        name = name.decode("ascii", "replace").split(";", 1)[0]
+        if not is_dir:
+            name = name.rstrip(".")
+
+        yield name.upper(), is_dir, entry_extent, entry_size
+
+
+def _root_directory(fd):
+    """Retrieve the block size and root directory from the primary volume
+    descriptor, as `(block_size, extent, size)`."""
+    sector = FIRST_DESCRIPTOR_SECTOR
+    while True:
+        fd.seek(sector * SECTOR_SIZE)
+        descriptor = fd.read(SECTOR_SIZE)
+        if len(descriptor) < SECTOR_SIZE or descriptor[1:6] != b"CD001":
+            raise ValueError("not an ISO 9660 image")
+
+        if descriptor[0] == PRIMARY_DESCRIPTOR:
+            (block_size,) = struct.unpack_from("<H", descriptor, 128)
+            _, _, extent, size = _parse_record(descriptor[156:190])
+            return block_size, extent, size
+
+        if descriptor[0] == TERMINATOR_DESCRIPTOR:
+            raise ValueError("no primary volume descriptor found")
+
+        sector += 1
+
+
+def read_iso_file(path, name):
+    """Read a file from an ISO 9660 image.
+
+    Arguments:
+        path (str): path to the ISO
+        name (str): path of the file in the ISO (e.g. `/PRODUCT.TXT`), case
+                    insensitive and without version number
+
+    Returns:
+        bytes: content of the file, or None if the ISO does not contain it
+
+    Raises:
+        ValueError: if `path` is not a valid ISO 9660 image
+    """
+    components = [part.upper() for part in name.split("/") if part]
+
+    with open(path, "rb") as fd:
+        block_size, extent, size = _root_directory(fd)
+        is_dir = True
+
+        for component in components:
+            if not is_dir:
+                return None
+
+            for entry_name, is_dir, extent, size in _iter_directory(
+                fd, block_size, extent, size
+            ):
+                if entry_name == component:
+                    break
+            else:
+                return None
+
+        if is_dir:
+            return None
+
+        fd.seek(extent * block_size)
+        return fd.read(size)
+
+
+def read_file(path, name):
+    """Read a text file from an ISO 9660 image, using the Salt cache.
+
+    Files read are cached per ISO, in memory and in the Salt cache (so that
+    they are shared across processes), and invalidated as soon as the size,
+    mtime or inode of the ISO changes.
+
+    Arguments:
+        path (str): path to the ISO
+        name (str): path of the file in the ISO (see `read_iso_file`)
+
+    Returns:
+        str: content of the file, or None if the ISO does not contain it
+
+    Raises:
+        OSError: if the ISO cannot be read
+        ValueError: if `path` is not a valid ISO 9660 image
+    """
+    stat = os.stat(path)
+    signature = [stat.st_size, stat.st_mtime_ns, stat.st_ino]
+
+    cached = _FILES.get((path, name))
+    if cached and cached[0] == signature:
+        return cached[1]
+
+    cache = salt.cache.Cache(__opts__)
+    key = hashlib.sha256(os.path.abspath(path).encode()).hexdigest()
+    try:
+        entry = cache.fetch(CACHE_BANK, key)
+    except SaltCacheError as exn:
+        # The cache is only an optimization, read from the ISO instead
+        log.warning("Unable to fetch cached files of %r: %s", path, exn)
+        entry = None
+    if not entry or entry.get("signature") != signature:
+        entry = {"path": path, "signature": signature, "files": {}}
+
+    if name in entry["files"]:
+        log.debug("Using cached %s from %r", name, path)
+        content = entry["files"][name]
+    else:
+        log.debug("Reading %s from %r", name, path)
+        content = read_iso_file(path, name)
+        if content is not None:
+            content = content.decode("utf-8")
+
+        entry["files"][name] = content
+        try:
+            cache.store(CACHE_BANK, key, entry)
+        except SaltCacheError as exn:
+            log.warning("Unable to cache %s from %r: %s", name, path, exn)
+
+    _FILES[(path, name)] = (signature, content)
+    return content
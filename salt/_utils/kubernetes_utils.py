@@ -1,20 +1,35 @@
 """Utility methods for manipulation of Kubernetes objects in Python.
 """
+import collections
 import datetime
-from functools import partial
+from functools import lru_cache, partial
+import importlib
+import importlib.util
 import inspect
 import keyword
 import operator
+import os
 from pprint import pformat
 import re
+import threading
+import time
 
+import salt.cache
 from salt.ext import six
 from salt.utils.dictdiffer import recursive_diff
 
-try:
-    import kubernetes.config
-    import kubernetes.client as k8s_client
-    import kubernetes.client.api as k8s_apis
+# Importing `kubernetes.client` (i.e. all its models and APIs) is slow, and
+# this module gets loaded by Salt even when no Kubernetes object is managed
+# (e.g. looking up any missing `__utils__` function loads all utils modules):
+# libraries are only imported when first used, see `_LazyModule`.
+HAS_LIBS = all(
+    importlib.util.find_spec(name) is not None for name in ("dateutil", "kubernetes")
+)
+
+
+@lru_cache(maxsize=None)
+def _import_libs():
+    import kubernetes.client  # pylint: disable=import-outside-toplevel
 
     # Workaround for https://github.com/kubernetes-client/python/issues/376
     def set_conditions(self, conditions):
@@ -22,21 +37,45 @@ try:
             conditions = []
         self._conditions = conditions
 
+    status_cls = kubernetes.client.V1beta1CustomResourceDefinitionStatus
     setattr(
-        k8s_client.V1beta1CustomResourceDefinitionStatus,
+        status_cls,
         "conditions",
-        property(
-            fget=k8s_client.V1beta1CustomResourceDefinitionStatus.conditions.fget,
-            fset=set_conditions,
-        ),
+        property(fget=status_cls.conditions.fget, fset=set_conditions),
     )
     # End of workaround
-except ImportError:
-    HAS_LIBS = False
-else:
-    HAS_LIBS = True
-    ALL_APIS = frozenset(
-        api for _, api in inspect.getmembers(k8s_apis, inspect.isclass)
+
+
+class _LazyModule(object):
+    """Proxy for a module, only imported when one of its attributes is used.
+
+    Attributes are then stored on the proxy itself, so that only their first
+    lookup goes through `__getattr__`.
+    """
+
+    def __init__(self, name):
+        self._name = name
+
+    def __getattr__(self, name):
+        _import_libs()
+        value = getattr(importlib.import_module(self._name), name)
+        setattr(self, name, value)
+        return value
+
+
+dateutil_parser = _LazyModule("dateutil.parser")
+k8s_client = _LazyModule("kubernetes.client")
+k8s_apis = _LazyModule("kubernetes.client.api")
+k8s_config = _LazyModule("kubernetes.config")
+
+
+@lru_cache(maxsize=None)
+def _all_apis():
+    return frozenset(
+        api
+        for _, api in inspect.getmembers(
+            importlib.import_module("kubernetes.client.api"), inspect.isclass
+        )
     )
 
 
@@ -73,6 +112,97 @@ class ObjectScope(object):
         return "ObjectScope({})".format(self.value)
 
 
+class ClientCache(object):
+    """Process-wide, bounded cache of `kubernetes.client.ApiClient` instances.
+
+    Building a client from a kubeconfig means reading and parsing the file,
+    and creating a new connection pool (hence new TLS handshakes). Clients are
+    thus kept around, keyed by the kubeconfig path, its modification time and
+    the context, so that keep-alive connections get reused across calls.
+
+    Editing the kubeconfig changes its mtime, which invalidates the clients
+    previously built from it. Least recently used clients are dropped once
+    `max_size` is reached.
+    """
+
+    def __init__(self, max_size=8):
+        self._max_size = max_size
+        self._clients = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, config_file=None, context=None, persist_config=False):
+        path = os.path.realpath(
+            os.path.expanduser(
+                config_file or k8s_config.kube_config.KUBE_CONFIG_DEFAULT_LOCATION
+            )
+        )
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            # Let the `kubernetes` library report the issue
+            return k8s_config.new_client_from_config(
+                config_file, context, persist_config
+            )
+
+        key = (path, mtime, context, persist_config)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None:
+                self._hits += 1
+                self._clients.move_to_end(key)
+                return client
+
+            self._misses += 1
+            # Drop clients built from a previous version of this kubeconfig
+            for stale_key in list(self._clients):
+                if stale_key[0] == path and stale_key[2:] == key[2:]:
+                    del self._clients[stale_key]
+
+            client = k8s_config.new_client_from_config(
+                config_file, context, persist_config
+            )
+            self._clients[key] = client
+            while len(self._clients) > self._max_size:
+                self._clients.popitem(last=False)
+
+        return client
+
+    def clear(self):
+        with self._lock:
+            self._clients.clear()
+            self._hits = 0
+            self._misses = 0
+
+    def info(self):
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "size": len(self._clients),
+                "max_size": self._max_size,
+            }
+
+
+CLIENT_CACHE = ClientCache()
+
+
+def get_client(config_file=None, context=None):
+    """Retrieve a (cached) `kubernetes.client.ApiClient` for a kubeconfig."""
+    return CLIENT_CACHE.get(config_file, context)
+
+
+def client_cache_info():
+    """Return hit/miss counters and size of the `ApiClient` cache."""
+    return CLIENT_CACHE.info()
+
+
+def clear_client_cache():
+    """Drop all cached `ApiClient` instances and reset the counters."""
+    CLIENT_CACHE.clear()
+
+
 class ApiClient(object):
     CRUD_METHODS = {
         "create": "create",
@@ -84,7 +214,7 @@ class ApiClient(object):
     }
 
     def __init__(self, api_cls, name, method_names=None, all_namespaces_name=None):
-        if api_cls not in ALL_APIS:
+        if api_cls not in _all_apis():
             raise ValueError("`api_cls` must be an API from `kubernetes.client.api`")
         methods = self.CRUD_METHODS
         if isinstance(method_names, six.string_types):
@@ -103,7 +233,7 @@ class ApiClient(object):
         self._client = None
 
         # Attach the API CRUD methods at construction, so we can fail at
-        # import-time instead of runtime
+        # the first use of a kind instead of when calling its methods
         self._api_methods = {
             method: getattr(api_cls, self._method_name(verb))
             for method, verb in methods.items()
@@ -136,9 +266,11 @@ class ApiClient(object):
         return _list
 
     def configure(self, config_file=None, context=None, persist_config=False):
-        self._client = kubernetes.config.new_client_from_config(
-            config_file, context, persist_config
-        )
+        client = CLIENT_CACHE.get(config_file, context, persist_config)
+        if client is not self._client:
+            # The API instance is bound to the previous client, rebuild it
+            self._client = client
+            self._api = None
 
     @property
     def api(self):
@@ -165,215 +297,232 @@ class KindInfo(object):
     relevant API through simple CRUD methods.
     CRUD methods can be filtered using `method_names` argument usefull for
     object that may not have all CRUD methods.
+
+    The model and API class are given by name (from `kubernetes.client`), and
+    only resolved when first used.
     """
 
     def __init__(self, model, api_cls, name, method_names=None):
-        self._model = model
+        self._model_name = model
+        self._model = None
+        self._api_cls_name = api_cls
+        self._name = name
+        self._method_names = method_names
+        self._client = None
         if name.startswith("namespaced_"):
             self._scope = ObjectScope("namespaced")
-            all_ns_method = "list_{}_for_all_namespaces".format(
+            self._all_ns_method = "list_{}_for_all_namespaces".format(
                 name[len("namespaced_") :]
             )
         else:
             self._scope = ObjectScope("cluster")
-            all_ns_method = None
-        self._client = ApiClient(
-            api_cls, name, method_names=method_names, all_namespaces_name=all_ns_method
-        )
+            self._all_ns_method = None
+
+    @property
+    def model(self):
+        if self._model is None:
+            self._model = getattr(k8s_client, self._model_name)
+        return self._model
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = ApiClient(
+                getattr(k8s_client, self._api_cls_name),
+                self._name,
+                method_names=self._method_names,
+                all_namespaces_name=self._all_ns_method,
+            )
+        return self._client
 
-    model = property(operator.attrgetter("_model"))
-    client = property(operator.attrgetter("_client"))
     scope = property(operator.attrgetter("_scope"))
 
 
-if HAS_LIBS:
-    KNOWN_STD_KINDS = {
-        # /api/v1/ {{{
-        ("v1", "ConfigMap"): KindInfo(
-            model=k8s_client.V1ConfigMap,
-            api_cls=k8s_client.CoreV1Api,
-            name="namespaced_config_map",
-        ),
-        ("v1", "Endpoints"): KindInfo(
-            model=k8s_client.V1Endpoints,
-            api_cls=k8s_client.CoreV1Api,
-            name="namespaced_endpoints",
-        ),
-        ("v1", "Namespace"): KindInfo(
-            model=k8s_client.V1Namespace,
-            api_cls=k8s_client.CoreV1Api,
-            name="namespace",
-        ),
-        ("v1", "Node"): KindInfo(
-            model=k8s_client.V1Node,
-            api_cls=k8s_client.CoreV1Api,
-            name="node",
-        ),
-        ("v1", "Pod"): KindInfo(
-            model=k8s_client.V1Pod, api_cls=k8s_client.CoreV1Api, name="namespaced_pod"
-        ),
-        ("v1", "PodEviction"): KindInfo(
-            model=k8s_client.V1beta1Eviction,
-            api_cls=k8s_client.CoreV1Api,
-            name="namespaced_pod_eviction",
-            method_names="create",
-        ),
-        ("v1", "Secret"): KindInfo(
-            model=k8s_client.V1Secret,
-            api_cls=k8s_client.CoreV1Api,
-            name="namespaced_secret",
-        ),
-        ("v1", "Service"): KindInfo(
-            model=k8s_client.V1Service,
-            api_cls=k8s_client.CoreV1Api,
-            name="namespaced_service",
-        ),
-        ("v1", "ServiceAccount"): KindInfo(
-            model=k8s_client.V1ServiceAccount,
-            api_cls=k8s_client.CoreV1Api,
-            name="namespaced_service_account",
-        ),
-        ("v1", "ReplicationController"): KindInfo(
-            model=k8s_client.V1ReplicationController,
-            api_cls=k8s_client.CoreV1Api,
-            name="namespaced_replication_controller",
-        ),
-        # }}}
-        # /apis/apps/v1/ {{{
-        ("apps/v1", "DaemonSet"): KindInfo(
-            model=k8s_client.V1DaemonSet,
-            api_cls=k8s_client.AppsV1Api,
-            name="namespaced_daemon_set",
-        ),
-        ("apps/v1", "Deployment"): KindInfo(
-            model=k8s_client.V1Deployment,
-            api_cls=k8s_client.AppsV1Api,
-            name="namespaced_deployment",
-        ),
-        ("apps/v1", "ReplicaSet"): KindInfo(
-            model=k8s_client.V1ReplicaSet,
-            api_cls=k8s_client.AppsV1Api,
-            name="namespaced_replica_set",
-        ),
-        ("apps/v1", "StatefulSet"): KindInfo(
-            model=k8s_client.V1StatefulSet,
-            api_cls=k8s_client.AppsV1Api,
-            name="namespaced_stateful_set",
-        ),
-        # }}}
-        # /apis/extensions/v1beta1/ {{{
-        ("extensions/v1beta1", "Ingress"): KindInfo(
-            model=k8s_client.ExtensionsV1beta1Ingress,
-            api_cls=k8s_client.ExtensionsV1beta1Api,
-            name="namespaced_ingress",
-        ),
-        # }}}
-        # /apis/apiextensions.k8s.io/v1/ {{{
-        ("apiextensions.k8s.io/v1", "CustomResourceDefinition"): KindInfo(
-            model=k8s_client.V1CustomResourceDefinition,
-            api_cls=k8s_client.ApiextensionsV1Api,
-            name="custom_resource_definition",
-        ),
-        # }}}
-        # /apis/apiextensions.k8s.io/v1beta1/ {{{
-        ("apiextensions.k8s.io/v1beta1", "CustomResourceDefinition"): KindInfo(
-            model=k8s_client.V1beta1CustomResourceDefinition,
-            api_cls=k8s_client.ApiextensionsV1beta1Api,
-            name="custom_resource_definition",
-        ),
-        # }}}
-        # /apis/apiregistration.k8s.io/v1/ {{{
-        ("apiregistration.k8s.io/v1", "APIService"): KindInfo(
-            model=k8s_client.V1APIService,
-            api_cls=k8s_client.ApiregistrationV1Api,
-            name="api_service",
-        ),
-        # }}}
-        # /apis/apiregistration.k8s.io/v1beta1/ {{{
-        ("apiregistration.k8s.io/v1beta1", "APIService"): KindInfo(
-            model=k8s_client.V1beta1APIService,
-            api_cls=k8s_client.ApiregistrationV1beta1Api,
-            name="api_service",
-        ),
-        # }}}
-        # /apis/batch/v1beta1/ {{{
-        ("batch/v1beta1", "CronJob"): KindInfo(
-            model=k8s_client.V1beta1CronJob,
-            api_cls=k8s_client.BatchV1beta1Api,
-            name="namespaced_cron_job",
-        ),
-        # }}}
-        # /apis/networking.k8s.io/v1beta1/ {{{
-        ("networking.k8s.io/v1beta1", "Ingress"): KindInfo(
-            model=k8s_client.NetworkingV1beta1Ingress,
-            api_cls=k8s_client.NetworkingV1beta1Api,
-            name="namespaced_ingress",
-        ),
-        # }}}
-        # /apis/policy/v1beta1/ {{{
-        ("policy/v1beta1", "PodDisruptionBudget"): KindInfo(
-            model=k8s_client.V1beta1PodDisruptionBudget,
-            api_cls=k8s_client.PolicyV1beta1Api,
-            name="namespaced_pod_disruption_budget",
-        ),
-        ("policy/v1beta1", "PodSecurityPolicy"): KindInfo(
-            model=k8s_client.PolicyV1beta1PodSecurityPolicy,
-            api_cls=k8s_client.PolicyV1beta1Api,
-            name="pod_security_policy",
-        ),
-        # }}}
-        # /apis/rbac.authorization.k8s.io/v1/ {{{
-        ("rbac.authorization.k8s.io/v1", "ClusterRole"): KindInfo(
-            model=k8s_client.V1ClusterRole,
-            api_cls=k8s_client.RbacAuthorizationV1Api,
-            name="cluster_role",
-        ),
-        ("rbac.authorization.k8s.io/v1", "ClusterRoleBinding"): KindInfo(
-            model=k8s_client.V1ClusterRoleBinding,
-            api_cls=k8s_client.RbacAuthorizationV1Api,
-            name="cluster_role_binding",
-        ),
-        ("rbac.authorization.k8s.io/v1", "Role"): KindInfo(
-            model=k8s_client.V1Role,
-            api_cls=k8s_client.RbacAuthorizationV1Api,
-            name="namespaced_role",
-        ),
-        ("rbac.authorization.k8s.io/v1", "RoleBinding"): KindInfo(
-            model=k8s_client.V1RoleBinding,
-            api_cls=k8s_client.RbacAuthorizationV1Api,
-            name="namespaced_role_binding",
-        ),
-        # }}}
-        # /apis/rbac.authorization.k8s.io/v1beta1/ {{{
-        ("rbac.authorization.k8s.io/v1beta1", "ClusterRole"): KindInfo(
-            model=k8s_client.V1beta1ClusterRole,
-            api_cls=k8s_client.RbacAuthorizationV1beta1Api,
-            name="cluster_role",
-        ),
-        ("rbac.authorization.k8s.io/v1beta1", "ClusterRoleBinding"): KindInfo(
-            model=k8s_client.V1beta1ClusterRoleBinding,
-            api_cls=k8s_client.RbacAuthorizationV1beta1Api,
-            name="cluster_role_binding",
-        ),
-        ("rbac.authorization.k8s.io/v1beta1", "Role"): KindInfo(
-            model=k8s_client.V1beta1Role,
-            api_cls=k8s_client.RbacAuthorizationV1beta1Api,
-            name="namespaced_role",
-        ),
-        ("rbac.authorization.k8s.io/v1beta1", "RoleBinding"): KindInfo(
-            model=k8s_client.V1beta1RoleBinding,
-            api_cls=k8s_client.RbacAuthorizationV1beta1Api,
-            name="namespaced_role_binding",
-        ),
-        # }}}
-        # /apis/storage.k8s.io/v1/ {{{
-        ("storage.k8s.io/v1", "StorageClass"): KindInfo(
-            model=k8s_client.V1StorageClass,
-            api_cls=k8s_client.StorageV1Api,
-            name="storage_class",
-        ),
-        # }}}
-    }
+KNOWN_STD_KINDS = {
+    # /api/v1/ {{{
+    ("v1", "ConfigMap"): KindInfo(
+        model="V1ConfigMap",
+        api_cls="CoreV1Api",
+        name="namespaced_config_map",
+    ),
+    ("v1", "Endpoints"): KindInfo(
+        model="V1Endpoints",
+        api_cls="CoreV1Api",
+        name="namespaced_endpoints",
+    ),
+    ("v1", "Namespace"): KindInfo(
+        model="V1Namespace",
+        api_cls="CoreV1Api",
+        name="namespace",
+    ),
+    ("v1", "Node"): KindInfo(
+        model="V1Node",
+        api_cls="CoreV1Api",
+        name="node",
+    ),
+    ("v1", "Pod"): KindInfo(model="V1Pod", api_cls="CoreV1Api", name="namespaced_pod"),
+    ("v1", "PodEviction"): KindInfo(
+        model="V1beta1Eviction",
+        api_cls="CoreV1Api",
+        name="namespaced_pod_eviction",
+        method_names="create",
+    ),
+    ("v1", "Secret"): KindInfo(
+        model="V1Secret",
+        api_cls="CoreV1Api",
+        name="namespaced_secret",
+    ),
+    ("v1", "Service"): KindInfo(
+        model="V1Service",
+        api_cls="CoreV1Api",
+        name="namespaced_service",
+    ),
+    ("v1", "ServiceAccount"): KindInfo(
+        model="V1ServiceAccount",
+        api_cls="CoreV1Api",
+        name="namespaced_service_account",
+    ),
+    ("v1", "ReplicationController"): KindInfo(
+        model="V1ReplicationController",
+        api_cls="CoreV1Api",
+        name="namespaced_replication_controller",
+    ),
+    # }}}
+    # /apis/apps/v1/ {{{
+    ("apps/v1", "DaemonSet"): KindInfo(
+        model="V1DaemonSet",
+        api_cls="AppsV1Api",
+        name="namespaced_daemon_set",
+    ),
+    ("apps/v1", "Deployment"): KindInfo(
+        model="V1Deployment",
+        api_cls="AppsV1Api",
+        name="namespaced_deployment",
+    ),
+    ("apps/v1", "ReplicaSet"): KindInfo(
+        model="V1ReplicaSet",
+        api_cls="AppsV1Api",
+        name="namespaced_replica_set",
+    ),
+    ("apps/v1", "StatefulSet"): KindInfo(
+        model="V1StatefulSet",
+        api_cls="AppsV1Api",
+        name="namespaced_stateful_set",
+    ),
+    # }}}
+    # /apis/extensions/v1beta1/ {{{
+    ("extensions/v1beta1", "Ingress"): KindInfo(
+        model="ExtensionsV1beta1Ingress",
+        api_cls="ExtensionsV1beta1Api",
+        name="namespaced_ingress",
+    ),
+    # }}}
+    # /apis/apiextensions.k8s.io/v1/ {{{
+    ("apiextensions.k8s.io/v1", "CustomResourceDefinition"): KindInfo(
+        model="V1CustomResourceDefinition",
+        api_cls="ApiextensionsV1Api",
+        name="custom_resource_definition",
+    ),
+    # }}}
+    # /apis/apiextensions.k8s.io/v1beta1/ {{{
+    ("apiextensions.k8s.io/v1beta1", "CustomResourceDefinition"): KindInfo(
+        model="V1beta1CustomResourceDefinition",
+        api_cls="ApiextensionsV1beta1Api",
+        name="custom_resource_definition",
+    ),
+    # }}}
+    # /apis/apiregistration.k8s.io/v1/ {{{
+    ("apiregistration.k8s.io/v1", "APIService"): KindInfo(
+        model="V1APIService",
+        api_cls="ApiregistrationV1Api",
+        name="api_service",
+    ),
+    # }}}
+    # /apis/apiregistration.k8s.io/v1beta1/ {{{
+    ("apiregistration.k8s.io/v1beta1", "APIService"): KindInfo(
+        model="V1beta1APIService",
+        api_cls="ApiregistrationV1beta1Api",
+        name="api_service",
+    ),
+    # }}}
+    # /apis/batch/v1beta1/ {{{
+    ("batch/v1beta1", "CronJob"): KindInfo(
+        model="V1beta1CronJob",
+        api_cls="BatchV1beta1Api",
+        name="namespaced_cron_job",
+    ),
+    # }}}
+    # /apis/networking.k8s.io/v1beta1/ {{{
+    ("networking.k8s.io/v1beta1", "Ingress"): KindInfo(
+        model="NetworkingV1beta1Ingress",
+        api_cls="NetworkingV1beta1Api",
+        name="namespaced_ingress",
+    ),
+    # }}}
+    # /apis/policy/v1beta1/ {{{
+    ("policy/v1beta1", "PodDisruptionBudget"): KindInfo(
+        model="V1beta1PodDisruptionBudget",
+        api_cls="PolicyV1beta1Api",
+        name="namespaced_pod_disruption_budget",
+    ),
+    ("policy/v1beta1", "PodSecurityPolicy"): KindInfo(
+        model="PolicyV1beta1PodSecurityPolicy",
+        api_cls="PolicyV1beta1Api",
+        name="pod_security_policy",
+    ),
+    # }}}
+    # /apis/rbac.authorization.k8s.io/v1/ {{{
+    ("rbac.authorization.k8s.io/v1", "ClusterRole"): KindInfo(
+        model="V1ClusterRole",
+        api_cls="RbacAuthorizationV1Api",
+        name="cluster_role",
+    ),
+    ("rbac.authorization.k8s.io/v1", "ClusterRoleBinding"): KindInfo(
+        model="V1ClusterRoleBinding",
+        api_cls="RbacAuthorizationV1Api",
+        name="cluster_role_binding",
+    ),
+    ("rbac.authorization.k8s.io/v1", "Role"): KindInfo(
+        model="V1Role",
+        api_cls="RbacAuthorizationV1Api",
+        name="namespaced_role",
+    ),
+    ("rbac.authorization.k8s.io/v1", "RoleBinding"): KindInfo(
+        model="V1RoleBinding",
+        api_cls="RbacAuthorizationV1Api",
+        name="namespaced_role_binding",
+    ),
+    # }}}
+    # /apis/rbac.authorization.k8s.io/v1beta1/ {{{
+    ("rbac.authorization.k8s.io/v1beta1", "ClusterRole"): KindInfo(
+        model="V1beta1ClusterRole",
+        api_cls="RbacAuthorizationV1beta1Api",
+        name="cluster_role",
+    ),
+    ("rbac.authorization.k8s.io/v1beta1", "ClusterRoleBinding"): KindInfo(
+        model="V1beta1ClusterRoleBinding",
+        api_cls="RbacAuthorizationV1beta1Api",
+        name="cluster_role_binding",
+    ),
+    ("rbac.authorization.k8s.io/v1beta1", "Role"): KindInfo(
+        model="V1beta1Role",
+        api_cls="RbacAuthorizationV1beta1Api",
+        name="namespaced_role",
+    ),
+    ("rbac.authorization.k8s.io/v1beta1", "RoleBinding"): KindInfo(
+        model="V1beta1RoleBinding",
+        api_cls="RbacAuthorizationV1beta1Api",
+        name="namespaced_role_binding",
+    ),
+    # }}}
+    # /apis/storage.k8s.io/v1/ {{{
+    ("storage.k8s.io/v1", "StorageClass"): KindInfo(
+        model="V1StorageClass",
+        api_cls="StorageV1Api",
+        name="storage_class",
+    ),
+    # }}}
+}
 
 
 # CustomResources cannot rely on statically declared models, which is why their
@@ -468,16 +617,28 @@ class CRKindInfo(object):
             )
 
         self._api_version = api_version
+        self._group = group
+        self._version = version
         self._scope = scope
-        self._client = CustomApiClient(
-            group=group, version=version, kind=kind, plural=plural, scope=scope
-        )
+        self._plural = plural
+        self._client = None
         self._kind = kind
 
     api_version = property(operator.attrgetter("_api_version"))
     kind = property(operator.attrgetter("_kind"))
     scope = property(operator.attrgetter("_scope"))
-    client = property(operator.attrgetter("_client"))
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = CustomApiClient(
+                group=self._group,
+                version=self._version,
+                kind=self.kind,
+                plural=self._plural,
+                scope=self.scope,
+            )
+        return self._client
 
     @property
     def key(self):
@@ -485,50 +646,51 @@ class CRKindInfo(object):
         return (self.api_version, self.kind)
 
 
-if HAS_LIBS:
-    _CUSTOM_KINDS = [
-        CRKindInfo(
-            "monitoring.coreos.com/v1",
-            "Alertmanager",
-            scope="namespaced",
-            plural="alertmanagers",
-        ),
-        CRKindInfo(
-            "monitoring.coreos.com/v1",
-            "Prometheus",
-            scope="namespaced",
-            plural="prometheuses",
-        ),
-        CRKindInfo(
-            "monitoring.coreos.com/v1",
-            "PrometheusRule",
-            scope="namespaced",
-            plural="prometheusrules",
-        ),
-        CRKindInfo(
-            "monitoring.coreos.com/v1",
-            "ServiceMonitor",
-            scope="namespaced",
-            plural="servicemonitors",
-        ),
-        CRKindInfo(
-            "storage.metalk8s.scality.com/v1alpha1",
-            "Volume",
-            scope="cluster",
-            plural="volumes",
-        ),
-    ]
-
-    KNOWN_CUSTOM_KINDS = {kind.key: kind for kind in _CUSTOM_KINDS}
+_CUSTOM_KINDS = [
+    CRKindInfo(
+        "monitoring.coreos.com/v1",
+        "Alertmanager",
+        scope="namespaced",
+        plural="alertmanagers",
+    ),
+    CRKindInfo(
+        "monitoring.coreos.com/v1",
+        "Prometheus",
+        scope="namespaced",
+        plural="prometheuses",
+    ),
+    CRKindInfo(
+        "monitoring.coreos.com/v1",
+        "PrometheusRule",
+        scope="namespaced",
+        plural="prometheusrules",
+    ),
+    CRKindInfo(
+        "monitoring.coreos.com/v1",
+        "ServiceMonitor",
+        scope="namespaced",
+        plural="servicemonitors",
+    ),
+    CRKindInfo(
+        "storage.metalk8s.scality.com/v1alpha1",
+        "Volume",
+        scope="cluster",
+        plural="volumes",
+    ),
+]
+
+KNOWN_CUSTOM_KINDS = {kind.key: kind for kind in _CUSTOM_KINDS}
 
 
 class _DictWrapper(object):
     """Wrapper for dynamic attribute access support over a simple dict.
 
-    Implemented by storing the dicts and overloading the `__getattribute__`
+    Implemented by storing the dicts and overloading the `__getattr__`
     to fallback on the internal `_fields` for retrieving an attribute and
     returning a `_DictWrapper` also overloading the `__setattr__` to being
     able to change a value from the origin dict.
+    Keys are matched using their snake case name, through an index built
+    once per dict, and sub-dicts wrappers are reused across lookups.
 
     Used by `CustomObject` to emulate the other models for `kubernetes.client`.
 
@@ -546,8 +708,14 @@ class _DictWrapper(object):
     AttributeError: Custom object has no attribute 'unknown'
     """
 
+    _ATTRIBUTES = frozenset(["_fields", "_keys", "_children"])
+
     def __init__(self, fields):
         self._fields = fields
+        # Keys of `_fields` indexed by their snake case name (built on first
+        # use), and wrappers for sub-dicts indexed by key
+        self._keys = None
+        self._children = {}
 
     @classmethod
     def from_value(cls, value):
@@ -563,22 +731,46 @@ class _DictWrapper(object):
     def __repr__(self):
         return repr(self._fields)
 
-    def __getattribute__(self, name):
+    def _lookup_key(self, name):
+        if name in self._fields:
+            return name
+
+        if self._keys is not None:
+            key = self._keys.get(name)
+            if key is not None and key in self._fields:
+                return key
+
+        # (Re)build the index, `_fields` may have been updated since then
+        self._keys = {}
+        for key in self._fields:
+            self._keys.setdefault(_convert_attribute_name(key), key)
+
         try:
-            return super(_DictWrapper, self).__getattribute__(name)
-        except AttributeError:
-            if name in self._fields:
-                return self.from_value(self._fields[name])
-            for key in self._fields:
-                if _convert_attribute_name(key) == name:
-                    return self.from_value(self._fields[key])
+            return self._keys[name]
+        except KeyError:
             raise AttributeError(  # pylint: disable=raise-missing-from
                 "Custom object has no attribute '{}'".format(name)
             )
 
+    def __getattr__(self, name):
+        # Only called if the regular attribute lookup failed
+        if name in self._ATTRIBUTES:
+            # Not initialized yet (e.g. when copying)
+            raise AttributeError(name)
+
+        key = self._lookup_key(name)
+        value = self._fields[key]
+        if not isinstance(value, dict):
+            return self.from_value(value)
+
+        child = self._children.get(key)
+        if child is None or child._fields is not value:
+            child = self._children[key] = self.from_value(value)
+        return child
+
     def __setattr__(self, name, value):
         # First check for class values then retrieve from dict
-        if name in ["_fields"]:
+        if name in self._ATTRIBUTES:
             super(_DictWrapper, self).__setattr__(name, value)
         else:
             self._fields[name] = value
@@ -612,11 +804,12 @@ class CustomObject(object):
 
         return self.to_dict() == other.to_dict()
 
-    def __getattribute__(self, name):
-        try:
-            return super(CustomObject, self).__getattribute__(name)
-        except AttributeError:
-            return getattr(self._attr_dict, name)
+    def __getattr__(self, name):
+        # Only called if the regular attribute lookup failed
+        if name == "_attr_dict":
+            # Not initialized yet (e.g. when copying)
+            raise AttributeError(name)
+        return getattr(self._attr_dict, name)
 
     def __setattr__(self, name, value):
         # First check for class values then retrieve from dict
@@ -626,6 +819,33 @@ class CustomObject(object):
             setattr(self._attr_dict, name, value)
 
 
+INFORMER_BANK = "metalk8s/informer"
+INFORMER_MAX_AGE_OPTION = "metalk8s.informer_max_age"
+DEFAULT_INFORMER_MAX_AGE = 180
+
+
+def get_informer_store(name):
+    """Retrieve objects cached by the `metalk8s_kubernetes_informer` engine.
+
+    The store contains the objects (under `items`, indexed by name) as well
+    as some indexes (under `indexes`, e.g. Nodes by role or Volumes by node
+    name), see the engine for details.
+
+    Returns None if the engine is not running on this Salt master, or if the
+    store was not refreshed for more than `metalk8s.informer_max_age` seconds,
+    in which case callers should query the API server instead.
+    """
+    max_age = __opts__.get(INFORMER_MAX_AGE_OPTION, DEFAULT_INFORMER_MAX_AGE)
+    if not max_age or not __opts__.get("__role") == "master":
+        return None
+
+    store = salt.cache.Cache(__opts__).fetch(INFORMER_BANK, name)
+    if not store or time.time() - store["timestamp"] > max_age:
+        return None
+
+    return store
+
+
 def get_kind_info(manifest):
     try:
         api_version = manifest["apiVersion"]
@@ -677,42 +897,7 @@ def _build_standard_object(model, manifest):
     This method assumes `model` to be a member of `kubernetes.client.models`,
     so that it can use its `attribute_map` and `openapi_types` attributes.
     """
-    # `model.attribute_map` contain all attribute correspondance between
-    # snake case and YAML style (camel case) so we need to reverse it
-    # e.g.: {
-    #   'status': 'status', 'kind': 'kind', 'spec': 'spec',
-    #   'api_version': 'apiVersion', 'metadata': 'metadata'
-    # }
-    reverse_attr_map = {value: key for key, value in model.attribute_map.items()}
-
-    kwargs = {}
-    for src_key, src_value in manifest.items():
-        key = reverse_attr_map.get(src_key, src_key)
-        type_str = model.openapi_types.get(key)
-
-        if type_str is None:
-            raise ValueError(
-                'Unsupported attribute {} for "{}" object.'.format(
-                    src_key, model.__name__
-                )
-            )
-
-        try:
-            value = _cast_value(src_value, type_str)
-        except TypeError as exc:
-            raise ValueError(
-                'Invalid value for attribute {} of a "{}" object'.format(
-                    src_key, model.__name__
-                )
-            ) from exc
-
-        kwargs[key] = value
-
-    return model(**kwargs)
-
-
-DICT_PATTERN = re.compile(r"^dict\(str,\s?(?P<value_type>\S+)\)$")
-LIST_PATTERN = re.compile(r"^list\[(?P<value_type>\S+)\]$")
+    return _get_converter(model.__name__)(manifest)
 
 
 def _cast_value(value, type_string):
@@ -725,77 +910,187 @@ def _cast_value(value, type_string):
     if value is None:
         return value
 
-    if type_string == "str":
-        if not isinstance(value, six.string_types):
-            raise _type_error(value, expected="a string")
-        return value
+    return _get_converter(type_string)(value)
 
-    if type_string == "bool":
-        if not isinstance(value, bool):
-            raise _type_error(value, expected="a boolean")
-        return value
 
-    if type_string == "int":
-        if not isinstance(value, six.integer_types):
-            raise _type_error(value, expected="an integer")
-        return value
+DICT_PATTERN = re.compile(r"^dict\(str,\s?(?P<value_type>\S+)\)$")
+LIST_PATTERN = re.compile(r"^list\[(?P<value_type>\S+)\]$")
 
-    if type_string == "float":
-        if not isinstance(value, six.integer_types + (float,)):
-            raise _type_error(value, expected="a float")
-        return float(value)
+# Converters from manifest values to Python values, indexed by the type
+# string from `openapi_types` declarations, see `_get_converter`
+_CONVERTERS = {}
 
-    if type_string == "object":
-        # NOTE: this corresponds to fields accepting different types, such as
-        # either string or integer (e.g. for ports or thresholds). As such, we
-        # don't attempt validation. Note however that some cases may require
-        # casting into specific objects, which we don't handle yet.
-        return value
 
-    if type_string == "datetime":
-        # YAML only supports dates as strings, though we don't know in advance
-        # what format would be used in source manifests (most likely, there
-        # wouldn't be any date). We thus pick the Swagger `date-time` string
-        # format (see swagger.io/docs/specification/data-models/data-types/).
-        try:
-            return datetime.datetime.strptime(value, "%Y-%m-%dT%H:%M:%SZ")
-        except (TypeError, ValueError):
-            # pylint: disable=raise-missing-from
-            raise _type_error(value, expected="a date-time string")
+def _get_converter(type_string):
+    """Retrieve the converter for a type string, compiling it on first use."""
+    try:
+        return _CONVERTERS[type_string]
+    except KeyError:
+        converter = _CONVERTERS[type_string] = _compile_converter(type_string)
+        return converter
+
+
+def _compile_converter(type_string):
+    scalar_converter = _SCALAR_CONVERTERS.get(type_string)
+    if scalar_converter is not None:
+        return scalar_converter
 
     dict_match = DICT_PATTERN.match(type_string)
     if dict_match is not None:
+        return _compile_dict_converter(dict_match.group("value_type"))
+
+    list_match = LIST_PATTERN.match(type_string)
+    if list_match is not None:
+        return _compile_list_converter(list_match.group("value_type"))
+
+    try:
+        model = getattr(k8s_client.models, type_string)
+    except AttributeError:
+        # This should never happen, otherwise this function should get updated
+        raise ValueError(  # pylint: disable=raise-missing-from
+            "Unknown type string provided: {}.".format(type_string)
+        )
+
+    return _compile_model_converter(model)
+
+
+def _compile_dict_converter(value_type_str):
+    def convert(value):
         if not isinstance(value, dict):
             raise _type_error(value, expected="a dictionary")
 
         if not all(isinstance(key, six.string_types) for key in value.keys()):
             raise _type_error(value, expected="a dictionary with string keys only")
 
-        value_type_str = dict_match.group("value_type")
         return {key: _cast_value(val, value_type_str) for key, val in value.items()}
 
-    list_match = LIST_PATTERN.match(type_string)
-    if list_match is not None:
+    return convert
+
+
+def _compile_list_converter(value_type_str):
+    def convert(value):
         if not isinstance(value, list):
             raise _type_error(value, expected="a list")
 
-        value_type_str = list_match.group("value_type")
         return [_cast_value(val, value_type_str) for val in value]
 
+    return convert
+
+
+def _compile_model_converter(model):
+    # Map both YAML style (camel case) and Python style (snake case) attribute
+    # names to the Python attribute name and its type string, YAML style
+    # taking precedence
+    # e.g.: {
+    #   'apiVersion': ('api_version', 'str'),
+    #   'api_version': ('api_version', 'str'),
+    #   'metadata': ('metadata', 'V1ObjectMeta'), ...
+    # }
+    fields = {
+        model.attribute_map[key]: (key, type_str)
+        for key, type_str in model.openapi_types.items()
+    }
+    for key, type_str in model.openapi_types.items():
+        fields.setdefault(key, (key, type_str))
+
+    # Models build a new (costly) `Configuration` when not provided with one
+    shared_kwargs = {}
+    if "local_vars_configuration" in inspect.signature(model).parameters:
+        shared_kwargs["local_vars_configuration"] = _get_model_configuration()
+
+    def convert(manifest):
+        if not isinstance(manifest, dict):
+            raise _type_error(
+                manifest, expected='a dict to cast as a "{}"'.format(model.__name__)
+            )
+
+        kwargs = dict(shared_kwargs)
+        for src_key, src_value in manifest.items():
+            try:
+                key, type_str = fields[src_key]
+            except KeyError:
+                raise ValueError(  # pylint: disable=raise-missing-from
+                    'Unsupported attribute {} for "{}" object.'.format(
+                        src_key, model.__name__
+                    )
+                )
+
+            try:
+                kwargs[key] = _cast_value(src_value, type_str)
+            except TypeError as exc:
+                raise ValueError(
+                    'Invalid value for attribute {} of a "{}" object'.format(
+                        src_key, model.__name__
+                    )
+                ) from exc
+
+        return model(**kwargs)
+
+    return convert
+
+
+_MODEL_CONFIGURATION = None
+
+
+def _get_model_configuration():
+    global _MODEL_CONFIGURATION  # pylint: disable=global-statement
+    if _MODEL_CONFIGURATION is None:
+        _MODEL_CONFIGURATION = k8s_client.Configuration()
+    return _MODEL_CONFIGURATION
+
+
+def _convert_str(value):
+    if not isinstance(value, six.string_types):
+        raise _type_error(value, expected="a string")
+    return value
+
+
+def _convert_bool(value):
+    if not isinstance(value, bool):
+        raise _type_error(value, expected="a boolean")
+    return value
+
+
+def _convert_int(value):
+    if not isinstance(value, six.integer_types):
+        raise _type_error(value, expected="an integer")
+    return value
+
+
+def _convert_float(value):
+    if not isinstance(value, six.integer_types + (float,)):
+        raise _type_error(value, expected="a float")
+    return float(value)
+
+
+def _convert_object(value):
+    # NOTE: this corresponds to fields accepting different types, such as
+    # either string or integer (e.g. for ports or thresholds). As such, we
+    # don't attempt validation. Note however that some cases may require
+    # casting into specific objects, which we don't handle yet.
+    return value
+
+
+def _convert_datetime(value):
+    # YAML only supports dates as strings, though we don't know in advance
+    # what format would be used in source manifests (most likely, there
+    # wouldn't be any date). We thus pick the Swagger `date-time` string
+    # format (see swagger.io/docs/specification/data-models/data-types/).
     try:
-        model = getattr(k8s_client.models, type_string)
-    except AttributeError:
-        # This should never happen, otherwise this function should get updated
-        raise ValueError(  # pylint: disable=raise-missing-from
-            "Unknown type string provided: {}.".format(type_string)
-        )
+        return datetime.datetime.strptime(value, "%Y-%m-%dT%H:%M:%SZ")
+    except (TypeError, ValueError):
+        # pylint: disable=raise-missing-from
+        raise _type_error(value, expected="a date-time string")
 
-    if not isinstance(value, dict):
-        raise _type_error(
-            value, expected='a dict to cast as a "{}"'.format(model.__name__)
-        )
 
-    return _build_standard_object(model, value)
+_SCALAR_CONVERTERS = {
+    "str": _convert_str,
+    "bool": _convert_bool,
+    "int": _convert_int,
+    "float": _convert_float,
+    "object": _convert_object,
+    "datetime": _convert_datetime,
+}
 
 
 def _type_error(value, expected):
@@ -804,6 +1099,90 @@ def _type_error(value, expected):
     )
 
 
+def convert_raw_object(data, model):
+    """Convert an object, as returned by the API server, to a snake case dict.
+
+    The result has the same shape as `model.to_dict()` for the `model`
+    instance `kubernetes.client` would deserialize from `data`, without
+    building the (costly) intermediate Python objects.
+    """
+    return _get_raw_converter(model.__name__)(data)
+
+
+# Converters from raw values to the shape of their deserialized value in the
+# result of `to_dict`, indexed by type string, see `convert_raw_object`
+_RAW_CONVERTERS = {}
+
+
+def _get_raw_converter(type_string):
+    try:
+        return _RAW_CONVERTERS[type_string]
+    except KeyError:
+        converter = _RAW_CONVERTERS[type_string] = _compile_raw_converter(type_string)
+        return converter
+
+
+def _compile_raw_converter(type_string):
+    # NOTE: this mimics `kubernetes.client.ApiClient.deserialize`
+    primitive_type = _RAW_PRIMITIVE_TYPES.get(type_string)
+    if primitive_type is not None:
+
+        def convert_primitive(value):
+            try:
+                return primitive_type(value)
+            except TypeError:
+                return value
+
+        return convert_primitive
+
+    if type_string == "object":
+        return lambda value: value
+
+    if type_string == "datetime":
+        return dateutil_parser.parse
+
+    if type_string == "date":
+        return lambda value: dateutil_parser.parse(value).date()
+
+    dict_match = DICT_PATTERN.match(type_string)
+    if dict_match is not None:
+        value_type_str = dict_match.group("value_type")
+        return lambda value: {
+            key: _convert_raw_value(val, value_type_str) for key, val in value.items()
+        }
+
+    list_match = LIST_PATTERN.match(type_string)
+    if list_match is not None:
+        value_type_str = list_match.group("value_type")
+        return lambda value: [_convert_raw_value(val, value_type_str) for val in value]
+
+    model = getattr(k8s_client.models, type_string)
+    if not model.openapi_types:
+        return lambda value: value
+
+    fields = [
+        (key, model.attribute_map[key], type_str)
+        for key, type_str in model.openapi_types.items()
+    ]
+
+    def convert_model(value):
+        return {
+            key: _convert_raw_value(value.get(src_key), type_str)
+            for key, src_key, type_str in fields
+        }
+
+    return convert_model
+
+
+def _convert_raw_value(value, type_string):
+    if value is None:
+        return None
+    return _get_raw_converter(type_string)(value)
+
+
+_RAW_PRIMITIVE_TYPES = {"str": str, "int": int, "float": float, "bool": bool}
+
+
 def validate_manifest(manifest):
     """Ensure a Kubernetes object is strictly conformant to its OpenAPI schema.
 
@@ -856,6 +1235,9 @@ def _cast_dict_keys(data, key_cast):
     return data
 
 
+# Attribute names are few (those from the K8s OpenAPI schema, and CR fields),
+# so all of them can be kept around
+@lru_cache(maxsize=4096)
 def _convert_attribute_name(key):
     """Translation of attribute names from K8s YAML style to Python snake case.
 
@@ -888,11 +1270,21 @@ def _convert_attribute_name(key):
     if key.startswith("$"):
         # Only two supported values, '$ref' and '$schema'
         return key[1:]
-    for pattern in ["([a-z])([A-Z0-9])", "([A-Z0-9])([A-Z0-9][a-z])"]:
-        key = re.sub(pattern, r"\1_\2", key)
+    for pattern in _ATTRIBUTE_NAME_PATTERNS:
+        key = pattern.sub(r"\1_\2", key)
     return key.lower()
 
 
+_ATTRIBUTE_NAME_PATTERNS = [
+    re.compile("([a-z])([A-Z0-9])"),
+    re.compile("([A-Z0-9])([A-Z0-9][a-z])"),
+]
+
+
 def camel_to_snake(source):
-    """Translation of attribute names from K8s YAML style to Python snake case."""
+    """Translation of attribute names from K8s YAML style to Python snake case.
+
+    Only key names are cached (see `_convert_attribute_name`), since `source`
+    is a mutable, thus unhashable, dict.
+    """
     return _cast_dict_keys(source, _convert_attribute_name)
@@ -1,9 +1,22 @@
 """
 Utility module for external pillars.
 
-The utilities contained in this module have no external dependencies, so
-they may be imported as is in external pillar modules.
+Besides helpers for pillar data and errors, this module shares cluster-wide
+data across pillar compilations, using the Salt master cache (configured from
+`__opts__`): it is meant to be loaded as a Salt utils module, and used from
+external pillars or runners on the Salt master.
 """
+import logging
+import time
+
+import salt.cache
+
+
+log = logging.getLogger(__name__)
+
+SNAPSHOT_BANK = "metalk8s/pillar_snapshot"
+SNAPSHOT_TTL_OPTION = "metalk8s.pillar_snapshot_ttl"
+DEFAULT_SNAPSHOT_TTL = 5
 
 
 def assert_equals(source_dict, expected_dict):
@@ -78,3 +91,92 @@ def errors_to_dict(error_list):
      dict: a dict with `_errors` key and error list value
     """
     return {"_errors": error_list}
+
+
+def has_errors(data):
+    """
+    Check whether some pillar data (or any of its sub-dicts) contains errors.
+
+    Args:
+     - data (dict): the pillar data to check
+
+    Returns:
+     bool: True if some `_errors` key was found, False otherwise
+    """
+    if isinstance(data, dict):
+        return "_errors" in data or any(has_errors(value) for value in data.values())
+    return False
+
+
+def get_snapshot(name, fetch, version=None):
+    """
+    Retrieve cluster-wide data shared across pillar compilations.
+
+    When pillar gets refreshed on all minions, each compilation would retrieve
+    the same cluster-wide data (e.g. Nodes, Volumes) from the API server. The
+    result of `fetch` is thus stored in the Salt master cache, and reused by
+    all compilations for `metalk8s.pillar_snapshot_ttl` seconds (from the
+    master configuration, `0` disables the cache), as long as it was taken at
+    the same `version`.
+    Empty results, or results containing errors, are never stored.
+
+    Args:
+     - name      (str): the name of the snapshot
+     - fetch (callable): the function computing the snapshot, on cache miss
+     - version   (str): the version of the data (e.g. the `resourceVersion`
+                        of some listed objects), if known
+
+    Returns:
+     the snapshot data, as returned by `fetch`
+    """
+    ttl = __opts__.get(SNAPSHOT_TTL_OPTION, DEFAULT_SNAPSHOT_TTL)
+    if not ttl:
+        return fetch()
+
+    cache = salt.cache.Cache(__opts__)
+    entry = cache.fetch(SNAPSHOT_BANK, name)
+    if entry and entry.get("version") == version:
+        age = time.time() - entry["timestamp"]
+        if 0 <= age < ttl:
+            log.debug("Using %s snapshot (age: %.1fs)", name, age)
+            return entry["data"]
+
+    data = fetch()
+    if data and not has_errors(data):
+        cache.store(
+            SNAPSHOT_BANK,
+            name,
+            {"timestamp": time.time(), "version": version, "data": data},
+        )
+
+    return data
+
+
+def snapshot_info():
+    """
+    Retrieve the age of all snapshots stored in the Salt master cache.
+
+    Returns:
+     dict: snapshot names as keys, and their age (in seconds) as values
+    """
+    cache = salt.cache.Cache(__opts__)
+    now = time.time()
+    result = {}
+    for name in cache.list(SNAPSHOT_BANK):
+        entry = cache.fetch(SNAPSHOT_BANK, name)
+        if entry:
+            result[name] = round(now - entry["timestamp"], 3)
+
+    return result
+
+
+def flush_snapshots(name=None):
+    """
+    Remove one or all snapshots from the Salt master cache.
+
+    Args:
+     - name (str): the snapshot to remove, all of them if None
+
+    Returns: None
+    """
+    salt.cache.Cache(__opts__).flush(SNAPSHOT_BANK, name)
@@ -5,7 +5,12 @@ import collections
 import contextlib
 import ctypes
 import ctypes.util
+import errno
 import functools
+import os
+import select
+import socket
+import struct
 
 
 __virtualname__ = "metalk8s_volumes"
@@ -371,3 +376,185 @@ def get_partition_flags(*args):
 
 # }}}
 # }}}
+# Hole punching {{{
+
+# Python only exposes `posix_fallocate`, which cannot punch holes.
+libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+
+# See `/usr/include/linux/falloc.h`.
+FALLOC_FL_KEEP_SIZE = 0x01
+FALLOC_FL_PUNCH_HOLE = 0x02
+
+
+def _check_errno(result, func, arguments):
+    """Check for functions returning -1 and setting `errno` on error."""
+    if result != 0:
+        error = ctypes.get_errno()
+        raise OSError(error, os.strerror(error))
+    return result
+
+
+# int fallocate64(int fd, int mode, off64_t offset, off64_t len)
+#
+# Args:
+#     fd:     file descriptor
+#     mode:   FALLOC_FL_* flags
+#     offset: start of the range
+#     len:    length of the range
+#
+# Returns:
+#     0 on success, or -1 in case of error (with `errno` set).
+fallocate = libc.fallocate64
+fallocate.restype = ctypes.c_int
+fallocate.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_int64, ctypes.c_int64]
+fallocate.errcheck = _check_errno
+
+
+def punch_hole(fd, offset, length):
+    """Deallocate a range of a file, which then reads as zeros."""
+    fallocate(fd, FALLOC_FL_PUNCH_HOLE | FALLOC_FL_KEEP_SIZE, offset, length)
+
+
+def dig_holes(path, chunk_size=2 ** 20):
+    """Punch holes in the ranges of a file only filled with zeros.
+
+    Only the allocated ranges (as reported by `SEEK_DATA` and `SEEK_HOLE`) are
+    read, by chunks of `chunk_size` bytes, and the zeroed blocks (of the size
+    of the filesystem blocks) are deallocated. The file must not be written
+    to in the meantime.
+
+    Returns:
+        int: number of bytes deallocated
+    """
+    punched = 0
+    fd = os.open(path, os.O_RDWR)
+    try:
+        info = os.fstat(fd)
+        block_size = info.st_blksize
+        # Read whole blocks, aligned on the block size
+        chunk_size -= chunk_size % block_size
+        zeros = bytes(chunk_size)
+
+        offset = 0
+        while offset < info.st_size:
+            try:
+                start = os.lseek(fd, offset, os.SEEK_DATA)
+            except OSError as exn:
+                # Nothing but holes after `offset`
+                if exn.errno == errno.ENXIO:
+                    break
+                raise
+            start -= start % block_size
+            end = os.lseek(fd, start, os.SEEK_HOLE)
+
+            for chunk_start in range(start, end, chunk_size):
+                chunk = os.pread(fd, min(chunk_size, end - chunk_start), chunk_start)
+                if chunk == zeros[: len(chunk)]:
+                    punch_hole(fd, chunk_start, len(chunk))
+                    punched += len(chunk)
+                    continue
+
+                # Punch the runs of zeroed blocks of this chunk
+                hole_start = None
+                for block_start in range(0, len(chunk) + 1, block_size):
+                    block = chunk[block_start : block_start + block_size]
+                    if block and block == zeros[: len(block)]:
+                        if hole_start is None:
+                            hole_start = block_start
+                    elif hole_start is not None:
+                        punch_hole(
+                            fd, chunk_start + hole_start, block_start - hole_start
+                        )
+                        punched += block_start - hole_start
+                        hole_start = None
+
+            offset = end
+    finally:
+        os.close(fd)
+
+    return punched
+
+
+# }}}
+# uevents monitoring {{{
+
+NETLINK_KOBJECT_UEVENT = 15
+# Multicast groups of the uevents sent by the kernel, and of the ones sent by
+# udev once they are processed (i.e. with the `/dev` symlinks created).
+UEVENT_KERNEL_GROUP = 1
+UEVENT_UDEV_GROUP = 2
+UEVENT_BUFFER_SIZE = 2 ** 16
+
+# See `struct udev_monitor_netlink_header` in systemd sources.
+UDEV_MONITOR_PREFIX = b"libudev\0"
+UDEV_MONITOR_MAGIC = 0xFEEDCAFE
+
+
+def parse_uevent(data):
+    """Parse a uevent, from the kernel or from udev, into a dict of properties.
+
+    Kernel uevents are made of a `ACTION@DEVPATH` header followed by
+    `KEY=VALUE` properties, udev ones of a binary header followed by the
+    properties, all separated by NUL characters.
+    """
+    if data.startswith(UDEV_MONITOR_PREFIX):
+        try:
+            (magic,) = struct.unpack_from(">I", data, len(UDEV_MONITOR_PREFIX))
+            offset, length = struct.unpack_from(
+                "=II", data, len(UDEV_MONITOR_PREFIX) + 8
+            )
+        except struct.error as exn:
+            raise ValueError("truncated udev monitor message") from exn
+        if magic != UDEV_MONITOR_MAGIC:
+            raise ValueError("invalid udev monitor message")
+        data = data[offset : offset + length]
+
+    properties = {}
+    for field in data.split(b"\0"):
+        key, sep, value = field.decode("utf-8", "replace").partition("=")
+        if sep:
+            properties[key] = value
+    return properties
+
+
+class UeventMonitor:
+    """Listen to uevents, on the kernel netlink socket."""
+
+    def __init__(self, groups=UEVENT_KERNEL_GROUP | UEVENT_UDEV_GROUP):
+        # Only the kernel and root processes can send such messages
+        self._socket = socket.socket(
+            socket.AF_NETLINK, socket.SOCK_DGRAM, NETLINK_KOBJECT_UEVENT
+        )
+        try:
+            self._socket.bind((0, groups))
+        except OSError:
+            self._socket.close()
+            raise
+
+    def receive(self, timeout):
+        """Wait for the next uevent, and return its properties.
+
+        Returns:
+            dict: properties of the uevent, or None if `timeout` (in seconds)
+                  expired
+        """
+        ready, _, _ = select.select([self._socket], [], [], timeout)
+        if not ready:
+            return None
+        return parse_uevent(self._socket.recv(UEVENT_BUFFER_SIZE))
+
+    def close(self):
+        self._socket.close()
+
+
+@contextlib.contextmanager
+def uevent_monitor(**kwargs):
+    """Return a monitor of the uevents sent from now on."""
+    monitor = UeventMonitor(**kwargs)
+    try:
+        yield monitor
+    finally:
+        monitor.close()
+
+
+# }}}
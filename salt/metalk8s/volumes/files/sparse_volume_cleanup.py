@@ -10,8 +10,11 @@ import argparse
 import errno
 import fcntl
 import os
+import select
+import socket
 import stat
 import sys
+import time
 
 
 def parse_args(args=None):
@@ -52,11 +55,8 @@ def find_device(volume_id):
     - raw, in which case the device is partitioned and the first partition
       is labeled with the volume ID
     """
-    for _get_device in [device_by_uuid, device_from_part_uuid]:
-        device_path = _get_device(volume_id)
-        if device_path is not None:
-            break
-    else:
+    device_path = wait_for_device(volume_id)
+    if device_path is None:
         raise Error(
             "Device for volume '{}' was not found".format(volume_id),
             exit_code=errno.ENOENT,
@@ -158,6 +158,89 @@ def device_from_part_uuid(volume_id):
     return os.path.join("/dev", device_name)
 
 
+def lookup_device(volume_id):
+    """Look up the device of this volume ID, from its udev links."""
+    for _get_device in [device_by_uuid, device_from_part_uuid]:
+        device_path = _get_device(volume_id)
+        if device_path is not None:
+            return device_path
+    return None
+
+
+# }}}
+# Device waiting {{{
+
+NETLINK_KOBJECT_UEVENT = 15
+# Multicast group of the uevents sent by udev, once the links are created
+UEVENT_UDEV_GROUP = 2
+UEVENT_BUFFER_SIZE = 2 ** 16
+
+# Time to wait for the udev links of a device (in seconds)
+DEVICE_TIMEOUT = 5
+
+
+def open_uevent_monitor():
+    """Listen to udev uevents, return None if not possible."""
+    try:
+        monitor = socket.socket(
+            socket.AF_NETLINK, socket.SOCK_DGRAM, NETLINK_KOBJECT_UEVENT
+        )
+    except OSError:
+        return None
+    try:
+        monitor.bind((0, UEVENT_UDEV_GROUP))
+    except OSError:
+        monitor.close()
+        return None
+    return monitor
+
+
+def wait_for_device(volume_id, timeout=DEVICE_TIMEOUT):
+    """Find the device of this volume ID, waiting for its udev links if needed.
+
+    The loop device may just have been attached (e.g. if the unit is stopped
+    right after being started), in which case udev may not have created its
+    links yet: wait for the uevents of these links, or poll for them if
+    uevents cannot be monitored.
+    """
+    device_path = lookup_device(volume_id)
+    if device_path is not None:
+        return device_path
+
+    links = [
+        os.path.join("/dev/disk/by-uuid", volume_id).encode(),
+        os.path.join("/dev/disk/by-partuuid", volume_id).encode(),
+    ]
+    deadline = time.monotonic() + timeout
+    monitor = open_uevent_monitor()
+    try:
+        while True:
+            device_path = lookup_device(volume_id)
+            remaining = deadline - time.monotonic()
+            if device_path is not None or remaining <= 0:
+                return device_path
+
+            if monitor is None:
+                time.sleep(min(remaining, 0.1))
+                continue
+
+            # Check again on an uevent for one of the links, or every second
+            # in case such an uevent is missed
+            check_at = time.monotonic() + min(remaining, 1)
+            while True:
+                ready, _, _ = select.select(
+                    [monitor], [], [], max(check_at - time.monotonic(), 0)
+                )
+                if not ready:
+                    break
+                uevent = monitor.recv(UEVENT_BUFFER_SIZE)
+                if any(link in uevent for link in links):
+                    break
+    finally:
+        if monitor is not None:
+            monitor.close()
+
+
 # }}}
 
 # https://github.com/torvalds/linux/blob/master/Documentation/admin-guide/devices.txt#L191
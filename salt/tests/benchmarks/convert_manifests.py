@@ -0,0 +1,80 @@
+"""Micro-benchmark of the conversion of manifests into Python K8s models.
+
+Manifests are extracted from the rendered charts SLS files (Jinja expressions
+being replaced by a placeholder), then converted several times using
+`metalk8s_kubernetes.convert_manifest_to_object`.
+
+Usage (from the `salt/` directory)::
+
+    python -m tests.benchmarks.convert_manifests [--rounds 20]
+"""
+
+import argparse
+import glob
+import os.path
+import re
+import sys
+import time
+
+import yaml
+
+
+SALT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(SALT_DIR, "_utils"))
+
+import kubernetes_utils  # pylint: disable=wrong-import-position
+
+
+CHARTS_GLOB = os.path.join(SALT_DIR, "metalk8s", "addons", "**", "chart.sls")
+JINJA_EXPR = re.compile(r"{%-? endraw -?%}.*?{%-? raw -?%}")
+
+
+def load_manifests():
+    manifests = []
+    for path in sorted(glob.glob(CHARTS_GLOB, recursive=True)):
+        with open(path) as fd:
+            content = fd.read()
+        _, _, content = content.partition("{% raw %}")
+        content, _, _ = content.rpartition("{% endraw %}")
+        content = JINJA_EXPR.sub("placeholder", content)
+        manifests.extend(
+            manifest for manifest in yaml.safe_load_all(content) if manifest
+        )
+
+    convertible = []
+    for manifest in manifests:
+        try:
+            kubernetes_utils.convert_manifest_to_object(manifest)
+        except ValueError:
+            # Custom objects or manifests relying on Jinja expressions
+            continue
+        convertible.append(manifest)
+
+    return convertible
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    manifests = load_manifests()
+
+    start = time.perf_counter()
+    for _ in range(args.rounds):
+        for manifest in manifests:
+            kubernetes_utils.convert_manifest_to_object(manifest)
+    elapsed = time.perf_counter() - start
+
+    print(
+        "Converted {} manifests {} times in {:.3f}s ({:.1f}us per manifest)".format(
+            len(manifests),
+            args.rounds,
+            elapsed,
+            elapsed / (args.rounds * len(manifests)) * 1e6,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
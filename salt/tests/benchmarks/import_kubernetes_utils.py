@@ -0,0 +1,67 @@
+"""Benchmark of the import of the `metalk8s_kubernetes` utils module.
+
+Each round runs in a fresh Python interpreter, where Salt is imported first
+(as it always is when Salt loads this module), then measures:
+
+- the import of `kubernetes_utils`, as paid by any Salt loader loading all
+  utils modules (e.g. `salt-call --local test.ping`, `saltutil.sync_all`),
+- the first lookup of a kind, which imports the Kubernetes client.
+
+Usage (from the `salt/` directory)::
+
+    python -m tests.benchmarks.import_kubernetes_utils [--rounds 10]
+"""
+
+import argparse
+import os.path
+import statistics
+import subprocess
+import sys
+
+
+SALT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ROUND_SCRIPT = """
+import sys
+import time
+
+import salt.cache
+import salt.utils.dictdiffer
+
+sys.path.insert(0, {utils_dir!r})
+
+start = time.perf_counter()
+import kubernetes_utils
+imported = time.perf_counter()
+kubernetes_utils.get_kind_info({{"apiVersion": "v1", "kind": "Pod"}}).model
+looked_up = time.perf_counter()
+
+print(imported - start, looked_up - imported)
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    script = ROUND_SCRIPT.format(utils_dir=os.path.join(SALT_DIR, "_utils"))
+    import_times = []
+    lookup_times = []
+    for _ in range(args.rounds):
+        output = subprocess.check_output([sys.executable, "-c", script])
+        import_time, lookup_time = map(float, output.split())
+        import_times.append(import_time)
+        lookup_times.append(lookup_time)
+
+    print(
+        "Import: {:.1f}ms, first kind lookup: {:.1f}ms (median of {} rounds)".format(
+            statistics.median(import_times) * 1e3,
+            statistics.median(lookup_times) * 1e3,
+            args.rounds,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
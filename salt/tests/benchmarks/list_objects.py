@@ -0,0 +1,131 @@
+"""Micro-benchmark of the loading of a large list response into dicts.
+
+A synthetic `PodList` response is loaded both using the Kubernetes client
+deserialization followed by `to_dict`, and using the raw-JSON fast path
+(`json.loads` followed by `metalk8s_kubernetes.convert_raw_object`).
+
+Usage (from the `salt/` directory)::
+
+    python -m tests.benchmarks.list_objects [--pods 5000] [--rounds 3]
+"""
+
+import argparse
+import json
+import os.path
+import sys
+import time
+
+from kubernetes.client import ApiClient, V1Pod
+
+
+SALT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(SALT_DIR, "_utils"))
+
+import kubernetes_utils  # pylint: disable=wrong-import-position
+
+
+class _Response:
+    def __init__(self, data):
+        self.data = data
+
+
+def build_pod_list(count):
+    items = []
+    for index in range(count):
+        name = "my-pod-{}".format(index)
+        items.append(
+            {
+                "apiVersion": "v1",
+                "kind": "Pod",
+                "metadata": {
+                    "name": name,
+                    "namespace": "my-namespace",
+                    "uid": "00000000-0000-0000-0000-{:012d}".format(index),
+                    "creationTimestamp": "2021-01-01T00:00:00Z",
+                    "labels": {"app": "my-app", "pod": name},
+                    "ownerReferences": [
+                        {
+                            "apiVersion": "apps/v1",
+                            "kind": "ReplicaSet",
+                            "name": "my-replicaset",
+                            "uid": "00000000-0000-0000-0000-000000000000",
+                            "controller": True,
+                        }
+                    ],
+                },
+                "spec": {
+                    "nodeName": "node-{}".format(index % 10),
+                    "containers": [
+                        {
+                            "name": "my-container",
+                            "image": "my-registry/my-image:1.0.0",
+                            "args": ["--verbose", "--port=8080"],
+                            "ports": [{"containerPort": 8080, "protocol": "TCP"}],
+                            "resources": {
+                                "requests": {"cpu": "100m", "memory": "128Mi"}
+                            },
+                            "volumeMounts": [
+                                {"name": "data", "mountPath": "/var/lib/data"}
+                            ],
+                        }
+                    ],
+                    "volumes": [{"name": "data", "emptyDir": {}}],
+                },
+                "status": {
+                    "phase": "Running",
+                    "podIP": "10.233.0.{}".format(index % 256),
+                    "startTime": "2021-01-01T00:00:01Z",
+                    "conditions": [
+                        {
+                            "type": "Ready",
+                            "status": "True",
+                            "lastTransitionTime": "2021-01-01T00:00:02Z",
+                        }
+                    ],
+                },
+            }
+        )
+
+    return json.dumps({"apiVersion": "v1", "kind": "PodList", "items": items})
+
+
+def _timed(func, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        result = func()
+    return result, (time.perf_counter() - start) / rounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pods", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    data = build_pod_list(args.pods)
+    api_client = ApiClient()
+
+    def _deserialize():
+        pod_list = api_client.deserialize(_Response(data), "V1PodList")
+        return [pod.to_dict() for pod in pod_list.items]
+
+    def _raw():
+        return [
+            kubernetes_utils.convert_raw_object(item, V1Pod)
+            for item in json.loads(data)["items"]
+        ]
+
+    expected, deserialize_time = _timed(_deserialize, args.rounds)
+    result, raw_time = _timed(_raw, args.rounds)
+    assert result == expected, "Raw conversion does not match deserialization"
+
+    print(
+        "Loaded {} pods: {:.3f}s with deserialization, {:.3f}s with raw JSON "
+        "(x{:.1f})".format(
+            args.pods, deserialize_time, raw_time, deserialize_time / raw_time
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
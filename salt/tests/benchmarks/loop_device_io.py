@@ -0,0 +1,185 @@
+"""fio-style benchmark of I/O on sparse loop devices.
+
+For each mode (sparse or preallocated backing file, with or without direct
+I/O on the loop device, see the `directIO` and `preallocate` StorageClass
+parameters), a backing file is created and attached to a loop device, then
+the following jobs are run against the loop device (using `O_DIRECT`, as
+fio's `direct=1`, unless `--buffered` is set):
+
+- sequential writes and reads, using 1MiB blocks,
+- random writes and reads, using 4KiB blocks.
+
+Throughput, IOPS and growth of the page cache are reported for each job, as
+well as the number of extents of the backing file (if `filefrag` is
+installed). This must run as root.
+
+Usage (from the `salt/` directory)::
+
+    python -m tests.benchmarks.loop_device_io [--dir /var/tmp] [--size 1024] \\
+        [--io-size 256] [--modes sparse,sparse+dio,prealloc,prealloc+dio] \\
+        [--buffered]
+"""
+
+import argparse
+import contextlib
+import mmap
+import os
+import random
+import re
+import shutil
+import subprocess
+import tempfile
+import time
+
+
+MiB = 2 ** 20
+
+MODES = {
+    "sparse": {"preallocate": False, "direct_io": False},
+    "sparse+dio": {"preallocate": False, "direct_io": True},
+    "prealloc": {"preallocate": True, "direct_io": False},
+    "prealloc+dio": {"preallocate": True, "direct_io": True},
+}
+
+JOBS = [
+    # name, block size, random, write
+    ("seq-write", MiB, False, True),
+    ("seq-read", MiB, False, False),
+    ("rand-write", 4096, True, True),
+    ("rand-read", 4096, True, False),
+]
+
+
+def _cached_bytes():
+    with open("/proc/meminfo") as fd:
+        for line in fd:
+            if line.startswith("Cached:"):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+def _drop_caches():
+    os.sync()
+    with open("/proc/sys/vm/drop_caches", "w") as fd:
+        fd.write("3\n")
+
+
+def _extents(path):
+    if not shutil.which("filefrag"):
+        return None
+    output = subprocess.run(
+        ["filefrag", path], check=True, stdout=subprocess.PIPE, universal_newlines=True
+    ).stdout
+    match = re.search(r"(\d+) extents? found", output)
+    return int(match.group(1)) if match else None
+
+
+@contextlib.contextmanager
+def loop_device(path, size, preallocate, direct_io):
+    """Create a backing file, as `SparseLoopDevice.create` does, and attach
+    it to a loop device, as the `metalk8s-sparse-volume@` unit does."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL)
+    try:
+        if preallocate:
+            os.posix_fallocate(fd, 0, size)
+        else:
+            os.ftruncate(fd, size)
+    finally:
+        os.close(fd)
+
+    command = ["losetup", "--find", "--show"]
+    if direct_io:
+        command.append("--direct-io=on")
+    device = subprocess.run(
+        command + [path], check=True, stdout=subprocess.PIPE, universal_newlines=True
+    ).stdout.strip()
+    try:
+        yield device
+    finally:
+        subprocess.run(["losetup", "--detach", device], check=True)
+        os.unlink(path)
+
+
+def run_job(device, size, io_size, block_size, is_random, is_write, buffered):
+    flags = os.O_RDWR if is_write else os.O_RDONLY
+    if not buffered:
+        flags |= os.O_DIRECT
+
+    # Anonymous mappings are page-aligned, as required by `O_DIRECT`
+    buf = mmap.mmap(-1, block_size)
+    buf.write(os.urandom(block_size))
+    rng = random.Random(42)
+    blocks = size // block_size
+    count = io_size // block_size
+
+    _drop_caches()
+    cached_before = _cached_bytes()
+    fd = os.open(device, flags)
+    try:
+        start = time.perf_counter()
+        for index in range(count):
+            block = rng.randrange(blocks) if is_random else index % blocks
+            if is_write:
+                os.pwrite(fd, buf, block * block_size)
+            else:
+                os.preadv(fd, [buf], block * block_size)
+        if is_write:
+            os.fsync(fd)
+        elapsed = time.perf_counter() - start
+    finally:
+        os.close(fd)
+        buf.close()
+
+    return {
+        "throughput": count * block_size / elapsed / MiB,
+        "iops": count / elapsed,
+        "cache_growth": (_cached_bytes() - cached_before) / MiB,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dir", default="/var/tmp")
+    parser.add_argument("--size", type=int, default=1024, help="in MiB")
+    parser.add_argument("--io-size", type=int, default=256, help="in MiB, per job")
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--buffered", action="store_true")
+    args = parser.parse_args()
+
+    size = args.size * MiB
+    io_size = args.io_size * MiB
+
+    print(
+        "{:<14}{:<12}{:>12}{:>12}{:>14}{:>10}".format(
+            "mode", "job", "MiB/s", "IOPS", "cache (MiB)", "extents"
+        )
+    )
+    for mode in args.modes.split(","):
+        with tempfile.TemporaryDirectory(dir=args.dir) as tmp_dir:
+            path = os.path.join(tmp_dir, "backing-file")
+            with loop_device(path, size, **MODES[mode]) as device:
+                for name, block_size, is_random, is_write in JOBS:
+                    result = run_job(
+                        device,
+                        size,
+                        # Random jobs use fewer, smaller I/Os
+                        min(io_size, size) if block_size == MiB else io_size // 16,
+                        block_size,
+                        is_random,
+                        is_write,
+                        args.buffered,
+                    )
+                    print(
+                        "{:<14}{:<12}{:>12.1f}{:>12.0f}{:>14.1f}{:>10}".format(
+                            mode,
+                            name,
+                            result["throughput"],
+                            result["iops"],
+                            result["cache_growth"],
+                            _extents(path) if is_write else "",
+                        )
+                    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Benchmark of the extraction of metadata files from archive ISOs.
+
+For each given ISO, a file (`PRODUCT.TXT` by default) is extracted:
+
+- by running `isoinfo`, as `metalk8s.archive_info_from_iso` used to do (only
+  if `isoinfo` is installed),
+- by reading the ISO 9660 directory records with `metalk8s_iso.read_iso_file`,
+- through `metalk8s_iso.read_file`, once the Salt cache is populated (as in
+  a new process), and once the in-memory cache is populated.
+
+Usage (from the `salt/` directory)::
+
+    python -m tests.benchmarks.read_iso /path/to/metalk8s.iso [...] \\
+        [--file PRODUCT.TXT] [--rounds 20]
+"""
+
+import argparse
+import os.path
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import salt.config
+
+
+SALT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(SALT_DIR, "_utils"))
+
+import iso_utils  # pylint: disable=wrong-import-position
+
+
+def _timed(func, isos, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        results = [func(iso) for iso in isos]
+    return results, (time.perf_counter() - start) / (rounds * len(isos))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("isos", nargs="+")
+    parser.add_argument("--file", default="PRODUCT.TXT")
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    timings = []
+
+    if shutil.which("isoinfo"):
+
+        def _isoinfo(iso):
+            return subprocess.run(
+                ["isoinfo", "-x", "/{};1".format(args.file.upper()), "-i", iso],
+                check=True,
+                stdout=subprocess.PIPE,
+            ).stdout
+
+        expected, isoinfo_time = _timed(_isoinfo, args.isos, args.rounds)
+        timings.append(("isoinfo", isoinfo_time))
+    else:
+        expected = None
+        print("isoinfo not found, skipping it")
+
+    results, reader_time = _timed(
+        lambda iso: iso_utils.read_iso_file(iso, args.file), args.isos, args.rounds
+    )
+    timings.append(("ISO 9660 reader", reader_time))
+    if expected is not None:
+        assert [
+            result or b"" for result in results
+        ] == expected, "ISO 9660 reader does not match isoinfo"
+
+    with tempfile.TemporaryDirectory() as cachedir:
+        opts = salt.config.minion_config(None)
+        opts["cachedir"] = cachedir
+        iso_utils.__opts__ = opts
+
+        # Populate the cache
+        for iso in args.isos:
+            iso_utils.read_file(iso, args.file)
+
+        def _read_from_salt_cache(iso):
+            iso_utils._FILES.clear()
+            return iso_utils.read_file(iso, args.file)
+
+        _, salt_cache_time = _timed(_read_from_salt_cache, args.isos, args.rounds)
+        timings.append(("Salt cache", salt_cache_time))
+
+        _, memory_time = _timed(
+            lambda iso: iso_utils.read_file(iso, args.file), args.isos, args.rounds
+        )
+        timings.append(("in-memory cache", memory_time))
+
+    print("Read {} from {} ISO(s):".format(args.file, len(args.isos)))
+    for name, elapsed in timings:
+        print("  {:<16} {:8.3f}ms per ISO".format(name, elapsed * 1e3))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+import os.path
+import sys
+
+# Add our Salt auth directory to the python path
+sys.path.insert(
+    0,
+    os.path.join(
+        os.path.dirname(
+            os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        ),
+        "_auth",
+    ),
+)
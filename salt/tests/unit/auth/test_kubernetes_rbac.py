@@ -0,0 +1,277 @@
+import base64
+import json
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+import kubernetes.client
+from parameterized import param, parameterized
+
+import kubernetes_rbac
+
+from tests.unit import mixins
+
+
+def _jwt(payload):
+    if not isinstance(payload, bytes):
+        payload = json.dumps(payload).encode()
+    return "header.{}.signature".format(
+        base64.urlsafe_b64encode(payload).decode().rstrip("=")
+    )
+
+
+class KubernetesRbacTestCase(TestCase, mixins.LoaderModuleMockMixin):
+    """
+    TestCase for `kubernetes_rbac` eauth module
+    """
+
+    loader_module = kubernetes_rbac
+    loader_module_globals = {
+        "__opts__": {
+            "external_auth": {
+                "kubernetes_rbac": {
+                    "^kubeconfig": "/etc/salt/master-kubeconfig.conf",
+                    "^cache_ttl": 60,
+                }
+            }
+        }
+    }
+
+    def setUp(self):
+        super().setUp()
+        for cache in (kubernetes_rbac.AUTH_CACHE, kubernetes_rbac.GROUPS_CACHE):
+            cache.clear()
+            self.addCleanup(cache.clear)
+        clients_patcher = patch.dict(kubernetes_rbac._CLIENTS, clear=True)
+        clients_patcher.start()
+        self.addCleanup(clients_patcher.stop)
+
+        self.now = 1000
+        time_patcher = patch("time.time", lambda: self.now)
+        time_patcher.start()
+        self.addCleanup(time_patcher.stop)
+
+        self.review_token_mock = MagicMock(return_value=True)
+        self.get_groups_mock = MagicMock(return_value=["node-admins"])
+        for name, mock in (
+            ("_load_clients", MagicMock()),
+            ("_review_token", self.review_token_mock),
+            ("_get_groups", self.get_groups_mock),
+        ):
+            patcher = patch.object(kubernetes_rbac, name, mock)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_ttl_cache(self):
+        """
+        Tests the `_TTLCache` class, expiry and size bound
+        """
+        cache = kubernetes_rbac._TTLCache("Test")
+        cache.set("a", 1, 10, 2)
+        cache.set("b", 2, 20, 2)
+        # Disabled
+        cache.set("c", 3, 0, 2)
+
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIs(cache.get("c"), cache.MISSING)
+        # Least recently used
+        cache.set("d", 4, 10, 2)
+        self.assertIs(cache.get("b"), cache.MISSING)
+        self.assertEqual(cache.get("a"), 1)
+
+        self.now += 10
+        self.assertIs(cache.get("a"), cache.MISSING)
+        self.assertEqual(cache.info(), {"hits": 2, "misses": 3, "size": 1})
+
+    @parameterized.expand(
+        [
+            param("auth", "review_token_mock"),
+            param("groups", "get_groups_mock"),
+        ]
+    )
+    def test_cache_key(self, func, mock_name):
+        """
+        Tests that results are cached per username and token
+        """
+        mock = getattr(self, mock_name)
+        func = getattr(kubernetes_rbac, func)
+
+        result = func("my-user", token="my-token")
+        self.assertEqual(func("my-user", token="my-token"), result)
+        self.assertEqual(mock.call_count, 1)
+
+        func("other-user", token="my-token")
+        self.assertEqual(mock.call_count, 2)
+        func("my-user", token="other-token")
+        self.assertEqual(mock.call_count, 3)
+
+        # Tokens are never stored as is
+        for cache in (kubernetes_rbac.AUTH_CACHE, kubernetes_rbac.GROUPS_CACHE):
+            self.assertNotIn("my-token", repr(cache._values))
+
+    @parameterized.expand(
+        [
+            # Not a JWT
+            param("my-token", 59, True),
+            param("my-token", 60, False),
+            # Expires before the cache TTL
+            param(_jwt({"exp": 1010}), 9, True),
+            param(_jwt({"exp": 1010}), 10, False),
+            param(_jwt({"exp": "1010.5"}), 10, True),
+            param(_jwt({"exp": 2000}), 60, False),
+            # Already expired
+            param(_jwt({"exp": 900}), 0, False),
+        ]
+    )
+    def test_auth_ttl(self, token, elapsed, cached):
+        """
+        Tests that authentications are cached until the TTL or the token
+        expiry
+        """
+        self.assertTrue(kubernetes_rbac.auth("my-user", token=token))
+        self.now += elapsed
+        self.assertTrue(kubernetes_rbac.auth("my-user", token=token))
+
+        self.assertEqual(self.review_token_mock.call_count, 1 if cached else 2)
+
+    @parameterized.expand(
+        [
+            param("my-token"),
+            param("header.payload"),
+            param("header..signature"),
+            # Invalid base64
+            param("header.!!!.signature"),
+            # Not JSON
+            param(_jwt(b"not-json")),
+            param(_jwt(b"\xff\xfe")),
+            # No or invalid expiry
+            param(_jwt({"sub": "my-user"})),
+            param(_jwt(["exp"])),
+            param(_jwt({"exp": None})),
+            param(_jwt({"exp": "tomorrow"})),
+        ]
+    )
+    def test_token_ttl_malformed(self, token):
+        """
+        Tests that `_token_ttl` falls back to the cache TTL for tokens which
+        are not (valid) JWTs
+        """
+        self.assertEqual(kubernetes_rbac._token_ttl(token, 60), 60)
+
+    def test_auth_failure_not_cached(self):
+        """
+        Tests that failed authentications are never cached
+        """
+        self.review_token_mock.side_effect = [False, False, True, True]
+
+        self.assertFalse(kubernetes_rbac.auth("my-user", token="my-token"))
+        self.assertFalse(kubernetes_rbac.auth("my-user", token="my-token"))
+        self.assertTrue(kubernetes_rbac.auth("my-user", token="my-token"))
+        self.assertTrue(kubernetes_rbac.auth("my-user", token="my-token"))
+
+        self.assertEqual(self.review_token_mock.call_count, 3)
+
+
+class KubernetesRbacClientsTestCase(TestCase, mixins.LoaderModuleMockMixin):
+    """
+    TestCase for the Kubernetes API clients of `kubernetes_rbac` eauth module
+    """
+
+    loader_module = kubernetes_rbac
+
+    def setUp(self):
+        super().setUp()
+        clients_patcher = patch.dict(kubernetes_rbac._CLIENTS, clear=True)
+        clients_patcher.start()
+        self.addCleanup(clients_patcher.stop)
+
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        self.kubeconfig = os.path.join(tmp_dir, "kubeconfig.conf")
+        with open(self.kubeconfig, "w") as fd:
+            fd.write("{}")
+
+    def _config(self, **kwargs):
+        return dict(
+            {
+                "kubeconfig": self.kubeconfig,
+                "context": None,
+                "cache_ttl": 60,
+                "cache_size": 256,
+            },
+            **kwargs
+        )
+
+    def test_load_clients(self):
+        """
+        Tests that `_load_clients` only parses the kubeconfig again once it
+        changed
+        """
+        load_mock = MagicMock()
+
+        with patch("kubernetes.config.load_kube_config", load_mock):
+            clients = kubernetes_rbac._load_clients(self._config())
+            self.assertIs(kubernetes_rbac._load_clients(self._config()), clients)
+            self.assertEqual(load_mock.call_count, 1)
+
+            stat = os.stat(self.kubeconfig)
+            os.utime(self.kubeconfig, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+            new_clients = kubernetes_rbac._load_clients(self._config())
+
+            self.assertIsNot(new_clients, clients)
+            self.assertEqual(load_mock.call_count, 2)
+            # Stale clients are dropped
+            self.assertEqual(list(kubernetes_rbac._CLIENTS.values()), [new_clients])
+
+            # Another context
+            self.assertIsNot(
+                kubernetes_rbac._load_clients(self._config(context="other")),
+                new_clients,
+            )
+            self.assertEqual(load_mock.call_count, 3)
+
+    def test_load_clients_no_kubeconfig(self):
+        """
+        Tests that `_load_clients` fails without a kubeconfig
+        """
+        self.assertIsNone(kubernetes_rbac._load_clients(self._config(kubeconfig=None)))
+
+    def test_clients_for_user(self):
+        """
+        Tests that per-user clients use their own token, but share their
+        connection pool
+        """
+        kubeconfig = kubernetes.client.Configuration()
+        kubeconfig.host = "https://10.0.0.1:6443"
+        kubeconfig.cert_file = "/etc/kubernetes/pki/admin.crt"
+        kubeconfig.key_file = "/etc/kubernetes/pki/admin.key"
+        clients = kubernetes_rbac._Clients(kubeconfig)
+
+        user_client = clients.for_user("my-user", "my-token")
+        other_client = clients.for_user("other-user", "other-token")
+
+        self.assertEqual(
+            user_client.configuration.api_key, {"authorization": "my-token"}
+        )
+        self.assertEqual(
+            other_client.configuration.api_key, {"authorization": "other-token"}
+        )
+        self.assertEqual(user_client.configuration.username, "my-user")
+        self.assertIsNone(user_client.configuration.cert_file)
+        self.assertIsNone(user_client.configuration.key_file)
+        self.assertEqual(user_client.configuration.host, kubeconfig.host)
+
+        # The admin client never gets a user token
+        self.assertEqual(clients.client.configuration.api_key, {})
+        self.assertEqual(
+            clients.client.configuration.cert_file, "/etc/kubernetes/pki/admin.crt"
+        )
+        self.assertIsNot(
+            clients.client.configuration.api_key, user_client.configuration.api_key
+        )
+
+        # Users share a connection pool, not the one of the admin client
+        self.assertIs(user_client.rest_client, other_client.rest_client)
+        self.assertIsNot(user_client.rest_client, clients.client.rest_client)
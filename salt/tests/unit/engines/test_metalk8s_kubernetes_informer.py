@@ -0,0 +1,194 @@
+import json
+import threading
+import time
+from unittest import TestCase
+from unittest.mock import MagicMock, call, patch
+
+from kubernetes.client.rest import ApiException
+from parameterized import param, parameterized
+from urllib3.exceptions import HTTPError
+
+import metalk8s_kubernetes_informer
+
+from tests.unit import mixins
+
+
+class _Stop(BaseException):
+    """Raised to exit the (endless) `Informer.run` loop."""
+
+
+def _event(event_type, name, node_name=None, resource_version="42"):
+    return json.dumps(
+        {
+            "type": event_type,
+            "object": {
+                "metadata": {"name": name, "resourceVersion": resource_version},
+                "spec": {"nodeName": node_name},
+            },
+        }
+    )
+
+
+class Metalk8sKubernetesInformerTestCase(TestCase, mixins.LoaderModuleMockMixin):
+    """
+    TestCase for `metalk8s_kubernetes_informer` engine
+    """
+
+    loader_module = metalk8s_kubernetes_informer
+    loader_module_globals = {"__opts__": {}, "__utils__": {}}
+
+    def _informer(self, cache_mock, **kwargs):
+        with patch("salt.cache.Cache", cache_mock):
+            informer = metalk8s_kubernetes_informer.Informer(
+                "volumes", **metalk8s_kubernetes_informer.RESOURCES["volumes"], **kwargs
+            )
+        informer._list_func = MagicMock(return_value=(MagicMock(), None))
+        return informer
+
+    def test_watch_publish_idle(self):
+        """
+        Tests that a change is published once the publish interval elapsed,
+        even if the watch stream stays idle
+        """
+        silence = threading.Event()
+
+        def iter_resp_lines(_):
+            yield json.dumps(
+                {
+                    "type": "ADDED",
+                    "object": {
+                        "metadata": {"name": "my-volume", "resourceVersion": "42"},
+                        "spec": {"nodeName": "bootstrap"},
+                    },
+                }
+            )
+            # No other event until the end of the watch
+            silence.wait(5)
+
+        cache_mock = MagicMock()
+        store_mock = cache_mock.return_value.store
+        informer = self._informer(cache_mock, publish_interval=0.1)
+        # Just published (e.g. after a LIST), so the event is not published
+        # right away
+        informer._last_publish = time.time()
+
+        with patch("metalk8s_kubernetes_informer.iter_resp_lines", iter_resp_lines):
+            thread = threading.Thread(target=informer.watch)
+            thread.start()
+            try:
+                deadline = time.monotonic() + 2
+                while not store_mock.called and time.monotonic() < deadline:
+                    time.sleep(0.01)
+                # Published while the watch is still idle
+                self.assertTrue(thread.is_alive())
+            finally:
+                silence.set()
+                thread.join()
+
+        bank, key, data = store_mock.call_args_list[0][0]
+        self.assertEqual(bank, metalk8s_kubernetes_informer.INFORMER_BANK)
+        self.assertEqual(key, "volumes")
+        self.assertEqual(data["resource_version"], "42")
+        self.assertEqual(list(data["items"]), ["my-volume"])
+        self.assertEqual(data["indexes"], {"node_name": {"bootstrap": ["my-volume"]}})
+        # Not published again at the end of the watch, only as an heartbeat
+        self.assertEqual(store_mock.call_count, 2)
+
+    def test_watch_deleted(self):
+        """
+        Tests that DELETED events remove the object from the store and from
+        its indexes
+        """
+        cache_mock = MagicMock()
+        store_mock = cache_mock.return_value.store
+        informer = self._informer(cache_mock, publish_interval=0)
+        informer._items = {
+            "my-volume": {"metadata": {"name": "my-volume"}, "spec": {"nodeName": "a"}},
+            "other-volume": {
+                "metadata": {"name": "other-volume"},
+                "spec": {"nodeName": "b"},
+            },
+        }
+        lines = [
+            _event("ADDED", "new-volume", "b", "43"),
+            _event("DELETED", "my-volume", "a", "44"),
+            # Already gone
+            _event("DELETED", "missing-volume", "c", "45"),
+        ]
+
+        with patch(
+            "metalk8s_kubernetes_informer.iter_resp_lines",
+            MagicMock(return_value=lines),
+        ):
+            informer.watch()
+
+        _, _, data = store_mock.call_args[0]
+        self.assertEqual(data["resource_version"], "45")
+        self.assertEqual(sorted(data["items"]), ["new-volume", "other-volume"])
+        self.assertEqual(
+            data["indexes"], {"node_name": {"b": ["other-volume", "new-volume"]}}
+        )
+
+    def test_run_relist_gone(self):
+        """
+        Tests that the watch is re-listed right away once it expires with a
+        "410 Gone"
+        """
+        informer = self._informer(MagicMock())
+        informer.relist = MagicMock(side_effect=[None, None, _Stop()])
+        error = json.dumps(
+            {
+                "type": "ERROR",
+                "object": {"code": 410, "reason": "Expired", "message": "Too old"},
+            }
+        )
+        lines = [_event("ADDED", "my-volume", "a", "43"), error]
+
+        with patch(
+            "metalk8s_kubernetes_informer.iter_resp_lines",
+            MagicMock(return_value=lines),
+        ), patch("time.sleep") as sleep_mock:
+            self.assertRaises(_Stop, informer.run)
+
+        self.assertEqual(informer.relist.call_count, 3)
+        sleep_mock.assert_not_called()
+        # The stream is released, even on errors
+        list_func = informer._list_func.return_value[0]
+        self.assertEqual(list_func.return_value.close.call_count, 2)
+        self.assertEqual(list_func.return_value.release_conn.call_count, 2)
+
+    @parameterized.expand(
+        [
+            param(
+                [HTTPError("Connection reset")] * 3,
+                [1, 2, 4],
+            ),
+            # Reset once a watch succeeds
+            param(
+                [
+                    ApiException(status=500),
+                    ValueError("Invalid JSON"),
+                    None,
+                    KeyError("metadata"),
+                ],
+                [1, 2, 1],
+            ),
+            # Capped
+            param([HTTPError("Connection refused")] * 8, [1, 2, 4, 8, 16, 32, 60, 60]),
+        ]
+    )
+    def test_run_backoff(self, watch_results, sleeps):
+        """
+        Tests that the informer reconnects after errors, with an exponential
+        backoff
+        """
+        informer = self._informer(MagicMock())
+        informer.relist = MagicMock()
+        informer.watch = MagicMock(side_effect=watch_results + [_Stop()])
+
+        with patch("time.sleep") as sleep_mock:
+            self.assertRaises(_Stop, informer.run)
+
+        self.assertEqual(sleep_mock.call_args_list, [call(delay) for delay in sleeps])
+        # Re-listed after each failure
+        self.assertEqual(informer.relist.call_count, len(sleeps) + 1)
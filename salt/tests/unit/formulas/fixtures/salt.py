@@ -283,6 +283,31 @@ def metalk8s_kubernetes_list_objects(
     )
 
 
+@register("metalk8s_upgrade.plan_waves")
+def metalk8s_upgrade_plan_waves(
+    salt_mock: SaltMock,
+    nodes: Optional[List[str]] = None,
+    max_unavailable: Any = 1,
+    **_kwargs: Any,
+) -> List[List[str]]:
+    """Use pillar.metalk8s.nodes to derive waves, ignoring workloads."""
+    pillar_nodes = salt_mock._pillar["metalk8s"]["nodes"]
+    if nodes is None:
+        nodes = sorted(pillar_nodes)
+
+    serial_nodes = [
+        node for node in nodes if {"master", "etcd"} & set(pillar_nodes[node]["roles"])
+    ]
+    parallel_nodes = [node for node in nodes if node not in serial_nodes]
+    # NOTE: percentages are not supported by this mock
+    limit = max(int(max_unavailable), 1)
+
+    return [[node] for node in serial_nodes] + [
+        parallel_nodes[idx : idx + limit]
+        for idx in range(0, len(parallel_nodes), limit)
+    ]
+
+
 @register("mine.get")
 def mine_get(
     salt_mock: SaltMock, tgt: str, fun: str, *_a: Any, **_k: Any
@@ -381,6 +406,9 @@ register_basic("hashutil.base64_encodefile")(
 )
 register_basic("log.warning")(print)
 register_basic("metalk8s.format_san")(", ".join)
+register_basic("metalk8s_volumes.loop_device_options")(
+    MagicMock(return_value=["--direct-io=on"])
+)
 
 
 @register_basic("metalk8s.cmp_sorted")
@@ -160,8 +160,15 @@ class KubernetesAPIMock:
         return res
 
     def list_objects(
-        self, kind, apiVersion, all_namespaces=False, field_selector=None, **kwargs
+        self,
+        kind,
+        apiVersion,
+        all_namespaces=False,
+        field_selector=None,
+        fields=None,
+        **kwargs
     ):
+        # NOTE: `fields` projection is not emulated, full objects are returned
         resource = self.get_resource(kind, apiVersion)
 
         # If namespace isn't in kwargs, then all members of the matching
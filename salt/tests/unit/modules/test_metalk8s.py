@@ -183,38 +183,38 @@ class Metalk8sTestCase(TestCase, mixins.LoaderModuleMockMixin):
     @parameterized.expand(
         [
             (PRODUCT_TXT, {"version": "2.5.0", "name": "MetalK8s"}),
-            (None, "Failed to run isoinfo: An error has occurred", True),
+            (
+                OSError("No such file or directory"),
+                "Failed to read ISO /my/path/iso: No such file or directory",
+                True,
+            ),
+            (ValueError("not an ISO 9660 image"), "Failed to read ISO .*", True),
             ("Not a good product txt", {"version": None, "name": None}),
+            (None, {"version": None, "name": None}),
         ]
     )
     def test_archive_info_from_iso(self, product, result, raises=False):
         """
         Tests the return of `archive_info_from_iso` function
         """
-        if product is None:
-            iso_info_cmd_kwargs = {
-                "retcode": 1,
-                "stderr": "An error has occurred",
-            }
+        read_file_mock = MagicMock()
+        if isinstance(product, Exception):
+            read_file_mock.side_effect = product
         else:
-            iso_info_cmd_kwargs = {"stdout": product}
+            read_file_mock.return_value = product
 
-        iso_info_cmd_mock = MagicMock(
-            return_value=utils.cmd_output(**iso_info_cmd_kwargs)
-        )
-
-        with patch.dict(metalk8s.__salt__, {"cmd.run_all": iso_info_cmd_mock}):
+        with patch.dict(metalk8s.__utils__, {"metalk8s_iso.read_file": read_file_mock}):
             if raises:
                 self.assertRaisesRegex(
                     CommandExecutionError,
                     result,
                     metalk8s.archive_info_from_iso,
-                    "/my/path/",
+                    "/my/path/iso",
                 )
             else:
                 self.assertEqual(metalk8s.archive_info_from_iso("/my/path/iso"), result)
 
-            iso_info_cmd_mock.assert_called_once()
+            read_file_mock.assert_called_once_with("/my/path/iso", "PRODUCT.TXT")
 
     @utils.parameterized_from_cases(YAML_TESTS_CASES["get_archives"])
     def test_get_archives(
@@ -312,6 +312,11 @@ class Metalk8sTestCase(TestCase, mixins.LoaderModuleMockMixin):
                 )
             else:
                 self.assertEqual(metalk8s.format_slots(data), result)
+                if data == result:
+                    # Data without slots is not copied
+                    self.assertIs(metalk8s.format_slots(data), data)
+                for slot_mock in salt_dict.values():
+                    slot_mock.assert_called_once()
 
     @parameterized.expand(
         [
@@ -523,6 +528,36 @@ class Metalk8sTestCase(TestCase, mixins.LoaderModuleMockMixin):
                 compile_template_mock.call_args[1],
             )
 
+    def test_get_from_map_cache(self):
+        """
+        Tests the caching of values rendered by `get_from_map` function
+        """
+        compile_template_mock = MagicMock(
+            side_effect=lambda *_, **__: {"my-value": {"a": "b"}}
+        )
+        with patch("salt.loader.render", MagicMock()), patch(
+            "salt.template.compile_template", compile_template_mock
+        ):
+            result = metalk8s.get_from_map("my-key", saltenv="my-salt-env")
+            self.assertEqual(result, {"my-value": {"a": "b"}})
+            # Returned values can be updated without affecting the cache
+            result["my-value"]["a"] = "c"
+            self.assertEqual(
+                metalk8s.get_from_map("my-key", saltenv="my-salt-env"),
+                {"my-value": {"a": "b"}},
+            )
+            compile_template_mock.assert_called_once()
+
+            # Cached per saltenv and value
+            metalk8s.get_from_map("my-key", saltenv="other-salt-env")
+            metalk8s.get_from_map("other-key", saltenv="my-salt-env")
+            self.assertEqual(compile_template_mock.call_count, 3)
+
+            # Only for the duration of the run
+            with patch.dict(metalk8s.__context__, clear=True):
+                metalk8s.get_from_map("my-key", saltenv="my-salt-env")
+            self.assertEqual(compile_template_mock.call_count, 4)
+
     @utils.parameterized_from_cases(YAML_TESTS_CASES["archive_info_from_product_txt"])
     def test_archive_info_from_product_txt(
         self, archive, info, result, is_file=False, is_dir=False, raises=False
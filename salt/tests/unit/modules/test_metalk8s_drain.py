@@ -3,6 +3,7 @@ from importlib import reload
 import json
 import logging
 import os.path
+import threading
 from unittest import TestCase
 from unittest.mock import MagicMock, patch
 
@@ -273,6 +274,34 @@ class DrainTestCase(TestCase, mixins.LoaderModuleMockMixin):
         self.assertEqual(result, expected_result)
         self.evict_pod_mock.assert_not_called()
 
+    @parameterized.expand(
+        [
+            # Pods sharing a ReplicaSet
+            ("multiple-pods", {}, 1),
+            # Pods managed by a ReplicaSet and a DaemonSet
+            (
+                "full",
+                {"force": True, "ignore_daemonset": True, "delete_local_data": True},
+                2,
+            ),
+        ]
+    )
+    def test_controller_lookup_cache(self, dataset, drain_kwargs, expected_calls):
+        """Check that controllers are only retrieved once per drain."""
+        self.seed_api_mock(dataset)
+        get_object_mock = MagicMock(side_effect=self.api_mock.get_object)
+        drainer = metalk8s_drain.Drain("my-node", **drain_kwargs)
+
+        with patch.dict(
+            metalk8s_drain.__salt__,
+            {"metalk8s_kubernetes.get_object": get_object_mock},
+        ):
+            # Compute pods twice, as done by `run_drain` on timeout
+            drainer.get_pods_for_eviction()
+            drainer.get_pods_for_eviction()
+
+        self.assertEqual(get_object_mock.call_count, expected_calls)
+
     @utils.parameterized_from_cases(YAML_TESTS_CASES["drain"]["eviction-filters"])
     def test_eviction_filters(
         self,
@@ -320,6 +349,54 @@ class DrainTestCase(TestCase, mixins.LoaderModuleMockMixin):
         self.assertEqual(result, "Eviction complete.")
         self.assertEqual(self.evict_pod_mock.call_count, eviction_attempts)
 
+    @utils.parameterized_from_cases(YAML_TESTS_CASES["drain"]["eviction-concurrency"])
+    def test_eviction_concurrency(
+        self,
+        node_name,
+        dataset,
+        eviction_times,
+        sleep_time,
+        max_concurrent_evictions,
+        events=None,
+        **kwargs
+    ):
+        """Check that pods with a rejected eviction are retried independently."""
+        self.seed_api_mock(dataset, events)
+        drainer = metalk8s_drain.Drain(node_name, **kwargs)
+
+        evict_side_effect = self.evict_pod_mock.side_effect
+        times = {}
+        lock = threading.Lock()
+        all_running = threading.Event()
+        running = [0]
+        max_running = [0]
+
+        def _evict_pod(name, **kwargs):
+            with lock:
+                times.setdefault(name, []).append(self.time_mock.time())
+                running[0] += 1
+                max_running[0] = max(max_running[0], running[0])
+                if running[0] == max_concurrent_evictions:
+                    all_running.set()
+            try:
+                # Give other evictions the chance to start before this one
+                # completes (`Event.wait` does not rely on the mocked time)
+                all_running.wait(1)
+                return evict_side_effect(name=name, **kwargs)
+            finally:
+                with lock:
+                    running[0] -= 1
+
+        self.evict_pod_mock.side_effect = _evict_pod
+
+        with self.time_mock.patch():
+            result = drainer.run_drain()
+
+        self.assertEqual(result, "Eviction complete.")
+        self.assertEqual(times, eviction_times)
+        self.assertEqual(self.time_mock.time(), sleep_time)
+        self.assertEqual(max_running[0], max_concurrent_evictions)
+
     @utils.parameterized_from_cases(YAML_TESTS_CASES["drain"]["waiting-for-eviction"])
     def test_waiting_for_eviction(
         self, node_name, dataset, sleep_time, events=None, **kwargs
@@ -334,8 +411,43 @@ class DrainTestCase(TestCase, mixins.LoaderModuleMockMixin):
         self.assertEqual(result, "Eviction complete.")
         self.assertEqual(self.time_mock.time(), sleep_time)
 
+    def test_waiting_for_eviction_unknown_time(self):
+        """Check that no eviction duration is logged for pods we did not evict."""
+        self.seed_api_mock(
+            "single-replicaset",
+            {
+                1: [
+                    {
+                        "resource": "pods",
+                        "verb": "delete",
+                        "name": "my-replicaset-pod",
+                    }
+                ]
+            },
+        )
+        drainer = metalk8s_drain.Drain("my-node")
+        pods = drainer.get_pods_for_eviction()
+
+        with capture_logs(
+            metalk8s_drain.log, logging.INFO
+        ) as captured, self.time_mock.patch():
+            drainer.start_timer()
+            drainer.wait_for_eviction(pods)
+
+        check_captured_logs(
+            captured,
+            [
+                {
+                    "level": "INFO",
+                    "contains": (
+                        "my-replicaset-pod evicted (eviction creation time unknown)"
+                    ),
+                }
+            ],
+        )
+
     @utils.parameterized_from_cases(YAML_TESTS_CASES["drain"]["timeout"])
-    def test_timeout(self, node_name, dataset, **kwargs):
+    def test_timeout(self, node_name, dataset, elapsed, **kwargs):
         """Check different sources of timeout."""
         self.seed_api_mock(dataset)
         drainer = metalk8s_drain.Drain(node_name, timeout=10, **kwargs)
@@ -347,6 +459,9 @@ class DrainTestCase(TestCase, mixins.LoaderModuleMockMixin):
                 drainer.run_drain,
             )
 
+        # Do not wait (much) longer than the timeout
+        self.assertEqual(self.time_mock.time(), elapsed)
+
     @utils.parameterized_from_cases(YAML_TESTS_CASES["drain"]["eviction-error"])
     def test_eviction_error(self, node_name, dataset, **kwargs):
         """Check that errors when evicting are stopping the drain process."""
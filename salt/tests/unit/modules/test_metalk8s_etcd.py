@@ -1,6 +1,7 @@
 from importlib import reload
+import threading
 from unittest import TestCase
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock, PropertyMock, patch
 
 from parameterized import parameterized
 from salt.exceptions import CommandExecutionError
@@ -38,6 +39,13 @@ class Metalk8sEtcdTestCase(TestCase, mixins.LoaderModuleMockMixin):
 
     loader_module = metalk8s_etcd
 
+    def setUp(self):
+        super().setUp()
+        # Do not reuse pooled clients across tests
+        patcher = patch.dict(metalk8s_etcd._CLIENTS, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
     def test_virtual_success(self):
         """
         Tests the return of `__virtual__` function, success
@@ -64,18 +72,32 @@ class Metalk8sEtcdTestCase(TestCase, mixins.LoaderModuleMockMixin):
                 True,
                 "10.11.12.14",
             ),
+            # Endpoints are raced, the first answering one wins
             (
                 ["minion1", "minion2"],
                 {"minion1": "10.11.12.13", "minion2": "10.11.12.14"},
                 True,
-                "10.11.12.13",
+                ["10.11.12.13", "10.11.12.14"],
+            ),
+            (
+                ["minion1", "minion2"],
+                {"minion1": "10.11.12.13", "minion2": "10.11.12.14"},
+                {"10.11.12.13": False, "10.11.12.14": True},
+                "10.11.12.14",
             ),
             (
                 ["minion1", "minion2"],
                 {"minion1": "10.11.12.13", "minion2": "10.11.12.14"},
-                [False, True],
+                {"10.11.12.13": "hang", "10.11.12.14": True},
                 "10.11.12.14",
             ),
+            (
+                ["minion1", "minion2"],
+                {"minion1": "10.11.12.13", "minion2": "10.11.12.14"},
+                "hang",
+                "Unable to find an available etcd member in the cluster",
+                True,
+            ),
             (
                 ["minion1", "minion2"],
                 {"minion1": "10.11.12.13", "minion2": "10.11.12.14"},
@@ -117,25 +139,33 @@ class Metalk8sEtcdTestCase(TestCase, mixins.LoaderModuleMockMixin):
                     return cp_ips
             return None
 
-        def _etcd_status():
-            result = status
-            if isinstance(status, list):
-                result = status.pop(0)
-            if result:
+        # Hanging members are released at the end of the test
+        released = threading.Event()
+        self.addCleanup(released.set)
+
+        def _etcd_client(host, **_):
+            host_status = status.get(host) if isinstance(status, dict) else status
+
+            def _etcd_status(_, timeout, **__):
+                self.assertEqual(timeout, metalk8s_etcd.PROBE_TIMEOUT)
+                if host_status == "hang":
+                    released.wait(5)
+                if host_status is not True:
+                    raise Exception("Unhealthy member")
                 return True
-            else:
-                raise Exception("Unhealthy member")
+
+            client = MagicMock()
+            client.maintenancestub.Status.side_effect = _etcd_status
+            return client
 
         patch_dict = {
             "saltutil.runner": MagicMock(side_effect=_saltutil_runner_mock),
             "metalk8s.minions_by_role": MagicMock(return_value=etcd_minions),
         }
-        etcd3_mock = MagicMock()
-        status_mock = etcd3_mock.return_value.__enter__.return_value.status
-        status_mock.side_effect = _etcd_status
+        etcd3_mock = MagicMock(side_effect=_etcd_client)
         with patch.dict(metalk8s_etcd.__salt__, patch_dict), patch(
             "etcd3.client", etcd3_mock
-        ), patch("etcd3.exceptions.ConnectionFailedError", Exception):
+        ), patch("metalk8s_etcd.PROBE_TIMEOUT", 0.5):
             if raises:
                 self.assertRaisesRegex(
                     Exception,
@@ -146,10 +176,10 @@ class Metalk8sEtcdTestCase(TestCase, mixins.LoaderModuleMockMixin):
                     "cert",
                 )
             else:
-                self.assertEqual(
-                    metalk8s_etcd._get_endpoint_up("ca", "key", "cert"), result
+                self.assertIn(
+                    metalk8s_etcd._get_endpoint_up("ca", "key", "cert"),
+                    result if isinstance(result, list) else [result],
                 )
-                status_mock.assert_called()
 
     @parameterized.expand([(), ("10.11.12.13")])
     def test_add_etcd_node(self, endpoint=None):
@@ -157,7 +187,7 @@ class Metalk8sEtcdTestCase(TestCase, mixins.LoaderModuleMockMixin):
         Tests the return of `add_etcd_node` function
         """
         etcd3_mock = MagicMock()
-        add_member = etcd3_mock.return_value.__enter__.return_value.add_member
+        add_member = etcd3_mock.return_value.add_member
         add_member.return_value = "my new node"
         with patch("etcd3.client", etcd3_mock), patch(
             "metalk8s_etcd._get_endpoint_up", MagicMock(return_value=endpoint)
@@ -205,7 +235,7 @@ class Metalk8sEtcdTestCase(TestCase, mixins.LoaderModuleMockMixin):
         Tests the return of `urls_exist_in_cluster` function
         """
         etcd3_mock = MagicMock()
-        etcd3_mock.return_value.__enter__.return_value.members = members
+        etcd3_mock.return_value.members = members
         with patch("etcd3.client", etcd3_mock), patch(
             "metalk8s_etcd._get_endpoint_up", MagicMock(return_value=endpoint)
         ):
@@ -271,7 +301,7 @@ class Metalk8sEtcdTestCase(TestCase, mixins.LoaderModuleMockMixin):
                     return cp_ips
             return None
 
-        def _etcd_status():
+        def _etcd_status(*_, **__):
             result = status
             if isinstance(status, list):
                 result = status.pop(0)
@@ -281,8 +311,8 @@ class Metalk8sEtcdTestCase(TestCase, mixins.LoaderModuleMockMixin):
                 raise Exception("Unhealthy member")
 
         etcd3_mock = MagicMock()
-        etcd3_mock.return_value.__enter__.return_value.members = members
-        etcd3_mock.return_value.__enter__.return_value.status.side_effect = _etcd_status
+        etcd3_mock.return_value.members = members
+        etcd3_mock.return_value.maintenancestub.Status.side_effect = _etcd_status
 
         patch_dict = {"saltutil.runner": MagicMock(side_effect=_saltutil_runner_mock)}
         with patch.dict(metalk8s_etcd.__salt__, patch_dict), patch(
@@ -334,7 +364,7 @@ class Metalk8sEtcdTestCase(TestCase, mixins.LoaderModuleMockMixin):
             return endpoint
 
         etcd3_mock = MagicMock()
-        etcd3_mock.return_value.__enter__.return_value.members = members
+        etcd3_mock.return_value.members = members
 
         with patch("etcd3.client", etcd3_mock), patch(
             "metalk8s_etcd._get_endpoint_up", MagicMock(side_effect=_get_endpoint)
@@ -343,3 +373,64 @@ class Metalk8sEtcdTestCase(TestCase, mixins.LoaderModuleMockMixin):
                 metalk8s_etcd.get_etcd_member_list(None if endpoint else "my_endpoint"),
                 result,
             )
+
+    def test_client_pool(self):
+        """
+        Tests that etcd clients are reused, unless a call failed
+        """
+        etcd3_mock = MagicMock()
+        etcd3_mock.return_value.members = MEMBERS_LIST
+
+        with patch("etcd3.client", etcd3_mock):
+            for _ in range(2):
+                self.assertEqual(
+                    metalk8s_etcd.get_etcd_member_list("my_endpoint"),
+                    MEMBERS_LIST_DICT,
+                )
+            etcd3_mock.assert_called_once()
+
+            type(etcd3_mock.return_value).members = PropertyMock(
+                side_effect=Exception("Failed to connect")
+            )
+            self.assertRaisesRegex(
+                Exception,
+                "Failed to connect",
+                metalk8s_etcd.get_etcd_member_list,
+                "my_endpoint",
+            )
+            etcd3_mock.return_value.close.assert_called_once()
+            self.assertEqual(metalk8s_etcd._CLIENTS, {})
+
+    def test_client_pool_certificates_renewed(self):
+        """
+        Tests that etcd clients are replaced (and closed) once their
+        certificates are renewed
+        """
+        mtimes = {"ca": 1, "key": 1, "cert": 1}
+
+        def _stat(path):
+            if path not in mtimes:
+                raise OSError(2, "No such file or directory")
+            return MagicMock(st_mtime_ns=mtimes[path])
+
+        etcd3_mock = MagicMock(side_effect=lambda **_: MagicMock(members=[]))
+
+        with patch("etcd3.client", etcd3_mock), patch(
+            "os.stat", MagicMock(side_effect=_stat)
+        ):
+            with metalk8s_etcd._client("my_endpoint", "ca", "key", "cert") as client:
+                pass
+            with metalk8s_etcd._client("my_endpoint", "ca", "key", "cert") as same:
+                self.assertIs(same, client)
+
+            mtimes["cert"] = 2
+            with metalk8s_etcd._client("my_endpoint", "ca", "key", "cert") as renewed:
+                self.assertIsNot(renewed, client)
+            client.close.assert_called_once()
+            renewed.close.assert_not_called()
+            self.assertEqual(list(metalk8s_etcd._CLIENTS.values()), [renewed])
+
+            # Missing certificates are reported by the `etcd3` library
+            with metalk8s_etcd._client("my_endpoint", "ca", "key", "other"):
+                pass
+            self.assertEqual(etcd3_mock.call_count, 3)
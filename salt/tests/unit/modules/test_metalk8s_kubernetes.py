@@ -1,4 +1,5 @@
 from importlib import reload
+import json
 import os.path
 from unittest import TestCase
 from unittest.mock import MagicMock, patch
@@ -15,6 +16,10 @@ from tests.unit import mixins
 from tests.unit import utils
 
 
+def _convert_raw_object_mock(data, model):
+    return "<{} {} dict>".format(model, data["metadata"]["name"])
+
+
 YAML_TESTS_FILE = os.path.join(
     os.path.dirname(os.path.abspath(__file__)), "files", "test_metalk8s_kubernetes.yaml"
 )
@@ -336,6 +341,7 @@ class Metalk8sKubernetesTestCase(TestCase, mixins.LoaderModuleMockMixin):
         raises=False,
         api_status_code=None,
         info_scope="namespaced",
+        info_model=None,
         manifest_file_content=None,
         called_with=None,
         **kwargs
@@ -344,13 +350,16 @@ class Metalk8sKubernetesTestCase(TestCase, mixins.LoaderModuleMockMixin):
         Tests the return of `get_object` function
         """
 
-        def _retrieve_mock(name, **_):
+        def _retrieve_mock(name, _preload_content=True, **_):
             if api_status_code is not None:
                 raise ApiException(
                     status=api_status_code, reason="An error has occurred"
                 )
 
             res = MagicMock()
+            if not _preload_content:
+                res.data = json.dumps({"metadata": {"name": name}})
+                return res
             # Do not return a real object as it does not bring any value in
             # this test
             res.to_dict.return_value = "<{} object dict>".format(name)
@@ -360,6 +369,7 @@ class Metalk8sKubernetesTestCase(TestCase, mixins.LoaderModuleMockMixin):
         if not info_scope:
             get_kind_info_mock.side_effect = ValueError("An error has occurred")
         get_kind_info_mock.return_value.scope = info_scope
+        get_kind_info_mock.return_value.model = info_model
 
         retrieve_mock = get_kind_info_mock.return_value.client.retrieve
         retrieve_mock.side_effect = _retrieve_mock
@@ -374,7 +384,10 @@ class Metalk8sKubernetesTestCase(TestCase, mixins.LoaderModuleMockMixin):
         else:
             manifest_read_mock.return_value = manifest_file_content
 
-        utils_dict = {"metalk8s_kubernetes.get_kind_info": get_kind_info_mock}
+        utils_dict = {
+            "metalk8s_kubernetes.get_kind_info": get_kind_info_mock,
+            "metalk8s_kubernetes.convert_raw_object": _convert_raw_object_mock,
+        }
         salt_dict = {
             "metalk8s_kubernetes.read_and_render_yaml_file": manifest_read_mock
         }
@@ -485,6 +498,8 @@ class Metalk8sKubernetesTestCase(TestCase, mixins.LoaderModuleMockMixin):
         raises=False,
         api_status_code=None,
         info_scope="namespaced",
+        info_model=None,
+        paginated=False,
         called_with=None,
         **kwargs
     ):
@@ -492,32 +507,46 @@ class Metalk8sKubernetesTestCase(TestCase, mixins.LoaderModuleMockMixin):
         Tests the return of `list_objects` function
         """
 
-        def _list_mock(**_):
+        def _list_mock(_preload_content=True, _continue=None, **_):
             if api_status_code is not None:
                 raise ApiException(
                     status=api_status_code, reason="An error has occurred"
                 )
 
+            chunk = {
+                "items": [
+                    {"metadata": {"name": "my-first-object"}},
+                    {"metadata": {"name": "my-second-object"}},
+                ],
+                "metadata": {},
+            }
+            if paginated:
+                # Return one object per chunk
+                index = int(_continue or 0)
+                chunk["items"] = chunk["items"][index : index + 1]
+                if index == 0:
+                    chunk["metadata"]["continue"] = "1"
+
             res = MagicMock()
-            # Do not return a real list object as it does not bring any value
-            # in this test
-            obj1 = MagicMock()
-            obj1.to_dict.return_value = "<my first object dict>"
-            obj2 = MagicMock()
-            obj2.to_dict.return_value = "<my second object dict>"
-
-            res.items = [obj1, obj2]
+            if _preload_content:
+                res.to_dict.return_value = chunk
+            else:
+                res.data = json.dumps(chunk)
             return res
 
         get_kind_info_mock = MagicMock()
         if not info_scope:
             get_kind_info_mock.side_effect = ValueError("An error has occurred")
         get_kind_info_mock.return_value.scope = info_scope
+        get_kind_info_mock.return_value.model = info_model
 
         list_mock = get_kind_info_mock.return_value.client.list
         list_mock.side_effect = _list_mock
 
-        utils_dict = {"metalk8s_kubernetes.get_kind_info": get_kind_info_mock}
+        utils_dict = {
+            "metalk8s_kubernetes.get_kind_info": get_kind_info_mock,
+            "metalk8s_kubernetes.convert_raw_object": _convert_raw_object_mock,
+        }
         with patch.dict(metalk8s_kubernetes.__utils__, utils_dict):
             if raises:
                 self.assertRaisesRegex(
@@ -525,7 +554,7 @@ class Metalk8sKubernetesTestCase(TestCase, mixins.LoaderModuleMockMixin):
                 )
             else:
                 self.assertEqual(metalk8s_kubernetes.list_objects(**kwargs), result)
-                list_mock.assert_called_once()
+                self.assertEqual(list_mock.call_count, 2 if paginated else 1)
                 if called_with:
                     self.assertDictContainsSubset(called_with, list_mock.call_args[1])
 
@@ -126,6 +126,17 @@ class Metalk8sKubernetesUtilsTestCase(TestCase, mixins.LoaderModuleMockMixin):
                 self.assertEqual(metalk8s_kubernetes_utils.get_version_info(), result)
             get_code_mock.assert_called()
 
+    def test_client_cache_info(self):
+        """
+        Tests the return of `client_cache_info` function
+        """
+        info = {"hits": 12, "misses": 1, "size": 1, "max_size": 8}
+        utils_dict = {
+            "metalk8s_kubernetes.client_cache_info": MagicMock(return_value=info)
+        }
+        with patch.dict(metalk8s_kubernetes_utils.__utils__, utils_dict):
+            self.assertEqual(metalk8s_kubernetes_utils.client_cache_info(), info)
+
     @parameterized.expand(
         [
             (True,),
@@ -246,16 +246,13 @@ class Metalk8sSolutionsTestCase(TestCase, mixins.LoaderModuleMockMixin):
         Tests the return of `manifest_from_iso` function
         """
 
-        def _cmd_run_all_mock(**_):
-            if manifest is None:
-                return {"retcode": 1, "stderr": "isoinfo error", "stdout": ""}
-            return {"retcode": 0, "stdout": manifest}
+        read_file_mock = MagicMock(return_value=manifest)
+        if manifest is None:
+            read_file_mock.side_effect = ValueError("not an ISO 9660 image")
 
-        cmd_run_all_mock = MagicMock(side_effect=_cmd_run_all_mock)
-
-        patch_dict = {"cmd.run_all": cmd_run_all_mock}
+        patch_dict = {"metalk8s_iso.read_file": read_file_mock}
         path = "/tmp/my-solution.iso"
-        with patch.dict(metalk8s_solutions.__salt__, patch_dict):
+        with patch.dict(metalk8s_solutions.__utils__, patch_dict):
             if raises:
                 self.assertRaisesRegex(
                     CommandExecutionError,
@@ -266,6 +263,8 @@ class Metalk8sSolutionsTestCase(TestCase, mixins.LoaderModuleMockMixin):
             else:
                 self.assertEqual(metalk8s_solutions.manifest_from_iso(path), result)
 
+            read_file_mock.assert_called_once_with(path, "MANIFEST.YAML")
+
     @utils.parameterized_from_cases(YAML_TESTS_CASES["list_available"])
     def test_list_available(self, mountpoints=None, archive_infos=None, result=None):
         """
@@ -0,0 +1,137 @@
+import os.path
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+from salt.exceptions import CommandExecutionError
+import yaml
+
+import metalk8s_upgrade
+
+from tests.unit import mixins
+from tests.unit import utils
+
+
+YAML_TESTS_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "files", "test_metalk8s_upgrade.yaml"
+)
+with open(YAML_TESTS_FILE) as fd:
+    YAML_TESTS_CASES = yaml.safe_load(fd)
+
+
+class Metalk8sUpgradeTestCase(TestCase, mixins.LoaderModuleMockMixin):
+    """
+    TestCase for `metalk8s_upgrade` module
+    """
+
+    loader_module = metalk8s_upgrade
+
+    def test_virtual(self):
+        """
+        Tests the return of `__virtual__` function
+        """
+        self.assertEqual(metalk8s_upgrade.__virtual__(), "metalk8s_upgrade")
+
+    @utils.parameterized_from_cases(YAML_TESTS_CASES["plan_waves"])
+    def test_plan_waves(
+        self,
+        nodes,
+        result,
+        node_names=None,
+        max_unavailable=1,
+        topology_label=None,
+        topology=None,
+        pods=None,
+        pdbs=None,
+        raises=False,
+    ):
+        """
+        Tests the return of `plan_waves` function
+        """
+        objects = {
+            "Node": [
+                {
+                    "metadata": {
+                        "name": name,
+                        "labels": dict(
+                            {
+                                "node-role.kubernetes.io/{}".format(role): ""
+                                for role in roles
+                            },
+                            **(
+                                {"topology.kubernetes.io/zone": topology[name]}
+                                if name in (topology or {})
+                                else {}
+                            )
+                        ),
+                    }
+                }
+                for name, roles in nodes.items()
+            ],
+            "Pod": [
+                {
+                    "metadata": {
+                        "name": "pod-on-{}".format(node),
+                        "namespace": "my-namespace",
+                        "labels": pod.get("labels"),
+                        "owner_references": [
+                            {
+                                "controller": True,
+                                "kind": "ReplicaSet",
+                                "name": pod["controller"],
+                            }
+                        ]
+                        if pod.get("controller")
+                        else None,
+                    },
+                    "spec": {
+                        "node_name": node,
+                        "affinity": {
+                            "pod_anti_affinity": {
+                                "required_during_scheduling_ignored_during_execution": [
+                                    {"topology_key": "kubernetes.io/hostname"}
+                                ]
+                            }
+                        }
+                        if pod.get("anti_affinity")
+                        else None,
+                    },
+                    "status": {"phase": pod.get("phase", "Running")},
+                }
+                for node, pod in (pods or {}).items()
+            ],
+            "PodDisruptionBudget": [
+                {
+                    "metadata": {
+                        "name": "pdb-{}".format(index),
+                        "namespace": pdb.get("namespace", "my-namespace"),
+                    },
+                    "spec": {"selector": pdb["selector"]},
+                    "status": {"disruptions_allowed": pdb["disruptions_allowed"]},
+                }
+                for index, pdb in enumerate(pdbs or [])
+            ],
+        }
+        list_objects_mock = MagicMock(
+            side_effect=lambda kind, **_: objects[kind],
+        )
+
+        kwargs = {"max_unavailable": max_unavailable}
+        if node_names is not None:
+            kwargs["nodes"] = node_names
+        if topology_label is not None:
+            kwargs["topology_label"] = topology_label
+
+        with patch.dict(
+            metalk8s_upgrade.__salt__,
+            {"metalk8s_kubernetes.list_objects": list_objects_mock},
+        ):
+            if raises:
+                self.assertRaisesRegex(
+                    CommandExecutionError, result, metalk8s_upgrade.plan_waves, **kwargs
+                )
+            else:
+                self.assertEqual(metalk8s_upgrade.plan_waves(**kwargs), result)
+
+        if max_unavailable == 1:
+            # No need to look at workloads when upgrading nodes one by one
+            list_objects_mock.assert_called_once()
@@ -1,6 +1,12 @@
+import collections
+import errno
+import json
 import os.path
+import stat
+import threading
+import time
 from unittest import TestCase
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock, mock_open, patch
 
 from parameterized import param, parameterized
 from salt.exceptions import CommandExecutionError
@@ -19,7 +25,7 @@ with open(YAML_TESTS_FILE) as fd:
     YAML_TESTS_CASES = yaml.safe_load(fd)
 
 
-def device_name_mock(path):
+def device_name_mock(path, timeout=None):
     if path.startswith("/dev/my_vg/"):
         path = "dm-2"
     return {"success": True, "result": os.path.basename(path)}
@@ -48,16 +54,17 @@ class Metalk8sVolumesTestCase(TestCase, mixins.LoaderModuleMockMixin):
         is_file=True,
         get_size=1073741824,
         is_blkdev=True,
-        lvdisplay=None,
+        lvs=None,
     ):
         """
         Tests the return of `exists` function
         """
         pillar_dict = {"metalk8s": {"volumes": pillar_volumes or {}}}
 
+        lvs_output = json.dumps({"report": [{"lv": lvs or []}]})
         salt_dict = {
             "file.is_blkdev": MagicMock(return_value=is_blkdev),
-            "lvm.lvdisplay": MagicMock(return_value=lvdisplay or {}),
+            "cmd.run_all": MagicMock(return_value=utils.cmd_output(stdout=lvs_output)),
         }
 
         is_file_mock = MagicMock(return_value=is_file)
@@ -84,7 +91,14 @@ class Metalk8sVolumesTestCase(TestCase, mixins.LoaderModuleMockMixin):
 
     @utils.parameterized_from_cases(YAML_TESTS_CASES["create"])
     def test_create(
-        self, name, raise_msg=None, pillar_volumes=None, ftruncate=True, lvcreate=None
+        self,
+        name,
+        raise_msg=None,
+        pillar_volumes=None,
+        ftruncate=True,
+        fallocate=True,
+        preallocated=False,
+        lvcreate=None,
     ):
         """
         Tests the return of `create` function
@@ -95,6 +109,10 @@ class Metalk8sVolumesTestCase(TestCase, mixins.LoaderModuleMockMixin):
         if not ftruncate:
             ftruncate_mock.side_effect = OSError("An error has occurred")
 
+        fallocate_mock = MagicMock()
+        if not fallocate:
+            fallocate_mock.side_effect = OSError("No space left on device")
+
         # Glob is used only for lvm, let simulate that we have 2 lvm volume
         glob_mock = MagicMock(return_value=["/dev/dm-1", "/dev/dm-2"])
 
@@ -114,6 +132,8 @@ class Metalk8sVolumesTestCase(TestCase, mixins.LoaderModuleMockMixin):
             "os.unlink", MagicMock()
         ), patch(
             "os.ftruncate", ftruncate_mock
+        ), patch(
+            "os.posix_fallocate", fallocate_mock
         ):
             if raise_msg:
                 self.assertRaisesRegex(
@@ -122,6 +142,9 @@ class Metalk8sVolumesTestCase(TestCase, mixins.LoaderModuleMockMixin):
             else:
                 # This function does not return anything
                 metalk8s_volumes.create(name)
+                if "sparseLoopDevice" in pillar_volumes[name]["spec"]:
+                    self.assertEqual(fallocate_mock.called, preallocated)
+                    self.assertEqual(ftruncate_mock.called, not preallocated)
 
     @utils.parameterized_from_cases(YAML_TESTS_CASES["is_prepared"])
     def test_is_prepared(
@@ -181,6 +204,8 @@ class Metalk8sVolumesTestCase(TestCase, mixins.LoaderModuleMockMixin):
         has_partition=False,
         pillar_volumes=None,
         cmd_output=None,
+        cmd=None,
+        wait_for=None,
     ):
         """
         Tests the return of `prepare` function
@@ -203,16 +228,20 @@ class Metalk8sVolumesTestCase(TestCase, mixins.LoaderModuleMockMixin):
             cmd_kwargs = {"stdout": cmd_output}
 
         salt_dict = {
-            "cmd.run_all": MagicMock(return_value=utils.cmd_output(**cmd_kwargs))
+            "cmd.run_all": MagicMock(return_value=utils.cmd_output(**cmd_kwargs)),
+            "file.is_blkdev": MagicMock(
+                side_effect=lambda path: path.startswith("/dev/")
+            ),
         }
 
         # Glob is used only for lvm, let simulate that we have 2 lvm volume
         glob_mock = MagicMock(return_value=["/dev/dm-1", "/dev/dm-2"])
+        device_name = MagicMock(side_effect=device_name_mock)
 
         with patch.dict(metalk8s_volumes.__pillar__, pillar_dict), patch.dict(
             metalk8s_volumes.__salt__, salt_dict
         ), patch.dict(metalk8s_volumes.__utils__, utils_dict), patch(
-            "metalk8s_volumes.device_name", device_name_mock
+            "metalk8s_volumes.device_name", device_name
         ), patch(
             "glob.glob", glob_mock
         ):
@@ -223,6 +252,12 @@ class Metalk8sVolumesTestCase(TestCase, mixins.LoaderModuleMockMixin):
             else:
                 # This function does not return anything
                 metalk8s_volumes.prepare(name)
+                if cmd:
+                    salt_dict["cmd.run_all"].assert_called_once_with(cmd)
+                if wait_for:
+                    device_name.assert_called_with(
+                        wait_for, timeout=metalk8s_volumes.DEVICE_TIMEOUT
+                    )
 
     @utils.parameterized_from_cases(YAML_TESTS_CASES["is_cleaned_up"])
     def test_is_cleaned_up(
@@ -277,22 +312,149 @@ class Metalk8sVolumesTestCase(TestCase, mixins.LoaderModuleMockMixin):
     @parameterized.expand(
         [
             # Nominal case: device exists.
-            ("exists", [True], "my-device"),
+            ("exists", True, "my-device"),
             # Error case: device doesn't exists.
-            ("missing", [False] * 10, "device `/dev/my-device` not found"),
-            # Device is temporarily missing.
-            ("transient-missing", [False, False, False, True], "my-device"),
+            ("missing", False, "device `/dev/my-device` not found"),
         ]
     )
-    def test_device_name(self, _, exist_values, result):
-        expected = {"success": any(exist_values), "result": result}
-        exists_mock = MagicMock(side_effect=exist_values)
+    def test_device_name(self, _, exists, result):
+        expected = {"success": exists, "result": result}
+        wait_mock = MagicMock(return_value=exists)
         realpath_mock = MagicMock(side_effect=lambda path: path)
-        with patch("os.path.exists", exists_mock), patch(
+        with patch("metalk8s_volumes._wait_for_device", wait_mock), patch(
             "os.path.realpath", realpath_mock
-        ), patch("time.sleep", MagicMock()):
-            result = metalk8s_volumes.device_name("/dev/my-device")
+        ):
+            result = metalk8s_volumes.device_name("/dev/my-device", timeout=5)
             self.assertEqual(result, expected)
+        wait_mock.assert_called_once_with("/dev/my-device", 5)
+
+    @parameterized.expand(
+        [
+            # Device exists, no need to wait.
+            param([], True, appears_after=0, monitored=False),
+            # Device appears before we start monitoring.
+            param([], True, appears_after=1),
+            # Device appears, we receive its uevents.
+            param(
+                [
+                    {"SUBSYSTEM": "net", "INTERFACE": "eth0"},
+                    {"SUBSYSTEM": "block", "DEVNAME": "sda"},
+                    {"SUBSYSTEM": "block", "DEVNAME": "/dev/sdb"},
+                    {
+                        "SUBSYSTEM": "block",
+                        "DEVNAME": "/dev/loop0p1",
+                        "DEVLINKS": "/dev/disk/by-partuuid/my-uuid /dev/my-link",
+                    },
+                ],
+                True,
+                appears_after=3,
+                path="/dev/my-link",
+            ),
+            # Kernel uevents only have the device name.
+            param(
+                [{"SUBSYSTEM": "block", "DEVNAME": "loop0p1"}],
+                True,
+                appears_after=3,
+                path="/dev/loop0p1",
+            ),
+            # uevent missed, but the device appears in the meantime.
+            param([None, None], True, appears_after=4),
+            # Invalid messages are skipped.
+            param(
+                [
+                    ValueError("invalid udev monitor message"),
+                    {"SUBSYSTEM": "block", "DEVNAME": "/dev/my-device"},
+                ],
+                True,
+                appears_after=2,
+            ),
+            param(
+                [ValueError("invalid udev monitor message"), None, None],
+                True,
+                appears_after=4,
+            ),
+            # Device never appears.
+            param(
+                [
+                    {"SUBSYSTEM": "block", "DEVNAME": "sda"},
+                    None,
+                    {"SUBSYSTEM": "block", "DEVNAME": "sdb"},
+                    None,
+                ],
+                False,
+            ),
+            # Cannot monitor uevents, fallback to polling.
+            param([], True, appears_after=4, monitor_error="Permission denied"),
+            param([], False, monitor_error="Permission denied"),
+        ]
+    )
+    def test_wait_for_device(
+        self,
+        uevents,
+        result,
+        appears_after=None,
+        monitored=True,
+        path="/dev/my-device",
+        monitor_error=None,
+    ):
+        """
+        Tests the return of `_wait_for_device` function, with fake uevents
+        """
+        clock = [0]
+        checks = []
+
+        def _exists(_):
+            checks.append(clock[0])
+            return appears_after is not None and len(checks) > appears_after
+
+        def _sleep(seconds):
+            clock[0] += seconds
+
+        def _receive(timeout):
+            # Each uevent takes 1s to come, then we time out
+            if uevents:
+                clock[0] += min(1, timeout)
+                uevent = uevents.pop(0)
+                if isinstance(uevent, Exception):
+                    raise uevent
+                return uevent
+            clock[0] += timeout
+            return None
+
+        monitor = MagicMock()
+        monitor.receive.side_effect = _receive
+        monitor_mock = MagicMock()
+        if monitor_error:
+            monitor_mock.side_effect = OSError(monitor_error)
+        else:
+            monitor_mock.return_value.__enter__.return_value = monitor
+        utils_dict = {"metalk8s_volumes.uevent_monitor": monitor_mock}
+
+        with patch.dict(metalk8s_volumes.__utils__, utils_dict), patch(
+            "os.path.exists", MagicMock(side_effect=_exists)
+        ), patch("time.monotonic", lambda: clock[0]), patch("time.sleep", _sleep):
+            self.assertEqual(metalk8s_volumes._wait_for_device(path, 5), result)
+
+        self.assertEqual(monitor_mock.called, monitored)
+        # Wait at most for the given timeout
+        self.assertLessEqual(clock[0], 5.1)
+
+    @utils.parameterized_from_cases(YAML_TESTS_CASES["loop_device_options"])
+    def test_loop_device_options(self, name, result, raises=False, pillar_volumes=None):
+        """
+        Tests the return of `loop_device_options` function
+        """
+        pillar_dict = {"metalk8s": {"volumes": pillar_volumes or {}}}
+
+        with patch.dict(metalk8s_volumes.__pillar__, pillar_dict), patch(
+            "metalk8s_volumes.device_name", device_name_mock
+        ):
+            if raises:
+                self.assertRaisesRegex(
+                    ValueError, result, metalk8s_volumes.loop_device_options, name
+                )
+            else:
+                self.assertEqual(metalk8s_volumes.loop_device_options(name), result)
 
     @utils.parameterized_from_cases(YAML_TESTS_CASES["device_info"])
     def test_device_info(self, name, result, raises=False, pillar_volumes=None):
@@ -304,18 +466,18 @@ class Metalk8sVolumesTestCase(TestCase, mixins.LoaderModuleMockMixin):
         if pillar_volumes:
             pillar_dict["metalk8s"]["volumes"] = pillar_volumes
 
-        salt_dict = {
-            "saltutil.refresh_pillar": MagicMock(),
-            "disk.dump": MagicMock(return_value={"getsize64": 4242}),
-        }
+        salt_dict = {"saltutil.refresh_pillar": MagicMock()}
 
         # Glob is used only for lvm, let simulate that we have 2 lvm volume
         glob_mock = MagicMock(return_value=["/dev/dm-1", "/dev/dm-2"])
+        size_mock = MagicMock(return_value=4242)
 
         with patch.dict(metalk8s_volumes.__pillar__, pillar_dict), patch.dict(
             metalk8s_volumes.__salt__, salt_dict
         ), patch("metalk8s_volumes.device_name", device_name_mock), patch(
             "glob.glob", glob_mock
+        ), patch(
+            "metalk8s_volumes._get_device_size", size_mock
         ):
             if raises:
                 self.assertRaisesRegex(
@@ -323,6 +485,726 @@ class Metalk8sVolumesTestCase(TestCase, mixins.LoaderModuleMockMixin):
                 )
             else:
                 self.assertEqual(result, metalk8s_volumes.device_info(name))
+                size_mock.assert_called_once_with(
+                    device_name_mock(result["path"])["result"]
+                )
+
+    @parameterized.expand(
+        [
+            param(
+                ["my-sparse-volume", "my-raw-block-device-volume"],
+                {
+                    "my-sparse-volume": {"success": True, "changes": ["Prepared"]},
+                    "my-raw-block-device-volume": {"success": True, "changes": []},
+                },
+            ),
+            # Volumes on the same disk (and in the same VG, or on a disk of
+            # this VG) are serialized
+            param(
+                [
+                    "my-sparse-volume",
+                    "my-sparse-block-volume",
+                    "my-lvm-lv-volume",
+                    "my-raw-block-device-volume",
+                    "my-lvm-lv-block-volume",
+                ],
+                {
+                    "my-sparse-volume": {"success": True, "changes": ["Prepared"]},
+                    "my-sparse-block-volume": {
+                        "success": True,
+                        "changes": ["Prepared"],
+                    },
+                    "my-lvm-lv-volume": {"success": True, "changes": ["Prepared"]},
+                    "my-raw-block-device-volume": {"success": True, "changes": []},
+                    "my-lvm-lv-block-volume": {
+                        "success": True,
+                        "changes": ["Prepared"],
+                    },
+                },
+                groups=[
+                    ["my-sparse-volume", "my-sparse-block-volume"],
+                    [
+                        "my-lvm-lv-volume",
+                        "my-raw-block-device-volume",
+                        "my-lvm-lv-block-volume",
+                    ],
+                ],
+            ),
+            # Unknown VG
+            param(
+                ["my-lvm-lv-volume", "my-raw-block-device-volume"],
+                {
+                    "my-lvm-lv-volume": {"success": True, "changes": []},
+                    "my-raw-block-device-volume": {"success": True, "changes": []},
+                },
+                physical_volumes={},
+                groups=[["my-lvm-lv-volume"], ["my-raw-block-device-volume"]],
+            ),
+            param(
+                ["my-sparse-volume", "unknown-volume", "my-invalid-type-volume"],
+                {
+                    "my-sparse-volume": {"success": True, "changes": ["Prepared"]},
+                    "unknown-volume": {
+                        "success": False,
+                        "changes": [],
+                        "error": "volume unknown-volume not found in pillar",
+                    },
+                    "my-invalid-type-volume": {
+                        "success": False,
+                        "changes": [],
+                        "error": "unsupported Volume type for Volume "
+                        "my-invalid-type-volume",
+                    },
+                },
+            ),
+            # All volumes from the pillar
+            param(
+                None,
+                {
+                    "my-sparse-volume": {"success": True, "changes": ["Prepared"]},
+                    "my-raw-block-device-volume": {"success": True, "changes": []},
+                },
+                pillar_names=["my-sparse-volume", "my-raw-block-device-volume"],
+            ),
+            param([], {}, max_workers=1),
+        ]
+    )
+    def test_prepare_volumes(
+        self,
+        names,
+        result,
+        max_workers=4,
+        pillar_names=None,
+        physical_volumes=None,
+        groups=None,
+    ):
+        """
+        Tests the return of `prepare_volumes` function
+        """
+        volumes = YAML_TESTS_CASES["_volumes_details"]
+        if pillar_names is not None:
+            volumes = {name: volumes[name] for name in pillar_names}
+        pillar_dict = {"metalk8s": {"volumes": volumes}}
+        if physical_volumes is None:
+            physical_volumes = {"my_vg": ["/dev/sda3", "/dev/sdb"]}
+
+        disks = {
+            "/var/lib/metalk8s/storage/sparse": "vda",
+            "/dev/sda1": "sda",
+            "/dev/sda3": "sda",
+            "/dev/sdb": "sdb",
+        }
+        lock = threading.Lock()
+        running = collections.Counter()
+        prepared = []
+
+        def _prepare_volume(name):
+            volume_disks = metalk8s_volumes._get_volume(name).disks
+            with lock:
+                for disk in volume_disks:
+                    running[disk] += 1
+                    self.assertEqual(running[disk], 1)
+                prepared.append(name)
+            time.sleep(0.01)
+            with lock:
+                for disk in volume_disks:
+                    running[disk] -= 1
+            return result[name]
+
+        with patch.dict(metalk8s_volumes.__pillar__, pillar_dict), patch(
+            "metalk8s_volumes._get_disk", MagicMock(side_effect=disks.get)
+        ), patch(
+            "metalk8s_volumes._list_physical_volumes",
+            MagicMock(return_value=physical_volumes),
+        ), patch(
+            "metalk8s_volumes._prepare_volume", _prepare_volume
+        ):
+            self.assertEqual(
+                metalk8s_volumes.prepare_volumes(names, max_workers=max_workers),
+                result,
+            )
+
+        # Volumes of a group are prepared one after the other, in order
+        for group in groups or []:
+            self.assertEqual([name for name in prepared if name in group], group)
+
+    def test_list_physical_volumes(self):
+        """
+        Tests the return of `_list_physical_volumes` function
+        """
+        report = {
+            "report": [
+                {
+                    "pv": [
+                        {"pv_name": "/dev/sda3", "vg_name": "my_vg"},
+                        {"pv_name": "/dev/sdb", "vg_name": "my_vg"},
+                        {"pv_name": "/dev/sdc", "vg_name": "other_vg"},
+                        {"pv_name": "/dev/sdd", "vg_name": ""},
+                    ]
+                }
+            ]
+        }
+        salt_dict = {
+            "cmd.run_all": MagicMock(
+                return_value=utils.cmd_output(stdout=json.dumps(report))
+            )
+        }
+
+        with patch.dict(metalk8s_volumes.__salt__, salt_dict):
+            self.assertEqual(
+                metalk8s_volumes._list_physical_volumes(),
+                {"my_vg": ["/dev/sda3", "/dev/sdb"], "other_vg": ["/dev/sdc"]},
+            )
+        salt_dict["cmd.run_all"].assert_called_once_with(
+            "pvs --reportformat json --options pv_name,vg_name"
+        )
+
+    @parameterized.expand(
+        [
+            param(True, True, {"success": True, "changes": []}),
+            param(True, False, {"success": True, "changes": ["Prepared"]}),
+            param(False, False, {"success": True, "changes": ["Present", "Prepared"]}),
+            param(
+                False,
+                False,
+                {"success": False, "changes": [], "error": "cannot create"},
+                create_error="cannot create",
+            ),
+            param(
+                False,
+                False,
+                {"success": False, "changes": ["Present"], "error": "cannot format"},
+                prepare_error="cannot format",
+            ),
+        ]
+    )
+    def test_prepare_volume(
+        self, exists, is_prepared, result, create_error=None, prepare_error=None
+    ):
+        """
+        Tests the return of `_prepare_volume` function
+        """
+        volume = MagicMock(exists=exists, is_prepared=is_prepared)
+        if create_error:
+            volume.create.side_effect = Exception(create_error)
+        if prepare_error:
+            volume.prepare.side_effect = Exception(prepare_error)
+
+        with patch("metalk8s_volumes._get_volume", MagicMock(return_value=volume)):
+            self.assertEqual(metalk8s_volumes._prepare_volume("my-volume"), result)
+
+        self.assertEqual(volume.create.called, not exists)
+        self.assertEqual(
+            volume.prepare.called, not is_prepared and create_error is None
+        )
+
+    @parameterized.expand(
+        [
+            # Partition of a disk
+            param(
+                stat.S_IFBLK,
+                "/sys/devices/pci0000:00/block/sda/sda1",
+                True,
+                "sda",
+            ),
+            # Whole disk
+            param(stat.S_IFBLK, "/sys/devices/pci0000:00/block/sdb", False, "sdb"),
+            # Regular file, stored on a partition
+            param(
+                stat.S_IFREG,
+                "/sys/devices/pci0000:00/block/vda/vda1",
+                True,
+                "vda",
+            ),
+            # Missing path
+            param(None, None, False, "/my/path"),
+        ]
+    )
+    def test_get_disk(self, mode, sys_path, is_partition, result):
+        """
+        Tests the return of `_get_disk` function
+        """
+        stat_mock = MagicMock(
+            return_value=MagicMock(st_mode=mode, st_rdev=2049, st_dev=64769)
+        )
+        if mode is None:
+            stat_mock.side_effect = OSError("No such file or directory")
+        realpath_mock = MagicMock(return_value=sys_path)
+
+        with patch("os.stat", stat_mock), patch(
+            "os.path.realpath", realpath_mock
+        ), patch("os.path.exists", MagicMock(return_value=is_partition)):
+            self.assertEqual(metalk8s_volumes._get_disk("/my/path"), result)
+
+        if mode is not None:
+            realpath_mock.assert_called_once_with(
+                "/sys/dev/block/8:1" if mode == stat.S_IFBLK else "/sys/dev/block/253:1"
+            )
+
+    @parameterized.expand(
+        [
+            param(
+                ["my-sparse-volume", "my-sparse-block-volume"],
+                {
+                    "my-sparse-volume": {
+                        "apparent_size": 1073741824,
+                        "allocated_size": 52428800,
+                    },
+                    "my-sparse-block-volume": None,
+                },
+            ),
+            # All sparse loop volumes from the pillar
+            param(
+                None,
+                {
+                    "my-sparse-volume": {
+                        "apparent_size": 1073741824,
+                        "allocated_size": 52428800,
+                    }
+                },
+                pillar_names=["my-sparse-volume", "my-raw-block-device-volume"],
+            ),
+            # No volume in the pillar (during bootstrap)
+            param(None, {}, pillar_names=[]),
+            # Not a sparse loop volume
+            param(
+                ["my-raw-block-device-volume"],
+                "volume my-raw-block-device-volume is not a sparse loop volume",
+                raises=ValueError,
+            ),
+            param(
+                None,
+                "errors in pillar: something went wrong",
+                raises=CommandExecutionError,
+                pillar_names=["_errors"],
+            ),
+            param(
+                ["my-sparse-volume"],
+                "Permission denied",
+                raises=OSError,
+                stat_error=errno.EACCES,
+            ),
+        ]
+    )
+    def test_space_usage(
+        self, names, result, raises=None, pillar_names=None, stat_error=None
+    ):
+        """
+        Tests the return of `space_usage` function
+        """
+        volumes = YAML_TESTS_CASES["_volumes_details"]
+        if pillar_names == []:
+            volumes = None
+        elif pillar_names == ["_errors"]:
+            volumes = {"_errors": ["something went wrong"]}
+        elif pillar_names is not None:
+            volumes = {name: volumes[name] for name in pillar_names}
+        pillar_dict = {"metalk8s": {"volumes": volumes}}
+
+        def _stat(path):
+            if stat_error:
+                raise OSError(stat_error, os.strerror(stat_error))
+            if path.endswith("f1d78810-3787-4ca4-b712-50a269e42560"):
+                return MagicMock(st_size=1073741824, st_blocks=102400)
+            raise OSError(errno.ENOENT, "No such file or directory")
+
+        with patch.dict(metalk8s_volumes.__pillar__, pillar_dict), patch(
+            "metalk8s_volumes.device_name", device_name_mock
+        ), patch("os.stat", MagicMock(side_effect=_stat)):
+            if raises:
+                self.assertRaisesRegex(
+                    raises, result, metalk8s_volumes.space_usage, names
+                )
+            else:
+                self.assertEqual(metalk8s_volumes.space_usage(names), result)
+
+    @parameterized.expand(
+        [
+            param(
+                {"my-sparse-volume": "fstrim", "my-sparse-block-volume": None},
+                {
+                    "my-sparse-volume": {
+                        "success": True,
+                        "method": "fstrim",
+                        "reclaimed": 4096,
+                    },
+                    "my-sparse-block-volume": {
+                        "success": True,
+                        "method": None,
+                        "reclaimed": 0,
+                    },
+                },
+            ),
+            param(
+                {"my-sparse-volume": CommandExecutionError("fstrim failed")},
+                {
+                    "my-sparse-volume": {
+                        "success": False,
+                        "method": None,
+                        "reclaimed": 0,
+                        "error": "fstrim failed",
+                    }
+                },
+            ),
+            # Sparse file not created yet
+            param(
+                {"my-sparse-volume": "punch-hole"},
+                {"my-sparse-volume": {"success": True, "method": None, "reclaimed": 0}},
+                stat_error=errno.ENOENT,
+            ),
+            param(
+                {"my-sparse-volume": "punch-hole"},
+                {
+                    "my-sparse-volume": {
+                        "success": False,
+                        "method": None,
+                        "reclaimed": 0,
+                        "error": "[Errno 13] Permission denied",
+                    }
+                },
+                stat_error=errno.EACCES,
+            ),
+        ]
+    )
+    def test_reclaim(self, methods, result, stat_error=None):
+        """
+        Tests the return of `reclaim` function
+        """
+        pillar_dict = {"metalk8s": {"volumes": YAML_TESTS_CASES["_volumes_details"]}}
+        mounts = {"/mnt": {"device": "/dev/loop0"}}
+        reclaimed = []
+
+        def _reclaim_volume(volume, mounts_arg):
+            self.assertEqual(mounts_arg, mounts)
+            method = methods[volume.get("metadata.name")]
+            if isinstance(method, Exception):
+                raise method
+            if method:
+                reclaimed.append(volume.path)
+            return method
+
+        def _stat(path):
+            if stat_error:
+                raise OSError(stat_error, os.strerror(stat_error))
+            return MagicMock(st_blocks=16 if path in reclaimed else 24)
+
+        salt_dict = {"mount.active": MagicMock(return_value=mounts)}
+
+        with patch.dict(metalk8s_volumes.__pillar__, pillar_dict), patch.dict(
+            metalk8s_volumes.__salt__, salt_dict
+        ), patch("metalk8s_volumes._reclaim_volume", _reclaim_volume), patch(
+            "os.stat", MagicMock(side_effect=_stat)
+        ):
+            self.assertEqual(metalk8s_volumes.reclaim(list(methods)), result)
+
+    @parameterized.expand(
+        [
+            # Mounted filesystem
+            param(
+                "my-sparse-volume",
+                "fstrim",
+                device="/dev/loop1",
+                cmd="fstrim /var/lib/kubelet/a",
+            ),
+            # Attached but not mounted (e.g. "Block" volume)
+            param("my-sparse-block-volume", None, device="/dev/loop2"),
+            # Detached loop device
+            param("my-sparse-volume", "punch-hole"),
+            # Preallocated volume
+            param("my-preallocated-volume", None, device="/dev/loop1"),
+            # Missing sparse file
+            param("my-sparse-volume", None, is_file=False),
+            param(
+                "my-sparse-volume",
+                "error while trying to run `fstrim /var/lib/kubelet/a`: "
+                "the discard operation is not supported",
+                device="/dev/loop1",
+                cmd="fstrim /var/lib/kubelet/a",
+                cmd_error="the discard operation is not supported",
+            ),
+        ]
+    )
+    def test_reclaim_volume(
+        self, name, result, device=None, is_file=True, cmd=None, cmd_error=None
+    ):
+        """
+        Tests the return of `_reclaim_volume` function
+        """
+        pillar_dict = {"metalk8s": {"volumes": YAML_TESTS_CASES["_volumes_details"]}}
+        mounts = {
+            "/var/lib/kubelet/b": {"device": "/dev/loop1"},
+            "/var/lib/kubelet/a": {"device": "/dev/loop1"},
+            "/": {"device": "/dev/vda1"},
+        }
+
+        if cmd_error:
+            cmd_kwargs = {"retcode": 1, "stderr": cmd_error}
+        else:
+            cmd_kwargs = {}
+        salt_dict = {
+            "cmd.run_all": MagicMock(return_value=utils.cmd_output(**cmd_kwargs))
+        }
+        utils_dict = {"metalk8s_volumes.dig_holes": MagicMock(return_value=4096)}
+        flock_mock = MagicMock()
+
+        with patch.dict(metalk8s_volumes.__pillar__, pillar_dict), patch.dict(
+            metalk8s_volumes.__salt__, salt_dict
+        ), patch.dict(metalk8s_volumes.__utils__, utils_dict), patch(
+            "metalk8s_volumes.device_name", device_name_mock
+        ), patch(
+            "metalk8s_volumes._get_loop_device", MagicMock(return_value=device)
+        ), patch(
+            "os.path.isfile", MagicMock(return_value=is_file)
+        ), patch(
+            "builtins.open", mock_open()
+        ) as open_mock, patch(
+            "fcntl.flock", flock_mock
+        ):
+            volume = metalk8s_volumes._get_volume(name)
+            if cmd_error:
+                self.assertRaisesRegex(
+                    CommandExecutionError,
+                    result,
+                    metalk8s_volumes._reclaim_volume,
+                    volume,
+                    mounts,
+                )
+            else:
+                self.assertEqual(
+                    metalk8s_volumes._reclaim_volume(volume, mounts), result
+                )
+
+        if cmd:
+            salt_dict["cmd.run_all"].assert_called_once_with(cmd)
+        else:
+            salt_dict["cmd.run_all"].assert_not_called()
+
+        if result == "punch-hole":
+            utils_dict["metalk8s_volumes.dig_holes"].assert_called_once_with(
+                volume.path
+            )
+        else:
+            utils_dict["metalk8s_volumes.dig_holes"].assert_not_called()
+
+        # The loop device must not be attached while we punch holes
+        if is_file and name != "my-preallocated-volume":
+            open_mock.assert_called_once_with(
+                "/var/lock/metalk8s-sparse-volume-{}.lock".format(volume.uuid), "a"
+            )
+            flock_mock.assert_called_once()
+
+    @parameterized.expand(
+        [
+            param("/var/lib/metalk8s/storage/sparse/my-volume", "/dev/loop1"),
+            param("/var/lib/metalk8s/storage/sparse/other-volume", None),
+        ]
+    )
+    def test_get_loop_device(self, path, result):
+        """
+        Tests the return of `_get_loop_device` function
+        """
+        backing_files = {
+            "/sys/block/loop0/loop/backing_file": OSError("No such file"),
+            "/sys/block/loop1/loop/backing_file": (
+                "/var/lib/metalk8s/storage/sparse/my-volume\n"
+            ),
+        }
+
+        def _open(path):
+            content = backing_files[path]
+            if isinstance(content, Exception):
+                raise content
+            return mock_open(read_data=content)()
+
+        with patch("glob.glob", MagicMock(return_value=list(backing_files))), patch(
+            "builtins.open", MagicMock(side_effect=_open)
+        ):
+            self.assertEqual(metalk8s_volumes._get_loop_device(path), result)
+
+    def test_device_inventory(self):
+        """
+        Tests the return of `device_inventory` function, and its caching
+        """
+        sysfs = {
+            "/sys/class/block/sda/size": "20971520\n",
+            "/sys/class/block/sda1/size": "2048\n",
+            "/sys/class/block/loop0/size": OSError("No such file"),
+            # Detached loop device, not cached
+            "/sys/class/block/loop1/size": "0\n",
+            "/sys/class/block/dm-0/size": "2097152\n",
+        }
+
+        def _open(path):
+            content = sysfs[path]
+            if isinstance(content, Exception):
+                raise content
+            return mock_open(read_data=content)()
+
+        lvs_output = {
+            "report": [
+                {
+                    "lv": [
+                        {
+                            "lv_path": "/dev/my_vg/my-lv",
+                            "lv_name": "my-lv",
+                            "vg_name": "my_vg",
+                            "lv_size": "1073741824",
+                        }
+                    ]
+                }
+            ]
+        }
+        salt_dict = {
+            "cmd.run_all": MagicMock(
+                return_value=utils.cmd_output(stdout=json.dumps(lvs_output))
+            )
+        }
+        probe_mock = MagicMock()
+        probe_mock.return_value.__enter__.return_value.probe.return_value = MagicMock(
+            fstype="ext4", uuid="my-uuid", has_partition=False
+        )
+        utils_dict = {
+            "metalk8s_volumes.get_superblock_flags": MagicMock(),
+            "metalk8s_volumes.get_blkid_probe": probe_mock,
+        }
+        expected = {
+            "sizes": {
+                "sda": 10737418240,
+                "sda1": 1048576,
+                "dm-0": 1073741824,
+            },
+            "logical_volumes": {
+                "/dev/my_vg/my-lv": {
+                    "lv_path": "/dev/my_vg/my-lv",
+                    "lv_name": "my-lv",
+                    "vg_name": "my_vg",
+                    "lv_size": 1073741824,
+                }
+            },
+            "devices": {
+                "/dev/sda1": {
+                    "fstype": "ext4",
+                    "uuid": "my-uuid",
+                    "has_partition": False,
+                }
+            },
+        }
+
+        with patch.dict(metalk8s_volumes.__salt__, salt_dict), patch.dict(
+            metalk8s_volumes.__utils__, utils_dict
+        ), patch("glob.glob", MagicMock(return_value=list(sysfs))), patch(
+            "builtins.open", MagicMock(side_effect=_open)
+        ):
+            # Probe the device twice
+            for _ in range(2):
+                self.assertEqual(
+                    metalk8s_volumes._get_from_blkid("/dev/sda1"),
+                    expected["devices"]["/dev/sda1"],
+                )
+            self.assertEqual(metalk8s_volumes.device_inventory(), expected)
+            self.assertEqual(metalk8s_volumes.device_inventory(), expected)
+
+            # Only probed once per run
+            probe_mock.assert_called_once()
+            salt_dict["cmd.run_all"].assert_called_once_with(
+                "lvs --reportformat json --units b --nosuffix "
+                "--options lv_path,lv_name,vg_name,lv_size"
+            )
+
+            expected["devices"] = {}
+            self.assertEqual(metalk8s_volumes.device_inventory(refresh=True), expected)
+            self.assertEqual(salt_dict["cmd.run_all"].call_count, 2)
+
+    def test_device_inventory_invalidated(self):
+        """
+        Tests that the device inventory is invalidated once a device is
+        formatted
+        """
+        pillar_dict = {"metalk8s": {"volumes": YAML_TESTS_CASES["_volumes_details"]}}
+        probe_mock = MagicMock()
+        probe_mock.return_value.__enter__.return_value.probe.return_value = MagicMock(
+            fstype=None, uuid=None, has_partition=False
+        )
+        utils_dict = {
+            "metalk8s_volumes.get_superblock_flags": MagicMock(),
+            "metalk8s_volumes.get_blkid_probe": probe_mock,
+        }
+        salt_dict = {
+            "cmd.run_all": MagicMock(return_value=utils.cmd_output()),
+            "file.is_blkdev": MagicMock(return_value=False),
+        }
+
+        with patch.dict(metalk8s_volumes.__pillar__, pillar_dict), patch.dict(
+            metalk8s_volumes.__salt__, salt_dict
+        ), patch.dict(metalk8s_volumes.__utils__, utils_dict):
+            self.assertFalse(metalk8s_volumes.is_prepared("my-sparse-volume"))
+            metalk8s_volumes.prepare("my-sparse-volume")
+            self.assertEqual(probe_mock.call_count, 1)
+
+            metalk8s_volumes.is_prepared("my-sparse-volume")
+            self.assertEqual(probe_mock.call_count, 2)
+
+    @parameterized.expand(
+        [
+            # From the inventory
+            param("sda", 10737418240),
+            # Created after the inventory was built
+            param("loop0", 1073741824),
+            param("loop1", "cannot read size of device loop1: No such file", True),
+            # Detached loop device
+            param("loop2", 0),
+        ]
+    )
+    def test_get_device_size(self, name, result, raises=False):
+        """
+        Tests the return of `_get_device_size` function
+        """
+        sysfs = {
+            "/sys/class/block/loop0/size": "2097152\n",
+            "/sys/class/block/loop2/size": "0\n",
+        }
+
+        def _open(path):
+            if path not in sysfs:
+                raise OSError("No such file")
+            return mock_open(read_data=sysfs[path])()
+
+        with patch(
+            "metalk8s_volumes._read_device_sizes",
+            MagicMock(return_value={"sda": 10737418240}),
+        ), patch("builtins.open", MagicMock(side_effect=_open)):
+            if raises:
+                self.assertRaisesRegex(
+                    CommandExecutionError,
+                    result,
+                    metalk8s_volumes._get_device_size,
+                    name,
+                )
+            else:
+                self.assertEqual(metalk8s_volumes._get_device_size(name), result)
+
+    def test_device_size_empty_not_cached(self):
+        """
+        Tests that empty devices (e.g. detached loop devices) are read again,
+        as they may have been attached since
+        """
+        sysfs = {
+            "/sys/class/block/sda/size": "20971520\n",
+            "/sys/class/block/loop0/size": "0\n",
+        }
+
+        def _open(path):
+            return mock_open(read_data=sysfs[path])()
+
+        with patch("glob.glob", MagicMock(return_value=list(sysfs))), patch(
+            "builtins.open", MagicMock(side_effect=_open)
+        ):
+            self.assertEqual(metalk8s_volumes._get_device_size("sda"), 10737418240)
+            self.assertEqual(metalk8s_volumes._get_device_size("loop0"), 0)
+
+            # The loop device gets attached
+            sysfs["/sys/class/block/loop0/size"] = "2097152\n"
+            self.assertEqual(metalk8s_volumes._get_device_size("loop0"), 1073741824)
 
 
 class RawBlockDeviceBlockTestCase(TestCase):
@@ -0,0 +1,140 @@
+import io
+from unittest import TestCase
+
+from parameterized import param, parameterized
+from salt.exceptions import SaltRenderError
+
+from tests.unit import utils
+
+
+metalk8s_kubernetes = utils.load_salt_module(
+    "_renderers", "metalk8s_kubernetes", "metalk8s_kubernetes_renderer"
+)
+
+
+SOURCE = """
+apiVersion: v1
+kind: Namespace
+metadata:
+  name: my-namespace
+---
+apiVersion: v1
+kind: ConfigMap
+metadata:
+  name: my-config
+  namespace: my-namespace
+data:
+  key: value
+---
+"""
+
+NAMESPACE = {
+    "apiVersion": "v1",
+    "kind": "Namespace",
+    "metadata": {"name": "my-namespace"},
+}
+CONFIG_MAP = {
+    "apiVersion": "v1",
+    "kind": "ConfigMap",
+    "metadata": {"name": "my-config", "namespace": "my-namespace"},
+    "data": {"key": "value"},
+}
+
+
+class Metalk8sKubernetesRendererTestCase(TestCase):
+    """
+    TestCase for `metalk8s_kubernetes` renderer
+    """
+
+    @parameterized.expand(
+        [
+            param("", "present"),
+            param("absent=True", "absent"),
+            param("bulk=False&kubeconfig=my-kubeconfig", "present", "my-kubeconfig"),
+        ]
+    )
+    def test_render(self, argline, func, kubeconfig=None):
+        """
+        Tests the return of `render` function, with a state per object
+        """
+        verb = "Remove" if func == "absent" else "Apply"
+        result = metalk8s_kubernetes.render(SOURCE, argline=argline)
+
+        self.assertEqual(
+            list(result.items()),
+            [
+                (
+                    "{} v1/Namespace 'my-namespace'".format(verb),
+                    {
+                        "metalk8s_kubernetes.object_{}".format(func): [
+                            {"name": "{} v1/Namespace 'my-namespace'".format(verb)},
+                            {"kubeconfig": kubeconfig},
+                            {"context": None},
+                            {"manifest": NAMESPACE},
+                        ]
+                    },
+                ),
+                (
+                    "{} v1/ConfigMap 'my-namespace/my-config'".format(verb),
+                    {
+                        "metalk8s_kubernetes.object_{}".format(func): [
+                            {
+                                "name": "{} v1/ConfigMap 'my-namespace/my-config'".format(
+                                    verb
+                                )
+                            },
+                            {"kubeconfig": kubeconfig},
+                            {"context": None},
+                            {"manifest": CONFIG_MAP},
+                        ]
+                    },
+                ),
+            ],
+        )
+
+    @parameterized.expand(
+        [
+            param("bulk=True", "present"),
+            param("bulk=true&absent=True", "absent"),
+            param("bulk=True&concurrency=5&context=my-context", "present", 5),
+        ]
+    )
+    def test_render_bulk(self, argline, func, concurrency=None):
+        """
+        Tests the return of `render` function, with a single state for all
+        the objects
+        """
+        verb = "Remove" if func == "absent" else "Apply"
+        name = "{} all objects from 'my.sls'".format(verb)
+        expected_args = [
+            {"name": name},
+            {"kubeconfig": None},
+            {"context": "my-context" if concurrency else None},
+            {"manifests": [NAMESPACE, CONFIG_MAP]},
+        ]
+        if concurrency is not None:
+            expected_args.append({"concurrency": concurrency})
+
+        result = metalk8s_kubernetes.render(
+            io.StringIO(SOURCE), sls="my.sls", argline=argline
+        )
+
+        self.assertEqual(
+            list(result.items()),
+            [(name, {"metalk8s_kubernetes.objects_{}".format(func): expected_args})],
+        )
+
+    @parameterized.expand([param(""), param("bulk=True")])
+    def test_render_missing_name(self, argline):
+        """
+        Tests that `render` fails on objects without a name
+        """
+        source = SOURCE + "apiVersion: v1\nkind: Namespace\nmetadata: {}\n"
+
+        self.assertRaisesRegex(
+            SaltRenderError,
+            "Object `metadata.name` must be set.",
+            metalk8s_kubernetes.render,
+            source,
+            argline=argline,
+        )
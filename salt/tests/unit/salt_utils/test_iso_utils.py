@@ -0,0 +1,305 @@
+import os
+import shutil
+import struct
+import tempfile
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+from parameterized import param, parameterized
+from salt.exceptions import SaltCacheError
+
+import iso_utils
+
+from tests.unit import mixins
+
+
+ISO_FILES = {
+    "PRODUCT.TXT;1": b"NAME=MetalK8s\nVERSION=1.2.3\n",
+    "README.;1": b"Hello\n",
+    "DIR": {
+        "NESTED": {"MANIFEST.YAML;1": b"kind: Solution\n"},
+    },
+}
+
+
+def _directory_record(name, extent, size, is_dir=False):
+    # Records have an even length
+    length = 33 + len(name) + (len(name) + 1) % 2
+    record = bytearray(length)
+    record[0] = length
+    # Both-endian fields, see ECMA-119 9.1
+    for offset, value in ((2, extent), (10, size)):
+        struct.pack_into("<I", record, offset, value)
+        struct.pack_into(">I", record, offset + 4, value)
+    record[25] = iso_utils.DIRECTORY_FLAG if is_dir else 0
+    struct.pack_into("<H", record, 28, 1)
+    struct.pack_into(">H", record, 30, 1)
+    record[32] = len(name)
+    record[33 : 33 + len(name)] = name
+    return bytes(record)
+
+
+def make_iso(path, files):
+    """Write a minimal ISO 9660 image to `path`, containing `files` (a tree
+    of dicts, by name, with the content of each file)."""
+    sectors = {}
+    # After the system area, the primary and terminator volume descriptors
+    next_sector = [iso_utils.FIRST_DESCRIPTOR_SECTOR + 2]
+
+    def _allocate(count):
+        sector = next_sector[0]
+        next_sector[0] += max(count, 1)
+        return sector
+
+    def _write_directory(tree, parent=None):
+        extent = _allocate(1)
+        records = [
+            _directory_record(b"\x00", extent, iso_utils.SECTOR_SIZE, True),
+            _directory_record(b"\x01", parent or extent, iso_utils.SECTOR_SIZE, True),
+        ]
+        for name, content in tree.items():
+            if isinstance(content, dict):
+                entry_extent = _write_directory(content, extent)
+                records.append(
+                    _directory_record(
+                        name.encode(), entry_extent, iso_utils.SECTOR_SIZE, True
+                    )
+                )
+            else:
+                entry_extent = _allocate(-(-len(content) // iso_utils.SECTOR_SIZE))
+                sectors[entry_extent] = content
+                records.append(
+                    _directory_record(name.encode(), entry_extent, len(content))
+                )
+        sectors[extent] = b"".join(records)
+        return extent
+
+    root_record = _directory_record(
+        b"\x00", _write_directory(files), iso_utils.SECTOR_SIZE, True
+    )
+
+    primary = bytearray(iso_utils.SECTOR_SIZE)
+    primary[0:7] = bytes([iso_utils.PRIMARY_DESCRIPTOR]) + b"CD001\x01"
+    struct.pack_into("<H", primary, 128, iso_utils.SECTOR_SIZE)
+    struct.pack_into(">H", primary, 130, iso_utils.SECTOR_SIZE)
+    primary[156:190] = root_record
+    sectors[iso_utils.FIRST_DESCRIPTOR_SECTOR] = bytes(primary)
+    sectors[iso_utils.FIRST_DESCRIPTOR_SECTOR + 1] = (
+        bytes([iso_utils.TERMINATOR_DESCRIPTOR]) + b"CD001\x01"
+    )
+
+    with open(path, "wb") as fd:
+        fd.truncate(next_sector[0] * iso_utils.SECTOR_SIZE)
+        for sector, data in sectors.items():
+            fd.seek(sector * iso_utils.SECTOR_SIZE)
+            fd.write(data)
+
+
+class IsoUtilsTestCase(TestCase, mixins.LoaderModuleMockMixin):
+    """
+    TestCase for `iso_utils` utility module
+    """
+
+    loader_module = iso_utils
+    loader_module_globals = {"__opts__": {}}
+
+    def setUp(self):
+        super().setUp()
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        self.iso_path = os.path.join(tmp_dir, "metalk8s.iso")
+        make_iso(self.iso_path, ISO_FILES)
+
+        files_patcher = patch.dict(iso_utils._FILES, clear=True)
+        files_patcher.start()
+        self.addCleanup(files_patcher.stop)
+
+    def test_root_directory(self):
+        """
+        Tests the return of `_root_directory` function
+        """
+        with open(self.iso_path, "rb") as fd:
+            self.assertEqual(
+                iso_utils._root_directory(fd),
+                (iso_utils.SECTOR_SIZE, 18, iso_utils.SECTOR_SIZE),
+            )
+
+    @parameterized.expand(
+        [
+            param(b"", "not an ISO 9660 image"),
+            param(b"\x00" * 20 * iso_utils.SECTOR_SIZE, "not an ISO 9660 image"),
+            # Only a terminator descriptor
+            param(
+                b"\x00" * 16 * iso_utils.SECTOR_SIZE
+                + (b"\xffCD001\x01").ljust(iso_utils.SECTOR_SIZE, b"\x00"),
+                "no primary volume descriptor found",
+            ),
+        ]
+    )
+    def test_root_directory_invalid(self, content, error):
+        """
+        Tests the return of `_root_directory` function on invalid images
+        """
+        with open(self.iso_path, "wb") as fd:
+            fd.write(content)
+
+        with open(self.iso_path, "rb") as fd:
+            self.assertRaisesRegex(ValueError, error, iso_utils._root_directory, fd)
+
+    def test_iter_directory(self):
+        """
+        Tests the return of `_iter_directory` function, on the root directory
+        """
+        with open(self.iso_path, "rb") as fd:
+            block_size, extent, size = iso_utils._root_directory(fd)
+            entries = list(iso_utils._iter_directory(fd, block_size, extent, size))
+
+        self.assertEqual(
+            [(name, is_dir) for name, is_dir, _, _ in entries],
+            [("PRODUCT.TXT", False), ("README", False), ("DIR", True)],
+        )
+        self.assertEqual(entries[0][3], len(ISO_FILES["PRODUCT.TXT;1"]))
+
+    @parameterized.expand(
+        [
+            param("/PRODUCT.TXT", ISO_FILES["PRODUCT.TXT;1"]),
+            # Case insensitive, without version number nor trailing dot
+            param("product.txt", ISO_FILES["PRODUCT.TXT;1"]),
+            param("/README", ISO_FILES["README.;1"]),
+            param("/dir/nested/manifest.yaml", b"kind: Solution\n"),
+            param("/MISSING.TXT", None),
+            param("/DIR/MISSING.TXT", None),
+            # Directories are not files
+            param("/DIR", None),
+            param("/DIR/NESTED", None),
+            param("/PRODUCT.TXT/MANIFEST.YAML", None),
+        ]
+    )
+    def test_read_iso_file(self, name, result):
+        """
+        Tests the return of `read_iso_file` function
+        """
+        self.assertEqual(iso_utils.read_iso_file(self.iso_path, name), result)
+
+    def test_read_iso_file_invalid(self):
+        """
+        Tests the return of `read_iso_file` function on a non-ISO file
+        """
+        with open(self.iso_path, "wb") as fd:
+            fd.write(b"NAME=MetalK8s\n" * 4096)
+
+        self.assertRaisesRegex(
+            ValueError,
+            "not an ISO 9660 image",
+            iso_utils.read_iso_file,
+            self.iso_path,
+            "PRODUCT.TXT",
+        )
+
+    def _cache_mock(self, fetch_error=None, store_error=None):
+        cache = {}
+        cache_mock = MagicMock()
+        cache_mock.return_value.fetch.side_effect = fetch_error or (
+            lambda bank, key: cache.get((bank, key), {})
+        )
+        cache_mock.return_value.store.side_effect = store_error or (
+            lambda bank, key, data: cache.__setitem__((bank, key), data)
+        )
+        return cache_mock
+
+    def test_read_file(self):
+        """
+        Tests the return of `read_file` function, and its caching
+        """
+        read_mock = MagicMock(side_effect=iso_utils.read_iso_file)
+
+        with patch("salt.cache.Cache", self._cache_mock()), patch(
+            "iso_utils.read_iso_file", read_mock
+        ):
+            for _ in range(2):
+                self.assertEqual(
+                    iso_utils.read_file(self.iso_path, "PRODUCT.TXT"),
+                    "NAME=MetalK8s\nVERSION=1.2.3\n",
+                )
+            self.assertIsNone(iso_utils.read_file(self.iso_path, "MISSING.TXT"))
+            self.assertEqual(read_mock.call_count, 2)
+
+            # Another process, sharing the Salt cache
+            iso_utils._FILES.clear()
+            self.assertEqual(
+                iso_utils.read_file(self.iso_path, "PRODUCT.TXT"),
+                "NAME=MetalK8s\nVERSION=1.2.3\n",
+            )
+            self.assertIsNone(iso_utils.read_file(self.iso_path, "MISSING.TXT"))
+            self.assertEqual(read_mock.call_count, 2)
+
+    @parameterized.expand(["size", "mtime", "inode"])
+    def test_read_file_invalidated(self, change):
+        """
+        Tests that files read by `read_file` are read again once the ISO
+        changes
+        """
+        with patch("salt.cache.Cache", self._cache_mock()):
+            self.assertEqual(
+                iso_utils.read_file(self.iso_path, "README"),
+                "Hello\n",
+            )
+
+            stat = os.stat(self.iso_path)
+            if change == "size":
+                make_iso(self.iso_path, {"README.;1": b"Hello, world!\n" * 1024})
+                os.utime(self.iso_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+            else:
+                # Same size
+                new_path = self.iso_path + ".new"
+                make_iso(new_path, {**ISO_FILES, "README.;1": b"Hallo\n"})
+                if change == "inode":
+                    os.utime(new_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+                    os.replace(new_path, self.iso_path)
+                else:
+                    # Keep the inode
+                    shutil.copyfile(new_path, self.iso_path)
+                    os.utime(self.iso_path, ns=(0, stat.st_mtime_ns + 1))
+
+            new_stat = os.stat(self.iso_path)
+            self.assertEqual(
+                [
+                    new_stat.st_size != stat.st_size,
+                    new_stat.st_mtime_ns != stat.st_mtime_ns,
+                    new_stat.st_ino != stat.st_ino,
+                ],
+                [change == "size", change == "mtime", change == "inode"],
+            )
+
+            self.assertEqual(
+                iso_utils.read_file(self.iso_path, "README"),
+                "Hello, world!\n" * 1024 if change == "size" else "Hallo\n",
+            )
+
+    @parameterized.expand(
+        [
+            param(fetch_error=SaltCacheError("Corrupted cache")),
+            param(store_error=SaltCacheError("No space left on device")),
+        ]
+    )
+    def test_read_file_cache_error(self, fetch_error=None, store_error=None):
+        """
+        Tests that `read_file` reads from the ISO if the Salt cache is not
+        usable
+        """
+        with patch("salt.cache.Cache", self._cache_mock(fetch_error, store_error)):
+            self.assertEqual(
+                iso_utils.read_file(self.iso_path, "PRODUCT.TXT"),
+                "NAME=MetalK8s\nVERSION=1.2.3\n",
+            )
+
+    def test_read_file_missing(self):
+        """
+        Tests that `read_file` raises if the ISO does not exist
+        """
+        os.unlink(self.iso_path)
+
+        with patch("salt.cache.Cache", self._cache_mock()):
+            self.assertRaises(
+                FileNotFoundError, iso_utils.read_file, self.iso_path, "PRODUCT.TXT"
+            )
@@ -0,0 +1,312 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+import kubernetes.client
+from parameterized import param, parameterized
+
+import kubernetes_utils
+
+from tests.unit import mixins
+
+
+class KubernetesUtilsTestCase(TestCase, mixins.LoaderModuleMockMixin):
+    """
+    TestCase for `kubernetes_utils` utility module
+    """
+
+    loader_module = kubernetes_utils
+    loader_module_globals = {"__opts__": {"__role": "master"}}
+
+    @parameterized.expand(
+        [
+            param(age=10, result=True),
+            param(age=180, result=True),
+            # Stale, the engine is likely not running anymore
+            param(age=181, result=False),
+            param(age=20, max_age=10, result=False),
+            # Disabled
+            param(age=10, max_age=0, result=False),
+            # Not on the Salt master
+            param(age=10, role="minion", result=False),
+            # Never published
+            param(age=None, result=False),
+        ]
+    )
+    def test_get_informer_store(self, age, result, max_age=None, role="master"):
+        """
+        Tests the return of `get_informer_store` function
+        """
+        store = None
+        if age is not None:
+            store = {"timestamp": 1000 - age, "items": {}, "indexes": {}}
+        cache_mock = MagicMock()
+        cache_mock.return_value.fetch.return_value = store
+        opts = {"__role": role}
+        if max_age is not None:
+            opts[kubernetes_utils.INFORMER_MAX_AGE_OPTION] = max_age
+
+        with patch.dict(kubernetes_utils.__opts__, opts), patch(
+            "salt.cache.Cache", cache_mock
+        ), patch("time.time", lambda: 1000):
+            self.assertEqual(
+                kubernetes_utils.get_informer_store("volumes"),
+                store if result else None,
+            )
+
+        if result:
+            cache_mock.return_value.fetch.assert_called_once_with(
+                kubernetes_utils.INFORMER_BANK, "volumes"
+            )
+
+
+class ClientCacheTestCase(TestCase):
+    """
+    TestCase for `kubernetes_utils.ClientCache` class
+    """
+
+    def setUp(self):
+        super().setUp()
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        self.kubeconfigs = []
+        for name in ("admin.conf", "other.conf", "another.conf"):
+            path = os.path.join(tmp_dir, name)
+            with open(path, "w") as fd:
+                fd.write("{}")
+            self.kubeconfigs.append(path)
+
+        self.new_client_mock = MagicMock(side_effect=lambda *_: MagicMock())
+        config_patcher = patch.object(
+            kubernetes_utils,
+            "k8s_config",
+            MagicMock(new_client_from_config=self.new_client_mock),
+        )
+        config_patcher.start()
+        self.addCleanup(config_patcher.stop)
+
+    def _touch(self, path):
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+
+    def test_get(self):
+        """
+        Tests that clients are reused for the same kubeconfig and context
+        """
+        cache = kubernetes_utils.ClientCache()
+        kubeconfig = self.kubeconfigs[0]
+
+        client = cache.get(kubeconfig)
+        self.assertIs(cache.get(kubeconfig), client)
+        self.assertIs(
+            cache.get(os.path.join(os.path.dirname(kubeconfig), ".", "admin.conf")),
+            client,
+        )
+        self.assertIsNot(cache.get(kubeconfig, "other-context"), client)
+        self.assertIsNot(cache.get(self.kubeconfigs[1]), client)
+
+        self.assertEqual(self.new_client_mock.call_count, 3)
+        self.assertEqual(
+            cache.info(), {"hits": 2, "misses": 3, "size": 3, "max_size": 8}
+        )
+
+        cache.clear()
+        self.assertEqual(
+            cache.info(), {"hits": 0, "misses": 0, "size": 0, "max_size": 8}
+        )
+        self.assertIsNot(cache.get(kubeconfig), client)
+
+    def test_get_kubeconfig_changed(self):
+        """
+        Tests that clients are built again once the kubeconfig changed, and
+        stale ones dropped
+        """
+        cache = kubernetes_utils.ClientCache()
+        kubeconfig = self.kubeconfigs[0]
+
+        client = cache.get(kubeconfig)
+        other_context_client = cache.get(kubeconfig, "other-context")
+        other_client = cache.get(self.kubeconfigs[1])
+        self._touch(kubeconfig)
+
+        new_client = cache.get(kubeconfig)
+        self.assertIsNot(new_client, client)
+        self.assertIs(cache.get(kubeconfig), new_client)
+        self.assertEqual(
+            list(cache._clients.values()),
+            [other_context_client, other_client, new_client],
+        )
+
+    def test_get_max_size(self):
+        """
+        Tests that least recently used clients are dropped
+        """
+        cache = kubernetes_utils.ClientCache(max_size=2)
+        first, second, third = self.kubeconfigs
+
+        first_client = cache.get(first)
+        cache.get(second)
+        self.assertIs(cache.get(first), first_client)
+        cache.get(third)
+
+        self.assertEqual(cache.info()["size"], 2)
+        self.assertIs(cache.get(first), first_client)
+        cache.get(second)
+        self.assertEqual(self.new_client_mock.call_count, 4)
+
+    def test_get_missing_kubeconfig(self):
+        """
+        Tests that clients are not cached if the kubeconfig does not exist
+        """
+        cache = kubernetes_utils.ClientCache()
+        missing = self.kubeconfigs[0] + ".missing"
+
+        self.assertIsNot(cache.get(missing), cache.get(missing))
+        self.new_client_mock.assert_called_with(missing, None, False)
+        self.assertEqual(cache.info()["size"], 0)
+
+    def test_api_client_configure(self):
+        """
+        Tests that `ApiClient` only builds its API instance again when its
+        client changes
+        """
+        api_client = kubernetes_utils.ApiClient(
+            kubernetes.client.CoreV1Api, "namespace"
+        )
+        clients = [MagicMock(), MagicMock()]
+
+        with patch.object(
+            kubernetes_utils.CLIENT_CACHE,
+            "get",
+            MagicMock(side_effect=[clients[0], clients[0], clients[1]]),
+        ):
+            api_client.configure(config_file="/etc/kubernetes/admin.conf")
+            api = api_client.api
+            self.assertIs(api.api_client, clients[0])
+
+            api_client.configure(config_file="/etc/kubernetes/admin.conf")
+            self.assertIs(api_client.api, api)
+
+            api_client.configure(config_file="/etc/kubernetes/admin.conf")
+            self.assertIsNot(api_client.api, api)
+            self.assertIs(api_client.api.api_client, clients[1])
+
+
+class DictWrapperTestCase(TestCase):
+    """
+    TestCase for `kubernetes_utils._DictWrapper` class
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.fields = {
+            "apiVersion": "storage.metalk8s.scality.com/v1alpha1",
+            "spec": {
+                "nodeName": "bootstrap",
+                "rawBlockDevice": {"devicePath": "/dev/vdb"},
+            },
+            "status": {"conditions": [{"lastUpdateTime": "now"}, "Ready"]},
+            "continue": "token",
+        }
+        self.wrapper = kubernetes_utils._DictWrapper(self.fields)
+
+    def test_getattr(self):
+        """
+        Tests attribute access, using snake case names
+        """
+        self.assertEqual(
+            self.wrapper.api_version, "storage.metalk8s.scality.com/v1alpha1"
+        )
+        self.assertEqual(self.wrapper.apiVersion, self.wrapper.api_version)
+        self.assertEqual(self.wrapper.spec.node_name, "bootstrap")
+        self.assertEqual(self.wrapper.spec.raw_block_device.device_path, "/dev/vdb")
+        self.assertEqual(self.wrapper.status.conditions[0].last_update_time, "now")
+        self.assertEqual(self.wrapper.status.conditions[1], "Ready")
+        self.assertEqual(self.wrapper._continue, "token")
+        self.assertIs(self.wrapper.spec.to_dict(), self.fields["spec"])
+
+    @parameterized.expand(
+        [
+            param("missing"),
+            param("apiversion"),
+            # Only on the sub-dict
+            param("node_name"),
+            # Not initialized yet (e.g. when copying)
+            param("_fields", initialized=False),
+            param("_children", initialized=False),
+        ]
+    )
+    def test_getattr_missing(self, name, initialized=True):
+        """
+        Tests that missing attributes raise an AttributeError
+        """
+        wrapper = self.wrapper
+        if not initialized:
+            wrapper = kubernetes_utils._DictWrapper.__new__(
+                kubernetes_utils._DictWrapper
+            )
+
+        self.assertRaises(AttributeError, getattr, wrapper, name)
+        self.assertFalse(hasattr(wrapper, name))
+
+    def test_getattr_nested(self):
+        """
+        Tests that wrappers for sub-dicts are reused, as long as the sub-dict
+        is the same
+        """
+        spec = self.wrapper.spec
+        self.assertIs(self.wrapper.spec, spec)
+        self.assertIs(self.wrapper.spec.raw_block_device, spec.raw_block_device)
+
+        self.fields["spec"] = {"nodeName": "node-1"}
+        self.assertIsNot(self.wrapper.spec, spec)
+        self.assertEqual(self.wrapper.spec.node_name, "node-1")
+
+    def test_getattr_updated(self):
+        """
+        Tests that lookups follow the updates of the wrapped dict
+        """
+        spec = self.wrapper.spec
+        self.assertEqual(spec.node_name, "bootstrap")
+
+        # Key index built before these updates
+        del self.fields["spec"]["nodeName"]
+        self.assertRaises(AttributeError, getattr, spec, "node_name")
+        self.fields["spec"]["nodeName"] = "node-1"
+        self.fields["spec"]["storageClassName"] = "metalk8s"
+        self.assertEqual(spec.node_name, "node-1")
+        self.assertEqual(spec.storage_class_name, "metalk8s")
+
+        self.fields["spec"]["rawBlockDevice"]["devicePath"] = "/dev/vdc"
+        self.assertEqual(spec.raw_block_device.device_path, "/dev/vdc")
+
+        self.wrapper.kind = "Volume"
+        self.assertEqual(self.fields["kind"], "Volume")
+        self.assertEqual(self.wrapper.kind, "Volume")
+
+    @parameterized.expand(
+        [
+            ("kind", "kind"),
+            ("apiVersion", "api_version"),
+            ("JSONPath", "json_path"),
+            ("volumeID", "volume_id"),
+            ("continue", "_continue"),
+            ("$ref", "ref"),
+            ("openAPIV3Schema", "open_apiv3_schema"),
+            ("externalIPs", "external_i_ps"),
+        ]
+    )
+    def test_convert_attribute_name(self, key, result):
+        """
+        Tests the return of `_convert_attribute_name` function, and its
+        caching
+        """
+        kubernetes_utils._convert_attribute_name.cache_clear()
+
+        self.assertEqual(kubernetes_utils._convert_attribute_name(key), result)
+        self.assertEqual(kubernetes_utils._convert_attribute_name(key), result)
+
+        cache_info = kubernetes_utils._convert_attribute_name.cache_info()
+        self.assertEqual((cache_info.hits, cache_info.misses), (1, 1))
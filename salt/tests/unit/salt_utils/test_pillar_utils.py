@@ -0,0 +1,77 @@
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+from parameterized import param, parameterized
+
+import pillar_utils
+
+from tests.unit import mixins
+
+
+class PillarUtilsTestCase(TestCase, mixins.LoaderModuleMockMixin):
+    """
+    TestCase for `pillar_utils` utility module
+    """
+
+    loader_module = pillar_utils
+    loader_module_globals = {"__opts__": {}}
+
+    @parameterized.expand(
+        [
+            # Reused while fresh enough
+            param(age=1, result="cached"),
+            param(age=10, result="fetched"),
+            # Taken in the future (clock change)
+            param(age=-1, result="fetched"),
+            # Reused only if taken at the same version
+            param(age=1, version="42", cached_version="42", result="cached"),
+            param(age=1, version="43", cached_version="42", result="fetched"),
+            param(age=1, version=None, cached_version="42", result="fetched"),
+            param(age=1, version="42", cached_version=None, result="fetched"),
+            # Disabled
+            param(age=1, ttl=0, result="fetched", stored=False),
+            # Errors are not stored
+            param(age=10, fetched={"_errors": ["Oops"]}, stored=False),
+            param(age=10, fetched={}, stored=False),
+        ]
+    )
+    def test_get_snapshot(
+        self,
+        age,
+        result=None,
+        version=None,
+        cached_version=None,
+        ttl=5,
+        fetched="fetched",
+        stored=None,
+    ):
+        """
+        Tests the return of `get_snapshot` function
+        """
+        cache_mock = MagicMock()
+        cache_mock.return_value.fetch.return_value = {
+            "timestamp": 1000 - age,
+            "version": cached_version,
+            "data": "cached",
+        }
+        fetch_mock = MagicMock(return_value=fetched)
+
+        with patch.dict(
+            pillar_utils.__opts__, {"metalk8s.pillar_snapshot_ttl": ttl}
+        ), patch("salt.cache.Cache", cache_mock), patch("time.time", lambda: 1000):
+            self.assertEqual(
+                pillar_utils.get_snapshot("my-snapshot", fetch_mock, version=version),
+                fetched if result is None else result,
+            )
+
+        self.assertEqual(fetch_mock.called, result != "cached")
+        if stored is None:
+            stored = result != "cached"
+        if stored:
+            cache_mock.return_value.store.assert_called_once_with(
+                pillar_utils.SNAPSHOT_BANK,
+                "my-snapshot",
+                {"timestamp": 1000, "version": version, "data": fetched},
+            )
+        else:
+            cache_mock.return_value.store.assert_not_called()
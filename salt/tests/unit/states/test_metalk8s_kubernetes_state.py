@@ -0,0 +1,291 @@
+import threading
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+from parameterized import param, parameterized
+from salt.exceptions import CommandExecutionError
+
+from tests.unit import mixins
+from tests.unit import utils
+
+
+metalk8s_kubernetes = utils.load_salt_module(
+    "_states", "metalk8s_kubernetes", "metalk8s_kubernetes_state"
+)
+
+
+def _manifest(kind, name, namespace=None, api_version="v1"):
+    manifest = {"apiVersion": api_version, "kind": kind, "metadata": {"name": name}}
+    if namespace:
+        manifest["metadata"]["namespace"] = namespace
+    return manifest
+
+
+CRD = _manifest(
+    "CustomResourceDefinition",
+    "prometheuses.monitoring.coreos.com",
+    api_version="apiextensions.k8s.io/v1",
+)
+MANIFESTS = [
+    _manifest(
+        "Prometheus",
+        "my-prometheus",
+        "my-namespace",
+        api_version="monitoring.coreos.com/v1",
+    ),
+    _manifest("Deployment", "my-deployment", "my-namespace", api_version="apps/v1"),
+    _manifest("Service", "my-service", "my-namespace"),
+    CRD,
+    _manifest("ServiceAccount", "my-service-account", "my-namespace"),
+    _manifest("Namespace", "my-namespace"),
+]
+
+
+def _name(manifest):
+    return metalk8s_kubernetes._object_name(manifest)
+
+
+def _established(established=True):
+    return {
+        "status": {
+            "conditions": [
+                {"type": "NamesAccepted", "status": "True"},
+                {"type": "Established", "status": "True" if established else "False"},
+            ]
+        }
+    }
+
+
+class Metalk8sKubernetesStateTestCase(TestCase, mixins.LoaderModuleMockMixin):
+    """
+    TestCase for `metalk8s_kubernetes` state module (bulk functions)
+    """
+
+    loader_module = metalk8s_kubernetes
+    loader_module_globals = {"__env__": "base", "__opts__": {"test": False}}
+
+    def setUp(self):
+        super().setUp()
+        self.calls = []
+        self.lock = threading.Lock()
+        self.get_object_mock = MagicMock(return_value=_established())
+        salt_patcher = patch.dict(
+            metalk8s_kubernetes.__salt__,
+            {"metalk8s_kubernetes.get_object": self.get_object_mock},
+        )
+        salt_patcher.start()
+        self.addCleanup(salt_patcher.stop)
+        sleep_patcher = patch("time.sleep", MagicMock())
+        self.sleep_mock = sleep_patcher.start()
+        self.addCleanup(sleep_patcher.stop)
+
+    def _state_func(self, results=None):
+        results = results or {}
+
+        def _func(name, manifest, **kwargs):
+            with self.lock:
+                self.calls.append((manifest["kind"], kwargs))
+            result = results.get(manifest["kind"], True)
+            if isinstance(result, Exception):
+                raise result
+            return {
+                "name": name,
+                "result": result,
+                "changes": {"old": "absent", "new": "present"} if result else {},
+                "comment": "The object was created" if result else "Oops",
+            }
+
+        return MagicMock(side_effect=_func)
+
+    def test_objects_present(self):
+        """
+        Tests that `objects_present` applies objects by kind, in order
+        """
+        state_mock = self._state_func()
+
+        with patch.object(metalk8s_kubernetes, "object_present", state_mock):
+            ret = metalk8s_kubernetes.objects_present(
+                "my-state", MANIFESTS, kubeconfig="my-kubeconfig"
+            )
+
+        self.assertEqual(
+            [kind for kind, _ in self.calls],
+            [
+                "Namespace",
+                "ServiceAccount",
+                "CustomResourceDefinition",
+                "Service",
+                "Deployment",
+                "Prometheus",
+            ],
+        )
+        self.assertTrue(
+            all(kwargs == {"kubeconfig": "my-kubeconfig"} for _, kwargs in self.calls)
+        )
+        self.assertTrue(ret["result"])
+        self.assertEqual(set(ret["changes"]), set(map(_name, MANIFESTS)))
+        self.assertEqual(
+            ret["comment"].splitlines()[0],
+            "v1/Namespace 'my-namespace': The object was created",
+        )
+        self.get_object_mock.assert_called_once_with(
+            manifest=CRD, saltenv="base", kubeconfig="my-kubeconfig"
+        )
+
+    def test_objects_absent(self):
+        """
+        Tests that `objects_absent` removes objects by kind, in reverse order
+        """
+        state_mock = self._state_func()
+
+        with patch.object(metalk8s_kubernetes, "object_absent", state_mock):
+            ret = metalk8s_kubernetes.objects_absent("my-state", MANIFESTS)
+
+        self.assertEqual(
+            [kind for kind, _ in self.calls],
+            [
+                "Prometheus",
+                "Deployment",
+                "Service",
+                "CustomResourceDefinition",
+                "ServiceAccount",
+                "Namespace",
+            ],
+        )
+        self.assertTrue(ret["result"])
+        # No need to wait for CustomResourceDefinitions
+        self.get_object_mock.assert_not_called()
+
+    def test_objects_present_concurrency(self):
+        """
+        Tests that objects of the same kind are applied concurrently
+        """
+        manifests = [
+            _manifest("ConfigMap", "my-config-{}".format(index), "my-namespace")
+            for index in range(4)
+        ]
+        barrier = threading.Barrier(4, timeout=5)
+
+        def _func(name, manifest, **_):
+            # Fails if all the objects are not applied at the same time
+            barrier.wait()
+            return {"name": name, "result": True, "changes": {}, "comment": "OK"}
+
+        with patch.object(
+            metalk8s_kubernetes, "object_present", MagicMock(side_effect=_func)
+        ):
+            ret = metalk8s_kubernetes.objects_present(
+                "my-state", manifests, concurrency=4
+            )
+
+        self.assertTrue(ret["result"])
+
+    @parameterized.expand(
+        [
+            param(CommandExecutionError("Failed to create"), "Failed to create"),
+            # Any other error is reported for this object only
+            param(ValueError("Invalid value"), "Unexpected error: ValueError"),
+            param(KeyError("spec"), "Unexpected error: KeyError('spec')"),
+            param(False, "Oops"),
+        ]
+    )
+    def test_objects_present_failure(self, error, comment):
+        """
+        Tests that a failure stops the objects of the next kinds from being
+        applied, and is reported for the failing object
+        """
+        manifests = MANIFESTS + [
+            _manifest("Service", "my-other-service", "my-namespace"),
+        ]
+        state_mock = self._state_func({"Service": error})
+        failed = _name(_manifest("Service", "my-service", "my-namespace"))
+
+        with patch.object(metalk8s_kubernetes, "object_present", state_mock):
+            ret = metalk8s_kubernetes.objects_present("my-state", manifests)
+
+        self.assertFalse(ret["result"])
+        # Both services are handled, but not the next kinds
+        self.assertEqual([kind for kind, _ in self.calls][-2:], ["Service", "Service"])
+        self.assertNotIn("Deployment", [kind for kind, _ in self.calls])
+        self.assertIn("{}: {}".format(failed, comment), ret["comment"])
+        self.assertNotIn(failed, ret["changes"])
+        self.assertTrue(
+            ret["comment"].endswith(
+                "Remaining objects were not handled due to failures"
+            )
+        )
+
+    def test_objects_present_wait_for_crds(self):
+        """
+        Tests that custom objects wait for the CustomResourceDefinitions to
+        be established
+        """
+        state_mock = self._state_func()
+        self.get_object_mock.side_effect = [
+            None,
+            _established(False),
+            _established(),
+        ]
+
+        with patch.object(metalk8s_kubernetes, "object_present", state_mock):
+            ret = metalk8s_kubernetes.objects_present("my-state", MANIFESTS)
+
+        self.assertTrue(ret["result"])
+        self.assertEqual(self.get_object_mock.call_count, 3)
+        self.assertEqual(self.sleep_mock.call_count, 2)
+
+    @parameterized.expand(
+        [
+            param(
+                _established(False),
+                "CustomResourceDefinitions not established: "
+                "apiextensions.k8s.io/v1/CustomResourceDefinition "
+                "'prometheuses.monitoring.coreos.com'",
+            ),
+            param(
+                CommandExecutionError("Connection refused"),
+                "Failed to check CustomResourceDefinitions: Connection refused",
+            ),
+        ]
+    )
+    def test_objects_present_crds_not_established(self, get_object, comment):
+        """
+        Tests that objects after CustomResourceDefinitions are not applied if
+        these are not established
+        """
+        state_mock = self._state_func()
+        if isinstance(get_object, Exception):
+            self.get_object_mock.side_effect = get_object
+        else:
+            self.get_object_mock.return_value = get_object
+
+        with patch.object(metalk8s_kubernetes, "object_present", state_mock):
+            ret = metalk8s_kubernetes.objects_present("my-state", MANIFESTS)
+
+        self.assertFalse(ret["result"])
+        self.assertEqual(
+            [kind for kind, _ in self.calls][-1], "CustomResourceDefinition"
+        )
+        self.assertIn(comment, ret["comment"])
+        if not isinstance(get_object, Exception):
+            self.assertEqual(
+                self.get_object_mock.call_count,
+                metalk8s_kubernetes.CRD_ESTABLISHED_ATTEMPTS,
+            )
+
+    def test_objects_present_test_mode(self):
+        """
+        Tests that CustomResourceDefinitions are not waited for in test mode
+        """
+        state_mock = self._state_func(
+            {manifest["kind"]: None for manifest in MANIFESTS}
+        )
+
+        with patch.dict(metalk8s_kubernetes.__opts__, {"test": True}), patch.object(
+            metalk8s_kubernetes, "object_present", state_mock
+        ):
+            ret = metalk8s_kubernetes.objects_present("my-state", MANIFESTS)
+
+        self.assertIsNone(ret["result"])
+        self.assertEqual(len(self.calls), len(MANIFESTS))
+        self.get_object_mock.assert_not_called()
@@ -3,11 +3,35 @@ Utils, helpers for testing
 """
 import builtins
 import functools
+import importlib.util
 import operator
+import os.path
+import sys
 
 from parameterized import param, parameterized
 
 
+SALT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def load_salt_module(directory, name, alias):
+    """
+    Import one of our Salt modules from its file, as `alias`
+
+    Some modules share the same name (e.g. the `metalk8s_kubernetes`
+    execution module, state module and renderer), so they cannot all be
+    imported from the Python path.
+    """
+    if alias not in sys.modules:
+        spec = importlib.util.spec_from_file_location(
+            alias, os.path.join(SALT_DIR, directory, "{}.py".format(name))
+        )
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[alias] = module
+        spec.loader.exec_module(module)
+    return sys.modules[alias]
+
+
 def cmd_output(retcode=0, stdout=None, stderr=None, pid=12345):
     """
     Simple helper to return a dict representing a salt `cmd.run_all` output